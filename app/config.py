@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -24,6 +24,53 @@ class Settings(BaseSettings):
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:3001"]
     
+    # Matching
+    matching_strategy: str = "index"  # index, stream
+    matching_parish_fallback: bool = True  # also consider same-parish jobs with no shared skills
+    matching_stream_page_size: int = 500
+    matching_stream_max_pages: int = 200
+    matching_stream_time_budget_ms: int = 0  # 0: off; when set, results depend on load
+    recommendation_cache_size: int = 10000
+    recommendation_cache_ttl_seconds: int = 300
+    text_index_refit_threshold: int = 100  # job changes before the TF-IDF matrix is rebuilt
+    text_index_refit_interval_seconds: int = 60
+    similar_jobs_snapshot_path: str = "./similar_jobs_snapshot.npz"
+    batch_matching_max_cells: int = 1_000_000  # users x jobs scored per chunk in /matching/batch
+    matching_use_precomputed: bool = True  # serve lists written by `python -m app.precompute`
+    precompute_top_n: int = 50
+    gig_pool_ttl_seconds: int = 60
+    gig_recommendation_radius_km: float = 50  # parishes searched around the user's own
+    matching_nearby_radius_km: float = 10  # jobs this close are candidates even with no shared skills
+    geo_grid_cell_km: float = 5
+    
+    # User documents cached by FirebaseService.get_user; writers invalidate their entries
+    user_cache_size: int = 50000
+    user_cache_ttl_seconds: int = 60
+    user_cache_negative_ttl_seconds: int = 10  # how long an unknown user id stays cached
+    
+    # Look up users missing from the users_by_email index by query (and index them).
+    # Off: run `python -m app.rebuild_email_index` once instead, so misses cost one read
+    email_index_fallback_query: bool = False
+    
+    # Analytics: gig totals kept in sharded counter documents, summed on read
+    gig_counter_shards: int = 10
+    analytics_days: int = 30  # days of per-day gig activity returned
+    
+    # Gig claims: transaction attempts with jittered exponential backoff between them
+    gig_claim_max_attempts: int = 5
+    gig_claim_backoff_base_ms: int = 25
+    gig_claim_backoff_max_ms: int = 1000
+    
+    # Blocking I/O executor (FirebaseService calls made from async routes)
+    io_executor_workers: int = 32
+    io_executor_max_queue: int = 256  # waiting calls beyond this get a 503
+    io_operation_limits: Dict[str, int] = {  # per-operation concurrency; others use io_executor_workers
+        "batch_load": 2,
+        "batch_match": 2,
+        "candidates": 8,
+        "similar_jobs": 8
+    }
+    
     model_config = ConfigDict(
         env_file="dev.env" if os.path.exists("dev.env") else None,
         env_file_encoding="utf-8"
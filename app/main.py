@@ -1,17 +1,36 @@
 
 from app.config import get_settings
 from app.routes import auth, jobs, gigs, matching, analytics
-from fastapi import FastAPI
+from app.services.similar_jobs import similar_jobs
+from app.services.matching_service import matching_service
+from app.services.io_executor import io_executor, ExecutorSaturated
+from app.services.user_cache import user_cache
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rebuild the similar-jobs index without re-reading every job, then
+    # apply the jobs written since the snapshot was saved
+    saved_at = similar_jobs.load_snapshot(settings.similar_jobs_snapshot_path)
+    if saved_at is not None:
+        await io_executor.run("similar_jobs_catch_up", matching_service.catch_up_similar_jobs, saved_at)
+    yield
+    if similar_jobs.loaded:
+        similar_jobs.save_snapshot(settings.similar_jobs_snapshot_path)
+    io_executor.shutdown()
+
 app = FastAPI(
     title="LinkWorkJA API",
     description="AI-powered job matching platform for Jamaica",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,6 +42,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    # Fail fast so clients back off instead of queueing behind a slow Firestore
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(jobs.router)
@@ -42,6 +66,16 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc)}
 
+@app.get("/health/io")
+async def io_metrics():
+    """Queue depth, wait times and in-flight counts of the blocking I/O executor"""
+    return io_executor.metrics()
+
+@app.get("/health/cache")
+async def cache_metrics():
+    """Hit, miss and eviction counts of the user document cache"""
+    return user_cache.metrics()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -9,6 +9,9 @@ class GigBase(BaseModel):
     payment: float
     estimated_time: str  # e.g., "2 hours"
     difficulty: str  # easy, medium, hard
+    town: Optional[str] = None  # resolved to lat/lon from the town gazetteer
+    lat: Optional[float] = None
+    lon: Optional[float] = None
 
 class GigCreate(GigBase):
     agency_id: str
@@ -21,6 +24,17 @@ class GigResponse(GigBase):
     claimed_by: Optional[str] = None
     completed_at: Optional[datetime] = None
 
+class GigsPage(BaseModel):
+    items: List[GigResponse]
+    next_cursor: Optional[str] = None
+
+class NearbyGig(GigResponse):
+    distance_km: float
+
+class NearbyGigsPage(BaseModel):
+    items: List[NearbyGig]
+    next_cursor: Optional[str] = None
+
 class GigCompletion(BaseModel):
     gig_id: str
     user_id: str
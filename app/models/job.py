@@ -9,6 +9,9 @@ class JobBase(BaseModel):
     pay: float
     required_skills: List[str] = []
     job_type: str  # full-time, part-time, contract
+    town: Optional[str] = None  # resolved to lat/lon from the town gazetteer
+    lat: Optional[float] = None
+    lon: Optional[float] = None
 
 class JobCreate(JobBase):
     employer_id: str
@@ -20,6 +23,24 @@ class JobResponse(JobBase):
     status: str = "active"  # active, filled, expired
     applications_count: int = 0
 
+class JobsPage(BaseModel):
+    items: List[JobResponse]
+    next_cursor: Optional[str] = None
+
+class NearbyJob(JobResponse):
+    distance_km: float
+
+class NearbyJobsPage(BaseModel):
+    items: List[NearbyJob]
+    next_cursor: Optional[str] = None
+
+class SimilarJob(BaseModel):
+    job_id: str
+    title: str
+    parish: str
+    pay: float
+    similarity: float
+
 class JobFilter(BaseModel):
     parish: Optional[str] = None
     min_pay: Optional[float] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class MatchScore(BaseModel):
     job_id: str
@@ -8,6 +8,33 @@ class MatchScore(BaseModel):
     skill_match_percentage: float
     reasons: List[str] = []
 
+class GigMatchScore(BaseModel):
+    gig_id: str
+    score: float
+    distance_km: float
+    reasons: List[str] = []
+    title: str
+    parish: str
+    payment: float
+    difficulty: str
+
+class CandidateScore(BaseModel):
+    user_id: str
+    full_name: str
+    parish: str
+    skills: List[str] = []
+    score: float
+    distance_km: float
+    skill_match_percentage: float
+    reasons: List[str] = []
+
 class MatchRequest(BaseModel):
     user_id: str
-    limit: int = 10
\ No newline at end of file
+    limit: int = 10
+
+class BatchMatchRequest(BaseModel):
+    user_ids: Optional[List[str]] = None  # defaults to all job seekers
+    job_ids: Optional[List[str]] = None  # defaults to all active jobs
+    user_parishes: Optional[List[str]] = None
+    job_parishes: Optional[List[str]] = None
+    top_k: int = Field(10, ge=1)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -13,11 +13,30 @@ class UserBase(BaseModel):
     full_name: str
     parish: str
     role: UserRole
+    town: Optional[str] = None  # resolved to lat/lon from the town gazetteer
+    lat: Optional[float] = None
+    lon: Optional[float] = None
 
 class UserCreate(UserBase):
     password: str
     skills: Optional[List[str]] = []
 
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    parish: Optional[str] = None
+    town: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    skills: Optional[List[str]] = None
+
+    @field_validator('full_name', 'parish', 'skills')
+    @classmethod
+    def not_null(cls, value):
+        # Profile fields can be left out of an update, but not cleared
+        if value is None:
+            raise ValueError("may be omitted but not set to null")
+        return value
+
 class UserResponse(UserBase):
     id: str
     skills: List[str] = []
@@ -0,0 +1,83 @@
+"""Nightly precompute of job recommendations for every job seeker.
+
+    python -m app.precompute [--top-n 50] [--workers 4]
+
+Users are split into chunks and scored on a process pool; each worker
+receives the active jobs once, through the pool initializer. Results are
+written to the `recommendations` collection (one document per user),
+each stamped with the run's generation ID and timestamp.
+"""
+from typing import Dict, List, Tuple
+from datetime import datetime, timezone
+from multiprocessing import Pool
+from app.config import get_settings
+from app.services.recommendation_cache import matching_profile
+import argparse
+import os
+
+settings = get_settings()
+
+_jobs: List[Dict] = []
+_top_n = 0
+
+
+def _init_worker(jobs: List[Dict], top_n: int):
+    global _jobs, _top_n
+    from app.services.text_index import text_index
+    _jobs = jobs
+    _top_n = top_n
+    # IDF weights come from the same job set in every worker
+    text_index.load(jobs)
+
+
+def _score_chunk(users: List[Dict]) -> List[Dict]:
+    from app.services.matching_service import matching_service
+    rows = []
+    results = matching_service.batch_match(users, _jobs, _top_n, explain=True)
+    for user, result in zip(users, results):
+        rows.append({
+            'user_id': result['user_id'],
+            'profile': matching_profile(user),
+            'top_n': _top_n,
+            'matches': result['matches']
+        })
+    return rows
+
+
+def precompute(top_n: int, workers: int, chunk_size: int) -> Tuple[Dict, List[Dict]]:
+    from app.services.firebase_service import firebase_service
+    users = firebase_service.get_users({'role': 'job_seeker'})
+    jobs = firebase_service.get_jobs({'status': 'active'}, limit=None)
+
+    generated_at = datetime.now(timezone.utc)
+    generation = {
+        'generation': generated_at.strftime("%Y%m%dT%H%M%SZ"),
+        'generated_at': generated_at.isoformat()
+    }
+
+    chunks = [users[i:i + chunk_size] for i in range(0, len(users), chunk_size)]
+    rows: List[Dict] = []
+    with Pool(processes=workers, initializer=_init_worker, initargs=(jobs, top_n)) as pool:
+        for chunk_rows in pool.imap(_score_chunk, chunks):
+            rows.extend(chunk_rows)
+
+    print(f"Scored {len(users)} users against {len(jobs)} jobs (generation {generation['generation']})")
+    return generation, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute job recommendations for all job seekers")
+    parser.add_argument("--top-n", type=int, default=settings.precompute_top_n)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="users scored per task")
+    args = parser.parse_args()
+
+    generation, rows = precompute(args.top_n, args.workers, args.chunk_size)
+
+    from app.services.firebase_service import firebase_service
+    saved = firebase_service.save_recommendations(generation, rows)
+    print(f"Saved {saved} recommendation lists")
+
+
+if __name__ == "__main__":
+    main()
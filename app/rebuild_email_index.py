@@ -0,0 +1,18 @@
+"""Write a users_by_email entry for every existing user.
+
+    python -m app.rebuild_email_index
+
+Run once after deploying the email index, so users registered before it
+can log in with a single index read. It is safe to run again: entries
+are rewritten from the user documents.
+"""
+from app.services.firebase_service import firebase_service
+
+
+def main():
+    indexed = firebase_service.rebuild_email_index()
+    print(f"Indexed {indexed} emails")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Recount all gigs into the sharded analytics counters.
+
+    python -m app.rebuild_gig_counters
+
+Run once after deploying the counters, so gigs created before them are
+counted, and again if the counters ever drift. Recounting scans every
+gig, so run it while gigs aren't being created, claimed or completed.
+"""
+from app.services.firebase_service import firebase_service
+
+
+def main():
+    counted = firebase_service.rebuild_gig_counters()
+    print(f"Recounted {counted} gigs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from app.services.firebase_service import firebase_service
+from app.services.firebase_async_service import firebase_async_service
 from app.services.ai_service import ai_service
 from app.routes.auth import verify_token
 
@@ -7,7 +7,7 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get("/dashboard")
 async def get_dashboard_analytics(user_id: str = Depends(verify_token)):
-    data = firebase_service.get_analytics_data()
+    data = await firebase_async_service.get_analytics_data()
     insights = ai_service.generate_analytics_insights(data)
     
     return {
@@ -17,5 +17,5 @@ async def get_dashboard_analytics(user_id: str = Depends(verify_token)):
 
 @router.get("/parish-stats")
 async def get_parish_statistics():
-    data = firebase_service.get_analytics_data()
+    data = await firebase_async_service.get_analytics_data()
     return data['gigs_by_parish']
\ No newline at end of file
@@ -3,8 +3,8 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
-from app.models.user import UserCreate, UserResponse
-from app.services.firebase_service import firebase_service
+from app.models.user import UserCreate, UserResponse, UserUpdate, UserRole
+from app.services.firebase_async_service import firebase_async_service, EmailAlreadyRegistered
 from app.config import get_settings
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -28,10 +28,22 @@ def verify_token(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
+# Roles that may see data across employers (candidate rankings, batch matching)
+STAFF_ROLES = {UserRole.BUSINESS.value, UserRole.GOVERNMENT.value}
+
+async def is_staff(user_id: str) -> bool:
+    user = await firebase_async_service.get_user(user_id)
+    return bool(user) and user.get('role') in STAFF_ROLES
+
+async def require_staff(user_id: str = Depends(verify_token)) -> str:
+    if not await is_staff(user_id):
+        raise HTTPException(status_code=403, detail="Business or government account required")
+    return user_id
+
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate):
     # Check if user exists
-    existing_user = firebase_service.get_user_by_email(user.email)
+    existing_user = await firebase_async_service.get_user_by_email(user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -46,14 +58,18 @@ async def register(user: UserCreate):
     user_data['total_earnings'] = 0.0
     user_data['created_at'] = datetime.now(timezone.utc)
     
-    user_id = firebase_service.create_user(user_data)
+    try:
+        # The pre-check above is only a fast path; this is what enforces uniqueness
+        user_id = await firebase_async_service.create_user(user_data)
+    except EmailAlreadyRegistered:
+        raise HTTPException(status_code=400, detail="Email already registered")
     user_data['id'] = user_id
     
     return UserResponse(**user_data)
 
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = firebase_service.get_user_by_email(form_data.username)
+    user = await firebase_async_service.get_user_by_email(form_data.username)
     if not user or not pwd_context.verify(form_data.password, user['hashed_password']):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
@@ -62,7 +78,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(user_id: str = Depends(verify_token)):
-    user = firebase_service.get_user(user_id)
+    user = await firebase_async_service.get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserResponse(**user)
+
+@router.patch("/me", response_model=UserResponse)
+async def update_current_user(updates: UserUpdate, user_id: str = Depends(verify_token)):
+    user = await firebase_async_service.update_user(user_id, updates.dict(exclude_unset=True))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserResponse(**user)
\ No newline at end of file
@@ -1,48 +1,92 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.models.gig import GigCreate, GigResponse, GigCompletion
-from app.services.firebase_service import firebase_service
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from app.models.gig import GigCreate, GigResponse, GigCompletion, GigsPage, NearbyGigsPage
+from app.services.firebase_async_service import firebase_async_service
 from app.services.ai_service import ai_service
+from app.services.matching_service import matching_service
+from app.services.io_executor import io_executor
 from app.routes.auth import verify_token
+from app.utils.pagination import encode_cursor, decode_distance_cursor, encode_created_cursor, decode_created_cursor
 
 router = APIRouter(prefix="/gigs", tags=["gigs"])
 
 @router.post("/", response_model=GigResponse)
 async def create_gig(gig: GigCreate, user_id: str = Depends(verify_token)):
     gig_data = gig.dict()
-    gig_id = firebase_service.create_gig(gig_data)
+    gig_id = await firebase_async_service.create_gig(gig_data)
     gig_data['id'] = gig_id
     return GigResponse(**gig_data)
 
-@router.get("/available", response_model=List[GigResponse])
-async def get_available_gigs(parish: str = None):
-    gigs = firebase_service.get_available_gigs(parish)
-    return [GigResponse(**gig) for gig in gigs]
+@router.get("/available", response_model=GigsPage)
+async def get_available_gigs(
+    parish: str = None,
+    page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Available gigs newest first, a page at a time; pass next_cursor back as cursor"""
+    try:
+        after = decode_created_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    gigs, next_key = await firebase_async_service.get_available_gigs_page(parish, page_size, after)
+    return {
+        "items": [GigResponse(**gig) for gig in gigs],
+        "next_cursor": encode_created_cursor(*next_key) if next_key else None
+    }
+
+@router.get("/nearby", response_model=NearbyGigsPage)
+async def get_nearby_gigs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=250),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Available gigs within radius_km of a point, nearest first"""
+    try:
+        after = decode_distance_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    gigs, next_key = await io_executor.run(
+        "nearby", matching_service.nearby_gigs, lat, lon, radius_km, limit, after
+    )
+    return {
+        "items": gigs,
+        "next_cursor": encode_cursor(next_key) if next_key else None
+    }
 
 @router.post("/{gig_id}/claim")
 async def claim_gig(gig_id: str, user_id: str = Depends(verify_token)):
-    success = firebase_service.claim_gig(gig_id, user_id)
+    success = await firebase_async_service.claim_gig(gig_id, user_id)
     if not success:
-        raise HTTPException(status_code=400, detail="Unable to claim gig")
+        raise HTTPException(status_code=409, detail="Gig is no longer available")
     return {"message": "Gig claimed successfully"}
 
 @router.post("/complete")
 async def complete_gig(completion: GigCompletion, user_id: str = Depends(verify_token)):
-    success = firebase_service.complete_gig(completion.gig_id, user_id)
-    if not success:
-        raise HTTPException(status_code=400, detail="Unable to complete gig")
-    return {"message": "Gig completed successfully", "payment_processed": True}
+    earnings = await firebase_async_service.complete_gig(completion.gig_id, user_id)
+    if earnings is None:
+        raise HTTPException(status_code=400, detail="Gig is not claimed by this user")
+    return {"message": "Gig completed successfully", "payment_processed": True, **earnings}
 
 @router.post("/generate-batch")
 async def generate_gigs(count: int = 5, user_id: str = Depends(verify_token)):
     """AI-generate multiple micro-gigs"""
     gigs = ai_service.generate_micro_gigs(count)
-    created_gigs = []
-    
     for gig in gigs:
         gig['agency_id'] = user_id
-        gig_id = firebase_service.create_gig(gig)
-        gig['id'] = gig_id
-        created_gigs.append(gig)
     
-    return {"generated": len(created_gigs), "gigs": created_gigs}
\ No newline at end of file
+    # One batched write per 500 gigs instead of a round trip per gig
+    results = await firebase_async_service.create_gigs(gigs)
+    created_gigs = []
+    errors = []
+    for gig, result in zip(gigs, results):
+        if result['success']:
+            gig['id'] = result['id']
+            created_gigs.append(gig)
+        else:
+            errors.append({"title": gig.get('title'), "error": result['error']})
+    
+    return {"generated": len(created_gigs), "gigs": created_gigs, "errors": errors}
\ No newline at end of file
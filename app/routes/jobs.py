@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.models.job import JobCreate, JobResponse, JobFilter
-from app.services.firebase_service import firebase_service
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
+from app.models.job import JobCreate, JobResponse, JobFilter, SimilarJob, JobsPage, NearbyJobsPage
+from app.services.firebase_async_service import firebase_async_service
+from app.services.matching_service import matching_service
+from app.services.io_executor import io_executor
 from app.services.ai_service import ai_service
 from app.routes.auth import verify_token
+from app.utils.pagination import encode_cursor, decode_distance_cursor, encode_created_cursor, decode_created_cursor
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+JOB_STATUSES = {"active", "filled", "expired"}
+
 @router.post("/", response_model=JobResponse)
 async def create_job(job: JobCreate, user_id: str = Depends(verify_token)):
     job_data = job.dict()
@@ -19,32 +24,90 @@ async def create_job(job: JobCreate, user_id: str = Depends(verify_token)):
             job_data['required_skills']
         )
     
-    job_id = firebase_service.create_job(job_data)
+    job_id = await firebase_async_service.create_job(job_data)
     job_data['id'] = job_id
     
     return JobResponse(**job_data)
 
-@router.get("/", response_model=List[JobResponse])
+@router.get("/", response_model=JobsPage)
 async def get_jobs(
     parish: str = None,
     min_pay: float = None,
-    max_pay: float = None
+    max_pay: float = None,
+    page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
+    """Jobs newest first, a page at a time; pass next_cursor back as cursor"""
+    try:
+        after = decode_created_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     filters = {}
     if parish:
         filters['parish'] = parish
     
-    jobs = firebase_service.get_jobs(filters)
+    jobs, next_key = await firebase_async_service.get_jobs_page(filters, page_size, after)
     
-    # Apply pay filters in memory
+    # Pay filters apply within the page, so a page can hold fewer than page_size jobs
     if min_pay:
         jobs = [j for j in jobs if j.get('pay', 0) >= min_pay]
     if max_pay:
         jobs = [j for j in jobs if j.get('pay', float('inf')) <= max_pay]
     
-    return [JobResponse(**job) for job in jobs]
+    return {
+        "items": [JobResponse(**job) for job in jobs],
+        "next_cursor": encode_created_cursor(*next_key) if next_key else None
+    }
+
+@router.get("/nearby", response_model=NearbyJobsPage)
+async def get_nearby_jobs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=250),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Active jobs within radius_km of a point, nearest first"""
+    try:
+        after = decode_distance_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    jobs, next_key = await io_executor.run(
+        "nearby", matching_service.nearby_jobs, lat, lon, radius_km, limit, after
+    )
+    return {
+        "items": jobs,
+        "next_cursor": encode_cursor(next_key) if next_key else None
+    }
+
+@router.patch("/{job_id}/status")
+async def update_job_status(job_id: str, status: str, user_id: str = Depends(verify_token)):
+    if status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    
+    job = await firebase_async_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get('employer_id') != user_id:
+        raise HTTPException(status_code=403, detail="Only the employer can change this job's status")
+    
+    success = await firebase_async_service.update_job_status(job_id, status)
+    if not success:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"message": "Job status updated", "status": status}
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(job_id: str):
-    # Implementation for getting single job
-    pass
\ No newline at end of file
+    job = await firebase_async_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
+
+@router.get("/{job_id}/similar", response_model=List[SimilarJob])
+async def get_similar_jobs(job_id: str, limit: int = Query(10, ge=1, le=50)):
+    job = await firebase_async_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await io_executor.run("similar_jobs", matching_service.get_similar_jobs, job, limit)
\ No newline at end of file
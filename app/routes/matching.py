@@ -1,32 +1,90 @@
-from fastapi import APIRouter, Depends
-from typing import List
-from app.models.matching import MatchScore, MatchRequest
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.models.matching import MatchScore, MatchRequest, CandidateScore, BatchMatchRequest, GigMatchScore
 from app.services.matching_service import matching_service
-from app.routes.auth import verify_token
+from app.services.io_executor import io_executor
+from app.services.firebase_async_service import firebase_async_service
+from app.routes.auth import verify_token, is_staff, require_staff
+import json
 
 router = APIRouter(prefix="/matching", tags=["matching"])
 
 @router.get("/recommendations", response_model=List[MatchScore])
 async def get_recommendations(
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
+    explain: bool = Query(True, description="Include human-readable match reasons"),
     user_id: str = Depends(verify_token)
 ):
-    recommendations = matching_service.get_recommendations(user_id, limit)
+    recommendations = await io_executor.run(
+        "recommendations", matching_service.get_recommendations, user_id, limit, explain
+    )
     return recommendations
 
+@router.get("/gig-recommendations", response_model=List[GigMatchScore])
+async def get_gig_recommendations(
+    limit: int = Query(10, ge=1, le=100),
+    explain: bool = Query(True, description="Include human-readable match reasons"),
+    user_id: str = Depends(verify_token)
+):
+    """Available micro-gigs ranked for the current user"""
+    return await io_executor.run(
+        "gig_recommendations", matching_service.get_gig_recommendations, user_id, limit, explain
+    )
+
 @router.post("/score")
 async def calculate_match_score(
     job_id: str,
     user_id: str = Depends(verify_token)
 ):
     """Calculate match score between user and specific job"""
-    from app.services.firebase_service import firebase_service
+    user = await firebase_async_service.get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    job = await firebase_async_service.get_job(job_id)
     
-    user = firebase_service.get_user(user_id)
-    jobs = firebase_service.get_jobs({'id': job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    if not jobs:
+    score = matching_service.calculate_match_score(user, job)
+    return score
+
+@router.get("/jobs/{job_id}/candidates", response_model=List[CandidateScore])
+async def get_job_candidates(
+    job_id: str,
+    parish: Optional[List[str]] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    explain: bool = Query(True, description="Include human-readable match reasons"),
+    user_id: str = Depends(verify_token)
+):
+    """Rank job seekers for a job"""
+    job = await firebase_async_service.get_job(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    if job.get('employer_id') != user_id and not await is_staff(user_id):
+        raise HTTPException(status_code=403, detail="Not allowed to view candidates for this job")
+    
+    return await io_executor.run(
+        "candidates", matching_service.get_candidates, job, parish, page, page_size, explain
+    )
+
+@router.post("/batch")
+async def batch_match(request: BatchMatchRequest, user_id: str = Depends(require_staff)):
+    """Score many users against many jobs; streams one JSON line per user"""
+    users, jobs = await io_executor.run(
+        "batch_load", matching_service.load_batch,
+        request.user_ids, request.job_ids,
+        request.user_parishes, request.job_parishes
+    )
+    rows = matching_service.batch_match(users, jobs, request.top_k)
+    
+    async def lines():
+        # Each step scores at most one chunk of users, off the event loop
+        while True:
+            row = await io_executor.run("batch_match", next, rows, None)
+            if row is None:
+                return
+            yield json.dumps(row) + "\n"
     
-    score = matching_service.calculate_match_score(user, jobs[0])
-    return score
\ No newline at end of file
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
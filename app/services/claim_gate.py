@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from typing import Dict
+import asyncio
+import threading
+
+
+class ClaimGate:
+    """In-process gate in front of gig claim transactions.
+
+    The first claim for a gig holds the gate while its transaction runs;
+    concurrent claims for the same gig wait for it instead of starting
+    their own Firestore transaction. Once a transaction has decided the
+    gig (claimed, or found no longer available) the gate stays closed and
+    the waiters are turned away. If the attempt failed with an error, the
+    gate reopens and the next waiter tries. Closed gigs are remembered up
+    to `max_entries`, least recent first out.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Event] = {}
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+
+    async def enter(self, gig_id: str) -> bool:
+        """Take the gate once no other claim holds it; False if the gig is decided"""
+        while True:
+            with self._lock:
+                if gig_id in self._closed:
+                    return False
+                released = self._in_flight.get(gig_id)
+                if released is None:
+                    self._in_flight[gig_id] = asyncio.Event()
+                    return True
+            await released.wait()
+
+    def leave(self, gig_id: str, decided: bool):
+        with self._lock:
+            released = self._in_flight.pop(gig_id, None)
+            if decided:
+                self._closed[gig_id] = None
+                self._closed.move_to_end(gig_id)
+                while len(self._closed) > self.max_entries:
+                    self._closed.popitem(last=False)
+        if released is not None:
+            released.set()
+
+
+claim_gate = ClaimGate()
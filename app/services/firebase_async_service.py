@@ -0,0 +1,526 @@
+from firebase_admin import firestore, firestore_async
+from google.api_core.exceptions import Aborted, AlreadyExists
+from google.cloud.firestore import async_transactional
+from app.config import get_settings
+from app.services.firebase_service import firebase_service, email_index_entry, email_key, normalize_email
+from app.services.gig_pool import gig_pool
+from app.services.claim_gate import claim_gate
+from app.services.user_cache import user_cache
+from app.services.gig_counters import gig_counters, COLLECTION as GIG_COUNTERS
+from app.services.recommendation_cache import recommendation_cache, profile_version
+from app.services.scoring import gig_difficulty
+from app.utils.town_data import get_town_coordinates, resolve_coordinates
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import random
+
+settings = get_settings()
+
+
+class EmailAlreadyRegistered(Exception):
+    """Raised by create_user when another user already holds the email"""
+
+    def __init__(self, email: str):
+        super().__init__(f"Email already registered: {email}")
+        self.email = email
+
+
+class AsyncFirebaseService:
+    """Firestore data access for the routes, on the Firestore AsyncClient.
+
+    Awaiting a call yields the event loop while the request is in flight.
+    This is the only implementation of the write paths (registration,
+    claims, completion, batched creates) and of the paged listings. The
+    Firebase app (or dev mode) is set up by FirebaseService; in dev mode
+    reads return its mock data and writes only log. In-process matching
+    state is kept current through FirebaseService's write hooks.
+    """
+
+    def __init__(self):
+        self._sync = firebase_service
+        self._dev_mode = firebase_service._dev_mode
+        self.db = None if self._dev_mode else firestore_async.client()
+
+    # User operations
+    async def create_user(self, user_data: Dict) -> str:
+        """Create a user and claim their email in `users_by_email`, atomically.
+
+        Raises EmailAlreadyRegistered if the email is taken, even by a
+        registration running concurrently.
+        """
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would create user with data: {user_data}")
+            return "dev-user-id-123"
+
+        user_ref = self.db.collection('users').document()
+        email_ref = self.db.collection('users_by_email').document(email_key(user_data['email']))
+        resolve_coordinates(user_data)
+        user_data['created_at'] = datetime.now(timezone.utc)
+
+        @async_transactional
+        async def create(transaction):
+            # A concurrent registration's commit aborts this one, so the retry sees its claim
+            if (await email_ref.get(transaction=transaction)).exists:
+                raise EmailAlreadyRegistered(user_data['email'])
+            transaction.create(email_ref, email_index_entry(user_ref.id, user_data))
+            transaction.set(user_ref, user_data)
+
+        await create(self.db.transaction())
+        self._sync._user_written({'id': user_ref.id, **user_data})
+        return user_ref.id
+
+    async def update_user(self, user_id: str, updates: Dict) -> Optional[Dict]:
+        if 'town' in updates and 'lat' not in updates:
+            # A new town replaces any coordinates resolved from the old one
+            town = get_town_coordinates(updates['town'])
+            updates['lat'], updates['lon'] = (town['lat'], town['lon']) if town else (None, None)
+
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would update user {user_id} with: {updates}")
+            recommendation_cache.invalidate_user(user_id)
+            return {"id": user_id, "email": "dev@example.com", "name": "Dev User", **updates}
+
+        user_ref = self.db.collection('users').document(user_id)
+        user = await user_ref.get()
+        if not user.exists:
+            return None
+
+        await user_ref.update(updates)
+        previous = user.to_dict()
+        user_data = {'id': user_id, **previous, **updates}
+        if profile_version(user_data) != profile_version(previous):
+            # Precomputed matches no longer fit; serve live scores until the next run
+            await self.db.collection('recommendations').document(user_id).delete()
+        self._sync._user_written(user_data)
+        return user_data
+
+    async def get_user(self, user_id: str) -> Optional[Dict]:
+        if self._dev_mode:
+            return self._sync.get_user(user_id)
+
+        found, cached = user_cache.get(user_id)
+        if found:
+            return cached
+
+        generation = user_cache.generation()
+        user = await self.db.collection('users').document(user_id).get()
+        user_data = {'id': user.id, **user.to_dict()} if user.exists else None
+        user_cache.put(user_id, user_data, generation)
+        return user_data
+
+    async def get_users(self, filters: Dict = None) -> List[Dict]:
+        if self._dev_mode:
+            return self._sync.get_users(filters)
+
+        query = self.db.collection('users')
+        if filters:
+            if filters.get('role'):
+                query = query.where('role', '==', filters['role'])
+            if filters.get('parish'):
+                query = query.where('parish', '==', filters['parish'])
+
+        return [{'id': user.id, **user.to_dict()} async for user in query.stream()]
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[Dict]:
+        if self._dev_mode:
+            return self._sync.get_users_by_ids(user_ids)
+        return await self._get_all('users', user_ids)
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict]:
+        """The login fields (id, email, hashed_password) of the user with `email`.
+
+        One read of the `users_by_email` entry, which carries those fields.
+        Entries written before they did cost a second read, of the user.
+        """
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would get user by email: {email}")
+            # In dev mode, return None to allow registration
+            return None
+
+        email_ref = self.db.collection('users_by_email').document(email_key(email))
+        entry = await email_ref.get()
+        if entry.exists:
+            entry = entry.to_dict()
+            if 'hashed_password' not in entry:
+                return await self.get_user(entry['user_id'])
+            return {'id': entry['user_id'], 'email': entry['email'], 'hashed_password': entry['hashed_password']}
+        if not settings.email_index_fallback_query:
+            return None
+
+        # Users created before the index: find them by query and index them on the way
+        query = self.db.collection('users').where('email', '==', email).limit(1)
+        async for user in query.stream():
+            try:
+                await email_ref.create(email_index_entry(user.id, user.to_dict()))
+            except AlreadyExists:
+                pass
+            return {'id': user.id, **user.to_dict()}
+        return None
+
+    # Job operations
+    async def create_job(self, job_data: Dict) -> str:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would create job with data: {job_data}")
+            return "dev-job-id-123"
+
+        job_ref = self.db.collection('jobs').document()
+        resolve_coordinates(job_data)
+        job_data['created_at'] = datetime.now(timezone.utc)
+        job_data['updated_at'] = job_data['created_at']
+        job_data['status'] = 'active'
+        job_data['applications_count'] = 0
+        await job_ref.set(job_data)
+        self._sync._job_written({'id': job_ref.id, **job_data})
+        return job_ref.id
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        if self._dev_mode:
+            return self._sync.get_job(job_id)
+
+        job = await self.db.collection('jobs').document(job_id).get()
+        return {'id': job.id, **job.to_dict()} if job.exists else None
+
+    async def get_jobs_by_ids(self, job_ids: List[str]) -> List[Dict]:
+        if self._dev_mode:
+            return self._sync.get_jobs_by_ids(job_ids)
+        return await self._get_all('jobs', job_ids)
+
+    async def update_job_status(self, job_id: str, status: str) -> bool:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would set job {job_id} status to: {status}")
+            return True
+
+        job_ref = self.db.collection('jobs').document(job_id)
+        job = await job_ref.get()
+        if not job.exists:
+            return False
+
+        changes = {'status': status, 'updated_at': datetime.now(timezone.utc)}
+        await job_ref.update(changes)
+        self._sync._job_written({'id': job_id, **job.to_dict(), **changes})
+        return True
+
+    async def get_jobs(self, filters: Dict = None, limit: Optional[int] = 50) -> List[Dict]:
+        if self._dev_mode:
+            return self._sync.get_jobs(filters, limit)
+
+        query = self.db.collection('jobs')
+        if filters:
+            if filters.get('parish'):
+                query = query.where('parish', '==', filters['parish'])
+            if filters.get('status'):
+                query = query.where('status', '==', filters['status'])
+        if limit:
+            query = query.limit(limit)
+
+        return [{'id': job.id, **job.to_dict()} async for job in query.stream()]
+
+    async def get_jobs_page(
+        self,
+        filters: Dict = None,
+        page_size: int = 50,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[Dict], Optional[Tuple[datetime, str]]]:
+        """One page of jobs, newest first, and the (created_at, id) key to
+        continue after, or None on the last page"""
+        if self._dev_mode:
+            return self._sync.get_jobs(filters)[:page_size], None
+
+        query = self.db.collection('jobs')
+        if filters:
+            if filters.get('parish'):
+                query = query.where('parish', '==', filters['parish'])
+            if filters.get('status'):
+                query = query.where('status', '==', filters['status'])
+        docs = [doc async for doc in newest_first(query, page_size, after).stream()]
+        return [{'id': doc.id, **doc.to_dict()} for doc in docs], next_page_key(docs, page_size)
+
+    async def _get_all(self, collection: str, doc_ids: List[str], chunk_size: int = 300) -> List[Dict]:
+        """Batched document reads; missing documents are skipped"""
+        results = []
+        collection_ref = self.db.collection(collection)
+        for start in range(0, len(doc_ids), chunk_size):
+            refs = [collection_ref.document(doc_id) for doc_id in doc_ids[start:start + chunk_size]]
+            async for doc in self.db.get_all(refs):
+                if doc.exists:
+                    results.append({'id': doc.id, **doc.to_dict()})
+        return results
+
+    # Precomputed recommendations
+    async def get_precomputed_recommendations(self, user_id: str) -> Optional[Dict]:
+        if self._dev_mode:
+            return None
+
+        doc = await self.db.collection('recommendations').document(user_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    # Gig operations
+    async def create_gig(self, gig_data: Dict) -> str:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would create gig with data: {gig_data}")
+            gig_data['created_at'] = datetime.now(timezone.utc)
+            gig_data['status'] = 'available'
+            return "dev-gig-id-123"
+
+        gig_ref = self.db.collection('micro_gigs').document()
+        resolve_coordinates(gig_data)
+        gig_data['created_at'] = datetime.now(timezone.utc)
+        gig_data['status'] = 'available'
+        batch = self.db.batch()
+        batch.set(gig_ref, gig_data)
+        batch.set(self._gig_counter_shard(), gig_counters.shard_update(gig_counters.created([gig_data])), merge=True)
+        await batch.commit()
+        gig_pool.add({'id': gig_ref.id, **gig_data})
+        return gig_ref.id
+
+    async def create_gigs(self, gigs: List[Dict], chunk_size: int = 500) -> List[Dict]:
+        """Create many gigs with one batched write per `chunk_size` gigs.
+
+        Chunks are committed concurrently. Returns one ``{'id', 'success',
+        'error'}`` result per gig, in order; a failed commit fails its chunk.
+        """
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would create {len(gigs)} gigs")
+            for gig_data in gigs:
+                gig_data['created_at'] = datetime.now(timezone.utc)
+                gig_data['status'] = 'available'
+            return [{'id': f"dev-gig-id-{i}", 'success': True, 'error': None} for i in range(len(gigs))]
+
+        collection_ref = self.db.collection('micro_gigs')
+
+        async def commit_chunk(chunk: List[Dict]) -> List[Dict]:
+            batch = self.db.batch()
+            refs = []
+            for gig_data in chunk:
+                gig_ref = collection_ref.document()
+                resolve_coordinates(gig_data)
+                gig_data['created_at'] = datetime.now(timezone.utc)
+                gig_data['status'] = 'available'
+                batch.set(gig_ref, gig_data)
+                refs.append(gig_ref)
+            # One counter write per chunk, summed over its gigs
+            batch.set(self._gig_counter_shard(), gig_counters.shard_update(gig_counters.created(chunk)), merge=True)
+
+            try:
+                await batch.commit()
+            except Exception as e:
+                return [{'id': None, 'success': False, 'error': str(e)} for _ in chunk]
+
+            for gig_ref, gig_data in zip(refs, chunk):
+                gig_pool.add({'id': gig_ref.id, **gig_data})
+            return [{'id': gig_ref.id, 'success': True, 'error': None} for gig_ref in refs]
+
+        chunks = [gigs[start:start + chunk_size] for start in range(0, len(gigs), chunk_size)]
+        results = await asyncio.gather(*(commit_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def get_available_gigs(self, parish: str = None) -> List[Dict]:
+        if self._dev_mode:
+            return self._sync.get_available_gigs(parish)
+
+        query = self.db.collection('micro_gigs').where('status', '==', 'available')
+        if parish:
+            query = query.where('parish', '==', parish)
+        return [{'id': gig.id, **gig.to_dict()} async for gig in query.stream()]
+
+    async def get_available_gigs_page(
+        self,
+        parish: str = None,
+        page_size: int = 50,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[Dict], Optional[Tuple[datetime, str]]]:
+        """One page of available gigs, newest first, and the (created_at, id)
+        key to continue after, or None on the last page"""
+        if self._dev_mode:
+            return self._sync.get_available_gigs(parish)[:page_size], None
+
+        query = self.db.collection('micro_gigs').where('status', '==', 'available')
+        if parish:
+            query = query.where('parish', '==', parish)
+        docs = [doc async for doc in newest_first(query, page_size, after).stream()]
+        return [{'id': doc.id, **doc.to_dict()} for doc in docs], next_page_key(docs, page_size)
+
+    async def claim_gig(self, gig_id: str, user_id: str) -> bool:
+        """Claim a gig only if it is still available; exactly one concurrent claim wins"""
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would claim gig {gig_id} for user {user_id}")
+            return True
+
+        # Local claimers queue behind the one in flight instead of racing it in Firestore
+        if not await claim_gate.enter(gig_id):
+            return False
+
+        decided = False
+        try:
+            for attempt in range(settings.gig_claim_max_attempts):
+                try:
+                    claimed = await self._claim_transaction(gig_id, user_id)
+                    decided = True
+                    break
+                except (Aborted, ValueError) as e:
+                    # Contention: a read raises Aborted, a failed commit a ValueError from it
+                    if not isinstance(e, Aborted) and not isinstance(e.__cause__, Aborted):
+                        raise
+                    if attempt + 1 < settings.gig_claim_max_attempts:
+                        await asyncio.sleep(claim_backoff_seconds(attempt))
+            else:
+                return False
+        finally:
+            claim_gate.leave(gig_id, decided)
+
+        if claimed:
+            gig_pool.remove(gig_id)
+        return claimed
+
+    async def _claim_transaction(self, gig_id: str, user_id: str) -> bool:
+        gig_ref = self.db.collection('micro_gigs').document(gig_id)
+
+        @async_transactional
+        async def claim(transaction) -> bool:
+            gig = await gig_ref.get(transaction=transaction)
+            if not gig.exists or gig.get('status') != 'available':
+                return False
+            claimed_at = datetime.now(timezone.utc)
+            transaction.update(gig_ref, {
+                'status': 'claimed',
+                'claimed_by': user_id,
+                'claimed_at': claimed_at
+            })
+            counts = gig_counters.transition('available', 'claimed', claimed_at)
+            transaction.set(self._gig_counter_shard(), gig_counters.shard_update(counts), merge=True)
+            return True
+
+        # One attempt per transaction; retries back off in claim_gig
+        return await claim(self.db.transaction(max_attempts=1))
+
+    async def complete_gig(self, gig_id: str, user_id: str) -> Optional[Dict]:
+        """Complete a gig claimed by `user_id` and pay them, in one transaction.
+
+        Returns the user's updated earnings, or None if the gig is not
+        currently claimed by this user.
+        """
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would complete gig {gig_id} for user {user_id}")
+            return {'gig_id': gig_id, 'payment': 0, 'completed_gigs': 1, 'total_earnings': 0}
+
+        gig_ref = self.db.collection('micro_gigs').document(gig_id)
+        user_ref = self.db.collection('users').document(user_id)
+
+        @async_transactional
+        async def complete(transaction) -> Optional[Dict]:
+            # Both documents in one transactional batch read. AsyncTransaction.get_all
+            # awaits the client's async generator, so go through the client directly.
+            docs = {
+                doc.reference.path: doc
+                async for doc in self.db.get_all([gig_ref, user_ref], transaction=transaction)
+            }
+            gig, user = docs[gig_ref.path], docs[user_ref.path]
+            completion = gig_completion(gig, user, user_id)
+            if completion is None:
+                return None
+            gig_updates, user_updates, earnings = completion
+            transaction.update(gig_ref, gig_updates)
+            transaction.update(user_ref, user_updates)
+            counts = gig_counters.transition('claimed', 'completed', gig_updates['completed_at'])
+            transaction.set(self._gig_counter_shard(), gig_counters.shard_update(counts), merge=True)
+            return earnings
+
+        earnings = await complete(self.db.transaction())
+        if earnings is not None:
+            gig_pool.remove(gig_id)
+            user_cache.invalidate(user_id)
+        return earnings
+
+    # Analytics
+    async def get_analytics_data(self) -> Dict:
+        if self._dev_mode:
+            print("🔧 DEV MODE: Would get analytics data")
+            # Return mock analytics data for development
+            return {
+                'total_gigs': 15,
+                'gigs_by_parish': {
+                    'Kingston': 8,
+                    'St. James': 4,
+                    'St. Andrew': 3
+                },
+                'skills_in_demand': [
+                    {'skill': 'Python', 'demand': 85, 'jobs': 12},
+                    {'skill': 'JavaScript', 'demand': 78, 'jobs': 10},
+                    {'skill': 'Marketing', 'demand': 65, 'jobs': 8},
+                    {'skill': 'Design', 'demand': 72, 'jobs': 9}
+                ],
+                'unemployment_by_parish': {
+                    'Kingston': 8.2,
+                    'St. James': 12.1,
+                    'St. Andrew': 6.8,
+                    'Clarendon': 15.3
+                },
+                'timestamp': datetime.now(timezone.utc)
+            }
+
+        # Sum the counter shards rather than scanning every gig
+        shard_refs = [self.db.collection(GIG_COUNTERS).document(shard) for shard in gig_counters.shard_ids()]
+        shards = [doc.to_dict() async for doc in self.db.get_all(shard_refs) if doc.exists]
+        return {
+            **gig_counters.analytics(shards, settings.analytics_days),
+            'timestamp': datetime.now(timezone.utc)
+        }
+
+    def _gig_counter_shard(self):
+        return self.db.collection(GIG_COUNTERS).document(gig_counters.random_shard_id())
+
+def newest_first(query, page_size: int, after: Optional[Tuple[datetime, str]] = None):
+    """`query` in a stable (created_at, id) newest-first order, limited to one
+    page starting after the `after` key"""
+    query = query.order_by('created_at', direction=firestore.Query.DESCENDING)
+    query = query.order_by('__name__', direction=firestore.Query.DESCENDING)
+    if after is not None:
+        query = query.start_after({'created_at': after[0], '__name__': after[1]})
+    return query.limit(page_size)
+
+def next_page_key(docs: List, page_size: int) -> Optional[Tuple[datetime, str]]:
+    """Key of the last document of a full page; a short page is the last one"""
+    if len(docs) < page_size:
+        return None
+    return docs[-1].get('created_at'), docs[-1].id
+
+def gig_completion(gig, user, user_id: str) -> Optional[Tuple[Dict, Dict, Dict]]:
+    """Gig and user updates for completing a claimed gig, from transactional snapshots.
+
+    Returns ``(gig_updates, user_updates, earnings)``, or None unless the gig
+    is claimed by `user_id` and the user exists.
+    """
+    if not gig.exists or not user.exists:
+        return None
+    gig_data = gig.to_dict()
+    if gig_data.get('status') != 'claimed' or gig_data.get('claimed_by') != user_id:
+        return None
+
+    user_data = user.to_dict()
+    payment = gig_data.get('payment', 0)
+    earnings = {
+        'gig_id': gig.id,
+        'payment': payment,
+        'completed_gigs': user_data.get('completed_gigs', 0) + 1,
+        'total_earnings': user_data.get('total_earnings', 0) + payment
+    }
+    gig_updates = {
+        'status': 'completed',
+        'completed_at': datetime.now(timezone.utc)
+    }
+    # Difficulty history is used by gig recommendations
+    user_updates = {
+        'completed_gigs': earnings['completed_gigs'],
+        'total_earnings': earnings['total_earnings'],
+        f"gig_difficulty_counts.{gig_difficulty(gig_data)}": firestore.Increment(1)
+    }
+    return gig_updates, user_updates, earnings
+
+def claim_backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff before claim retry number `attempt + 1`"""
+    ceiling = min(settings.gig_claim_backoff_max_ms, settings.gig_claim_backoff_base_ms * 2 ** attempt)
+    return random.uniform(0, ceiling) / 1000
+
+
+firebase_async_service = AsyncFirebaseService()
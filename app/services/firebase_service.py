@@ -1,13 +1,29 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 from app.config import get_settings
-from typing import Dict, List, Optional
+from app.services.job_index import job_index
+from app.services.recommendation_cache import recommendation_cache
+from app.services.user_index import user_index
+from app.services.text_index import text_index
+from app.services.similar_jobs import similar_jobs
+from app.services.user_cache import user_cache
+from app.services.gig_counters import gig_counters, COLLECTION as GIG_COUNTERS
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime, timezone
+import hashlib
 import os
 
 settings = get_settings()
 
+
 class FirebaseService:
+    """Blocking Firestore access for the matching engine and batch jobs.
+
+    Sets up the Firebase app (or dev mode, with mock data) for the whole
+    process. Routes go through AsyncFirebaseService, which owns every
+    write; the write hooks here keep in-process matching state current.
+    """
+
     def __init__(self):
         if not firebase_admin._apps:
             # Check if we're in development mode and credentials file doesn't exist
@@ -32,48 +48,100 @@ class FirebaseService:
             self._dev_mode = False
     
     # User operations
-    def create_user(self, user_data: Dict) -> str:
-        if self._dev_mode:
-            print(f"🔧 DEV MODE: Would create user with data: {user_data}")
-            return "dev-user-id-123"
-        
-        user_ref = self.db.collection('users').document()
-        user_data['created_at'] = datetime.now(timezone.utc)
-        user_ref.set(user_data)
-        return user_ref.id
+    def _user_written(self, user: Dict):
+        # Keep in-process matching state in step with user writes
+        user_cache.invalidate(user['id'])
+        user_index.add(user)
+        recommendation_cache.invalidate_user(user['id'], user)
     
     def get_user(self, user_id: str) -> Optional[Dict]:
         if self._dev_mode:
             print(f"🔧 DEV MODE: Would get user with ID: {user_id}")
             return {"id": user_id, "email": "dev@example.com", "name": "Dev User"}
         
-        user_ref = self.db.collection('users').document(user_id)
-        user = user_ref.get()
-        return user.to_dict() if user.exists else None
+        found, cached = user_cache.get(user_id)
+        if found:
+            return cached
+        
+        generation = user_cache.generation()
+        user = self.db.collection('users').document(user_id).get()
+        user_data = {'id': user.id, **user.to_dict()} if user.exists else None
+        user_cache.put(user_id, user_data, generation)
+        return user_data
     
-    def get_user_by_email(self, email: str) -> Optional[Dict]:
+    def get_users(self, filters: Dict = None) -> List[Dict]:
         if self._dev_mode:
-            print(f"🔧 DEV MODE: Would get user by email: {email}")
-            # In dev mode, return None to allow registration
-            return None
+            print(f"🔧 DEV MODE: Would get users with filters: {filters}")
+            # Return mock job seekers for development
+            return [
+                {
+                    "id": "dev-user-1",
+                    "email": "seeker1@example.com",
+                    "full_name": "Dev Seeker One",
+                    "parish": "Kingston",
+                    "role": "job_seeker",
+                    "skills": ["Python", "Excel"],
+                    "completed_gigs": 0,
+                    "total_earnings": 0.0,
+                    "created_at": datetime.now(timezone.utc)
+                },
+                {
+                    "id": "dev-user-2",
+                    "email": "seeker2@example.com",
+                    "full_name": "Dev Seeker Two",
+                    "parish": "St. James",
+                    "role": "job_seeker",
+                    "skills": ["Marketing", "Social Media"],
+                    "completed_gigs": 0,
+                    "total_earnings": 0.0,
+                    "created_at": datetime.now(timezone.utc)
+                }
+            ]
         
-        users = self.db.collection('users').where('email', '==', email).limit(1).stream()
-        for user in users:
-            data = user.to_dict()
-            data['id'] = user.id
-            return data
-        return None
+        query = self.db.collection('users')
+        if filters:
+            if filters.get('role'):
+                query = query.where('role', '==', filters['role'])
+            if filters.get('parish'):
+                query = query.where('parish', '==', filters['parish'])
+        
+        users = query.stream()
+        return [{'id': user.id, **user.to_dict()} for user in users]
+    
+    def get_users_by_ids(self, user_ids: List[str]) -> List[Dict]:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would get {len(user_ids)} users by ID")
+            wanted = set(user_ids)
+            return [user for user in self.get_users() if user['id'] in wanted]
+        
+        return self._get_all('users', user_ids)
     
     # Job operations
-    def create_job(self, job_data: Dict) -> str:
-        job_ref = self.db.collection('jobs').document()
-        job_data['created_at'] = datetime.now(timezone.utc)
-        job_data['status'] = 'active'
-        job_data['applications_count'] = 0
-        job_ref.set(job_data)
-        return job_ref.id
-    
-    def get_jobs(self, filters: Dict = None, limit: int = 50) -> List[Dict]:
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would get job with ID: {job_id}")
+            jobs = [job for job in self.get_jobs() if job['id'] == job_id]
+            return jobs[0] if jobs else None
+        
+        job = self.db.collection('jobs').document(job_id).get()
+        return {'id': job.id, **job.to_dict()} if job.exists else None
+    
+    def get_jobs_by_ids(self, job_ids: List[str]) -> List[Dict]:
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would get {len(job_ids)} jobs by ID")
+            wanted = set(job_ids)
+            return [job for job in self.get_jobs() if job['id'] in wanted]
+        
+        return self._get_all('jobs', job_ids)
+    
+    def _job_written(self, job: Dict):
+        # Keep in-process matching state in step with job writes
+        job_index.add(job)
+        text_index.add(job)
+        similar_jobs.add(job)
+        recommendation_cache.invalidate_for_job(job)
+    
+    def get_jobs(self, filters: Dict = None, limit: Optional[int] = 50) -> List[Dict]:
         if self._dev_mode:
             print(f"🔧 DEV MODE: Would get jobs with filters: {filters}")
             # Return mock jobs for development
@@ -114,17 +182,80 @@ class FirebaseService:
             if filters.get('status'):
                 query = query.where('status', '==', filters['status'])
         
-        jobs = query.limit(limit).stream()
+        if limit:
+            query = query.limit(limit)
+        
+        jobs = query.stream()
         return [{'id': job.id, **job.to_dict()} for job in jobs]
     
-    # Gig operations
-    def create_gig(self, gig_data: Dict) -> str:
-        gig_ref = self.db.collection('micro_gigs').document()
-        gig_data['created_at'] = datetime.now(timezone.utc)
-        gig_data['status'] = 'available'
-        gig_ref.set(gig_data)
-        return gig_ref.id
+    def iter_jobs(self, filters: Dict = None, page_size: int = 500) -> Iterator[List[Dict]]:
+        """Page through every matching job in a stable (created_at, id) order"""
+        if self._dev_mode:
+            yield self.get_jobs(filters)
+            return
+        
+        query = self.db.collection('jobs')
+        if filters:
+            if filters.get('parish'):
+                query = query.where('parish', '==', filters['parish'])
+            if filters.get('status'):
+                query = query.where('status', '==', filters['status'])
+        query = query.order_by('created_at').order_by('__name__')
+        
+        last = None
+        while True:
+            page_query = query.start_after(last) if last is not None else query
+            docs = list(page_query.limit(page_size).stream())
+            if not docs:
+                return
+            yield [{'id': doc.id, **doc.to_dict()} for doc in docs]
+            if len(docs) < page_size:
+                return
+            last = docs[-1]
+    
+    def get_jobs_updated_since(self, since: datetime) -> List[Dict]:
+        """Jobs written at or after `since` (by `updated_at`), whatever their status"""
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would get jobs updated since: {since}")
+            return []
+        
+        query = self.db.collection('jobs').where('updated_at', '>=', since)
+        return [{'id': doc.id, **doc.to_dict()} for doc in query.stream()]
+    
+    def _get_all(self, collection: str, doc_ids: List[str], chunk_size: int = 300) -> List[Dict]:
+        """Batched document reads; missing documents are skipped"""
+        results = []
+        collection_ref = self.db.collection(collection)
+        for start in range(0, len(doc_ids), chunk_size):
+            refs = [collection_ref.document(doc_id) for doc_id in doc_ids[start:start + chunk_size]]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    results.append({'id': doc.id, **doc.to_dict()})
+        return results
+    
+    # Precomputed recommendations
+    def save_recommendations(self, generation: Dict, recommendations: List[Dict], chunk_size: int = 500) -> int:
+        """Write one recommendations document per user, stamped with the run's generation"""
+        if self._dev_mode:
+            print(f"🔧 DEV MODE: Would save {len(recommendations)} precomputed recommendations")
+            return 0
+        
+        collection_ref = self.db.collection('recommendations')
+        for start in range(0, len(recommendations), chunk_size):
+            batch = self.db.batch()
+            for row in recommendations[start:start + chunk_size]:
+                batch.set(collection_ref.document(row['user_id']), {**row, **generation})
+            batch.commit()
+        return len(recommendations)
     
+    def get_precomputed_recommendations(self, user_id: str) -> Optional[Dict]:
+        if self._dev_mode:
+            return None
+        
+        doc = self.db.collection('recommendations').document(user_id).get()
+        return doc.to_dict() if doc.exists else None
+    
+    # Gig operations
     def get_available_gigs(self, parish: str = None) -> List[Dict]:
         if self._dev_mode:
             print(f"🔧 DEV MODE: Would get available gigs for parish: {parish}")
@@ -170,76 +301,62 @@ class FirebaseService:
         gigs = query.stream()
         return [{'id': gig.id, **gig.to_dict()} for gig in gigs]
     
-    def claim_gig(self, gig_id: str, user_id: str) -> bool:
-        gig_ref = self.db.collection('micro_gigs').document(gig_id)
-        gig_ref.update({
-            'status': 'claimed',
-            'claimed_by': user_id,
-            'claimed_at': datetime.now(timezone.utc)
-        })
-        return True
-    
-    def complete_gig(self, gig_id: str, user_id: str) -> bool:
-        # Update gig status
-        gig_ref = self.db.collection('micro_gigs').document(gig_id)
-        gig = gig_ref.get().to_dict()
-        
-        gig_ref.update({
-            'status': 'completed',
-            'completed_at': datetime.now(timezone.utc)
-        })
-        
-        # Update user earnings
-        user_ref = self.db.collection('users').document(user_id)
-        user_ref.update({
-            'completed_gigs': firestore.Increment(1),
-            'total_earnings': firestore.Increment(gig['payment'])
-        })
-        
-        return True
+    def rebuild_email_index(self, chunk_size: int = 500) -> int:
+        """Write a `users_by_email` entry for every user.
+
+        Users sharing an email (possible before the index) leave it to the
+        earliest registered of them.
+        """
+        if self._dev_mode:
+            print("🔧 DEV MODE: Would rebuild the email index")
+            return 0
+        
+        users = sorted(
+            ({'id': user.id, **user.to_dict()} for user in self.db.collection('users').stream()),
+            key=lambda user: user.get('created_at') or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True
+        )
+        # Newest first, so the earliest user's entry is the one that stays
+        entries = {email_key(user['email']): email_index_entry(user['id'], user) for user in users if user.get('email')}
+        
+        collection_ref = self.db.collection('users_by_email')
+        keys = list(entries)
+        for start in range(0, len(keys), chunk_size):
+            batch = self.db.batch()
+            for key in keys[start:start + chunk_size]:
+                batch.set(collection_ref.document(key), entries[key])
+            batch.commit()
+        return len(entries)
     
     # Analytics
-    def get_analytics_data(self) -> Dict:
+    def rebuild_gig_counters(self) -> int:
+        """Recount every gig into the counter shards; run while gigs aren't being written"""
         if self._dev_mode:
-            print("🔧 DEV MODE: Would get analytics data")
-            # Return mock analytics data for development
-            return {
-                'total_gigs': 15,
-                'gigs_by_parish': {
-                    'Kingston': 8,
-                    'St. James': 4,
-                    'St. Andrew': 3
-                },
-                'skills_in_demand': [
-                    {'skill': 'Python', 'demand': 85, 'jobs': 12},
-                    {'skill': 'JavaScript', 'demand': 78, 'jobs': 10},
-                    {'skill': 'Marketing', 'demand': 65, 'jobs': 8},
-                    {'skill': 'Design', 'demand': 72, 'jobs': 9}
-                ],
-                'unemployment_by_parish': {
-                    'Kingston': 8.2,
-                    'St. James': 12.1,
-                    'St. Andrew': 6.8,
-                    'Clarendon': 15.3
-                },
-                'timestamp': datetime.now(timezone.utc)
-            }
-        
-        # Get gigs per parish
-        gigs = self.db.collection('micro_gigs').stream()
-        parish_counts = {}
-        total_gigs = 0
-        
-        for gig in gigs:
-            data = gig.to_dict()
-            parish = data.get('parish', 'unknown')
-            parish_counts[parish] = parish_counts.get(parish, 0) + 1
-            total_gigs += 1
-        
-        return {
-            'total_gigs': total_gigs,
-            'gigs_by_parish': parish_counts,
-            'timestamp': datetime.now(timezone.utc)
-        }
+            print("🔧 DEV MODE: Would rebuild gig counters")
+            return 0
+        
+        gigs = [gig.to_dict() for gig in self.db.collection('micro_gigs').stream()]
+        counts = gig_counters.recount(gigs)
+        
+        # The full totals go in the first shard; the rest start again from zero
+        batch = self.db.batch()
+        for i, shard in enumerate(gig_counters.shard_ids()):
+            batch.set(self.db.collection(GIG_COUNTERS).document(shard), counts if i == 0 else {})
+        batch.commit()
+        return len(gigs)
+    
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def email_key(email: str) -> str:
+    """`users_by_email` document id; hashed, since emails may contain '/'"""
+    return hashlib.sha256(normalize_email(email).encode("utf-8")).hexdigest()
+
+def email_index_entry(user_id: str, user: Dict) -> Dict:
+    """`users_by_email` document: the user's id plus what login reads"""
+    entry = {'user_id': user_id, 'email': normalize_email(user['email'])}
+    if user.get('hashed_password'):
+        entry['hashed_password'] = user['hashed_password']
+    return entry
 
 firebase_service = FirebaseService()
\ No newline at end of file
@@ -0,0 +1,139 @@
+from firebase_admin import firestore
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timedelta, timezone
+from app.config import get_settings
+from app.utils.parish_data import PARISH_NAMES, UNKNOWN_PARISH, get_parish_index, parish_display_name
+import random
+
+settings = get_settings()
+
+COLLECTION = 'gig_counters'
+UNKNOWN_PARISH_KEY = 'unknown'
+
+# Days past the retention window whose by_day entries each shard write deletes
+PRUNE_DAYS = 7
+
+
+class GigCounters:
+    """Gig totals by parish, status and day, kept as sharded counter documents.
+
+    Every gig write adds `Increment`s to one randomly chosen shard of
+    `gig_counters`, in the same batch or transaction as the gig itself, so
+    no single document takes all the write traffic. Reading the totals
+    means reading and summing the shards, however many gigs there are.
+
+    A shard looks like ``{'total': n, 'by_parish': {parish: n},
+    'by_status': {status: n}, 'by_day': {'YYYY-MM-DD': {event: n}}}``,
+    where the day events are 'created', 'claimed' and 'completed'. Parishes
+    are counted under their JAMAICA_PARISHES key, so spellings such as
+    "St James" and "St. James" land on one counter.
+
+    Only `retention_days` of by_day entries are kept. Each write also
+    deletes the entries for the `PRUNE_DAYS` days just past that window,
+    so a shard written at least that often never holds older days.
+    """
+
+    def __init__(self, shards: int = 10, retention_days: int = 30):
+        self.shards = shards
+        self.retention_days = retention_days
+
+    def shard_ids(self) -> List[str]:
+        return [f"shard-{i}" for i in range(self.shards)]
+
+    def random_shard_id(self) -> str:
+        return f"shard-{random.randrange(self.shards)}"
+
+    def created(self, gigs: Iterable[Dict]) -> Dict:
+        """Counter changes for newly created gigs"""
+        delta = {'total': 0, 'by_parish': {}, 'by_status': {}, 'by_day': {}}
+        for gig in gigs:
+            delta['total'] += 1
+            _bump(delta['by_parish'], _parish_key(gig.get('parish')))
+            _bump(delta['by_status'], gig.get('status', 'available'))
+            _bump(delta['by_day'].setdefault(_day(gig.get('created_at')), {}), 'created')
+        return delta
+
+    def recount(self, gigs: List[Dict]) -> Dict:
+        """Full counts for existing gigs, for rebuilding the shards"""
+        counts = self.created(gigs)
+        for gig in gigs:
+            for event in ('claimed', 'completed'):
+                if gig.get(f'{event}_at'):
+                    _bump(counts['by_day'].setdefault(_day(gig[f'{event}_at']), {}), event)
+        since = _day(self._retention_start())
+        counts['by_day'] = {day: events for day, events in counts['by_day'].items() if day >= since}
+        return counts
+
+    def transition(self, from_status: str, to_status: str, at: Optional[datetime] = None) -> Dict:
+        """Counter changes for one gig moving between statuses"""
+        return {
+            'by_status': {from_status: -1, to_status: 1},
+            'by_day': {_day(at): {to_status: 1}}
+        }
+
+    def shard_update(self, delta: Dict) -> Dict:
+        """Payload for a merged set on a shard: `delta` as Increments, plus
+        deletes for the by_day entries that have just left the retention window"""
+        update = self.increments(delta)
+        start = self._retention_start()
+        by_day = update.setdefault('by_day', {})
+        for age in range(1, PRUNE_DAYS + 1):
+            by_day.setdefault(_day(start - timedelta(days=age)), firestore.DELETE_FIELD)
+        return update
+
+    def increments(self, delta: Dict) -> Dict:
+        """`delta` as Firestore Increment transforms, for a merged set on a shard"""
+        return {
+            key: self.increments(value) if isinstance(value, dict) else firestore.Increment(value)
+            for key, value in delta.items()
+        }
+
+    def analytics(self, shards: Iterable[Dict], days: int = 30) -> Dict:
+        """Sum shard documents into the analytics summary"""
+        totals = {}
+        for shard in shards:
+            _add(totals, shard)
+
+        # Counters written before parishes were normalized may use raw names
+        by_parish = {}
+        for parish, count in totals.get('by_parish', {}).items():
+            _bump(by_parish, _parish_key(parish), count)
+
+        since = _day(datetime.now(timezone.utc) - timedelta(days=days - 1))
+        by_day = totals.get('by_day', {})
+        return {
+            'total_gigs': totals.get('total', 0),
+            'gigs_by_parish': {
+                parish if parish == UNKNOWN_PARISH_KEY else parish_display_name(parish): count
+                for parish, count in by_parish.items()
+            },
+            'gigs_by_status': totals.get('by_status', {}),
+            'gigs_by_day': {day: by_day[day] for day in sorted(by_day) if day >= since}
+        }
+
+    def _retention_start(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(days=self.retention_days - 1)
+
+
+def _parish_key(parish: Optional[str]) -> str:
+    index = get_parish_index(parish)
+    return PARISH_NAMES[index] if index != UNKNOWN_PARISH else UNKNOWN_PARISH_KEY
+
+
+def _day(at: Optional[datetime] = None) -> str:
+    return (at or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _bump(counts: Dict, key: str, amount: int = 1):
+    counts[key] = counts.get(key, 0) + amount
+
+
+def _add(totals: Dict, values: Dict):
+    for key, value in values.items():
+        if isinstance(value, dict):
+            _add(totals.setdefault(key, {}), value)
+        else:
+            _bump(totals, key, value)
+
+
+gig_counters = GigCounters(shards=settings.gig_counter_shards, retention_days=settings.analytics_days)
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import get_settings
+from app.utils.geo_index import GeoIndex
+from app.utils.parish_data import get_parish_index
+from app.utils.town_data import location_of
+import threading
+import time
+
+settings = get_settings()
+
+
+class GigPool:
+    """In-process pool of available micro-gigs, grouped by parish and
+    kept in a spatial grid for radius lookups.
+
+    The pool is filled from one query for all available gigs and refreshed
+    once its TTL runs out. Gig writes made through this process (create,
+    claim, complete) update it in place, so a claimed gig stops being
+    recommended right away.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, cell_km: float = 5.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._by_parish: Dict[int, Dict[str, Dict]] = {}
+        self._parish_of: Dict[str, int] = {}
+        self._geo = GeoIndex(cell_km=cell_km)
+        self._expires_at = 0.0
+        self.loaded = False
+
+    def load(self, gigs: List[Dict]):
+        with self._lock:
+            self._by_parish.clear()
+            self._parish_of.clear()
+            self._geo.clear()
+            for gig in gigs:
+                self._insert(gig)
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            self.loaded = True
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def add(self, gig: Dict):
+        with self._lock:
+            self._remove(gig['id'])
+            if gig.get('status', 'available') == 'available':
+                self._insert(gig)
+
+    def remove(self, gig_id: str):
+        with self._lock:
+            self._remove(gig_id)
+
+    def gigs(self, parishes: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Available gigs in the given parish indices (all parishes if None)"""
+        with self._lock:
+            if parishes is None:
+                parishes = list(self._by_parish)
+            gigs = []
+            for parish in parishes:
+                gigs.extend(self._by_parish.get(parish, {}).values())
+            return gigs
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Dict, float]]:
+        """Available gigs within the radius with their distances, nearest first"""
+        with self._lock:
+            return [
+                (self._by_parish[self._parish_of[gig_id]][gig_id], distance)
+                for gig_id, distance in self._geo.within(lat, lon, radius_km)
+            ]
+
+    def _insert(self, gig: Dict):
+        parish = get_parish_index(gig.get('parish'))
+        self._by_parish.setdefault(parish, {})[gig['id']] = gig
+        self._parish_of[gig['id']] = parish
+        location = location_of(gig, parish_fallback=True)
+        if location:
+            self._geo.add(gig['id'], *location)
+
+    def _remove(self, gig_id: str):
+        parish = self._parish_of.pop(gig_id, None)
+        if parish is not None:
+            self._by_parish[parish].pop(gig_id, None)
+            self._geo.remove(gig_id)
+
+    def __len__(self) -> int:
+        return len(self._parish_of)
+
+
+gig_pool = GigPool(ttl_seconds=settings.gig_pool_ttl_seconds, cell_km=settings.geo_grid_cell_km)
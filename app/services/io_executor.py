@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.config import get_settings
+import asyncio
+import functools
+import threading
+import time
+
+settings = get_settings()
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an operation's wait queue is full; routes answer 503"""
+
+    def __init__(self, operation: str):
+        super().__init__(f"Too many pending '{operation}' requests")
+        self.operation = operation
+
+
+class BoundedIOExecutor:
+    """Sized thread pool for blocking calls made from async routes.
+
+    A call first waits for a slot under its operation's concurrency limit,
+    then for a free worker, so the pool's own queue never grows. At most
+    `max_queue` calls may be waiting at once; beyond that, `run` raises
+    ExecutorSaturated immediately instead of letting requests pile up.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 32,
+        max_queue: int = 256,
+        operation_limits: Optional[Dict[str, int]] = None
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.operation_limits = operation_limits or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+        self._workers = asyncio.Semaphore(max_workers)
+        self._operations: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def run(self, operation: str, fn: Callable, *args, **kwargs) -> Any:
+        stats = self._operation_stats(operation)
+        with self._lock:
+            if self._queued >= self.max_queue:
+                stats['rejected'] += 1
+                raise ExecutorSaturated(operation)
+            self._queued += 1
+            stats['queued'] += 1
+
+        enqueued_at = time.monotonic()
+        limit = self._operation_semaphore(operation)
+        try:
+            await limit.acquire()
+            try:
+                await self._workers.acquire()
+            except BaseException:
+                limit.release()
+                raise
+        finally:
+            waited = time.monotonic() - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                stats['queued'] -= 1
+                stats['wait_seconds_total'] += waited
+                stats['wait_seconds_max'] = max(stats['wait_seconds_max'], waited)
+
+        with self._lock:
+            stats['in_flight'] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._workers.release()
+            limit.release()
+            with self._lock:
+                stats['in_flight'] -= 1
+                stats['completed'] += 1
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            operations = {name: dict(stats) for name, stats in self._stats.items()}
+            queued = self._queued
+        in_flight = sum(stats['in_flight'] for stats in operations.values())
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'queue_depth': queued,
+            'in_flight': in_flight,
+            'operations': operations
+        }
+
+    def _operation_semaphore(self, operation: str) -> asyncio.Semaphore:
+        semaphore = self._operations.get(operation)
+        if semaphore is None:
+            limit = self.operation_limits.get(operation, self.max_workers)
+            semaphore = self._operations.setdefault(operation, asyncio.Semaphore(limit))
+        return semaphore
+
+    def _operation_stats(self, operation: str) -> Dict[str, float]:
+        with self._lock:
+            return self._stats.setdefault(operation, {
+                'queued': 0,
+                'in_flight': 0,
+                'completed': 0,
+                'rejected': 0,
+                'wait_seconds_total': 0.0,
+                'wait_seconds_max': 0.0
+            })
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+io_executor = BoundedIOExecutor(
+    max_workers=settings.io_executor_workers,
+    max_queue=settings.io_executor_max_queue,
+    operation_limits=settings.io_operation_limits
+)
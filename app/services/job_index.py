@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Set, Tuple
+from app.config import get_settings
+from app.utils.geo_index import GeoIndex
+from app.utils.parish_data import get_parish_index, UNKNOWN_PARISH
+from app.utils.skill_vocab import skill_vocab
+from app.utils.town_data import location_of
+import threading
+import numpy as np
+
+settings = get_settings()
+
+class JobIndex:
+    """In-process inverted index over active jobs.
+
+    Maps interned skill IDs and parishes to job IDs so recommendations only
+    score jobs that can plausibly match. Job locations (town-level where
+    known, parish centroid otherwise) are kept in a spatial grid for radius
+    lookups. The index is kept current by the
+    writes made through this process (see FirebaseService.create_job and
+    update_job_status) and is loaded from Firestore on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._jobs: Dict[str, Dict] = {}
+        self._order: Dict[str, int] = {}
+        self._skill_ids: Dict[str, np.ndarray] = {}
+        self._skill_masks: Dict[str, int] = {}
+        self._by_skill: Dict[int, Set[str]] = {}
+        self._by_parish: Dict[int, Set[str]] = {}
+        # Jobs with no required skills are a full skill match for everyone
+        self._open_jobs: Set[str] = set()
+        self._geo = GeoIndex(cell_km=settings.geo_grid_cell_km)
+        self._sequence = 0
+        self.loaded = False
+
+    def load(self, jobs: List[Dict]):
+        with self._lock:
+            self._jobs.clear()
+            self._order.clear()
+            self._skill_ids.clear()
+            self._skill_masks.clear()
+            self._by_skill.clear()
+            self._by_parish.clear()
+            self._open_jobs.clear()
+            self._geo.clear()
+            for job in jobs:
+                self.add(job)
+            self.loaded = True
+
+    def add(self, job: Dict):
+        with self._lock:
+            job_id = job['id']
+            self.remove(job_id)
+            if job.get('status', 'active') != 'active':
+                return
+
+            self._jobs[job_id] = job
+            self._order[job_id] = self._sequence
+            self._sequence += 1
+
+            skill_ids = skill_vocab.ids(job.get('required_skills'))
+            self._skill_ids[job_id] = skill_ids
+            self._skill_masks[job_id] = skill_vocab.mask(job.get('required_skills'))
+            if not len(skill_ids):
+                self._open_jobs.add(job_id)
+            for skill_id in skill_ids.tolist():
+                self._by_skill.setdefault(skill_id, set()).add(job_id)
+
+            parish = get_parish_index(job.get('parish'))
+            if parish != UNKNOWN_PARISH:
+                self._by_parish.setdefault(parish, set()).add(job_id)
+
+            location = location_of(job, parish_fallback=True)
+            if location:
+                self._geo.add(job_id, *location)
+
+    def remove(self, job_id: str):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            self._order.pop(job_id, None)
+            self._open_jobs.discard(job_id)
+            self._geo.remove(job_id)
+
+            self._skill_masks.pop(job_id, None)
+            for skill_id in self._skill_ids.pop(job_id).tolist():
+                postings = self._by_skill.get(skill_id)
+                if postings is not None:
+                    postings.discard(job_id)
+                    if not postings:
+                        del self._by_skill[skill_id]
+
+            postings = self._by_parish.get(get_parish_index(job.get('parish')))
+            if postings is not None:
+                postings.discard(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    def skill_ids(self, job: Dict) -> np.ndarray:
+        """Sorted interned skill IDs required by a job, reusing the indexed copy"""
+        skill_ids = self._skill_ids.get(job['id'])
+        if skill_ids is None:
+            skill_ids = skill_vocab.ids(job.get('required_skills'))
+        return skill_ids
+
+    def skill_mask(self, job: Dict) -> int:
+        """Bitset of a job's required skills, reusing the indexed copy"""
+        mask = self._skill_masks.get(job['id'])
+        if mask is None:
+            mask = skill_vocab.mask(job.get('required_skills'))
+        return mask
+
+    def all_jobs(self) -> List[Dict]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Dict, float]]:
+        """Active jobs within the radius with their distances, nearest first"""
+        with self._lock:
+            return [(self._jobs[job_id], distance) for job_id, distance in self._geo.within(lat, lon, radius_km)]
+
+    def candidates(
+        self,
+        skills: List[str],
+        parish: Optional[str] = None,
+        include_parish: bool = True,
+        location: Optional[Tuple[float, float]] = None,
+        radius_km: float = 10
+    ) -> List[Dict]:
+        """Active jobs sharing a skill with the user, plus open and nearby jobs.
+
+        Nearby means the same parish, and with a `location` also anything
+        within `radius_km`. Jobs come back in the order they were indexed so
+        ranking ties are resolved the same way on every call.
+        """
+        with self._lock:
+            job_ids = set(self._open_jobs)
+            for skill_id in skill_vocab.known_ids(skills).tolist():
+                job_ids.update(self._by_skill.get(skill_id, ()))
+
+            if include_parish and parish:
+                job_ids.update(self._by_parish.get(get_parish_index(parish), ()))
+            if include_parish and location:
+                job_ids.update(job_id for job_id, _ in self._geo.within(*location, radius_km))
+
+            ordered = sorted(job_ids, key=self._order.__getitem__)
+            return [self._jobs[job_id] for job_id in ordered]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+job_index = JobIndex()
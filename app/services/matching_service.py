@@ -1,88 +1,506 @@
-from typing import List, Dict
-from app.utils.parish_data import get_parish_coordinates, calculate_distance
+from typing import Iterator, List, Dict, Optional, Tuple
 from app.services.firebase_service import firebase_service
+from app.services.job_index import job_index
+from app.services.recommendation_cache import recommendation_cache, profile_version
+from app.services.user_index import user_index
+from app.services.text_index import text_index
+from app.services.similar_jobs import similar_jobs
+from app.services.gig_pool import gig_pool
+from app.utils.parish_data import get_parish_index, parish_distances_to, parishes_within, UNKNOWN_PARISH
+from app.utils.skill_vocab import skill_vocab
+from app.utils.town_data import location_of
+from app.config import get_settings
+from app.services.scoring import (
+    JobBatch, TopK, calculate_skill_match, combine_scores, coordinates, refine_distances,
+    score_gigs, score_job, score_jobs, score_matrix, skill_matrix, top_k_indices, DEFAULT_MAX_DISTANCE_KM
+)
+from datetime import datetime, timedelta
 import numpy as np
+import time
+
+settings = get_settings()
+
+SNAPSHOT_CLOCK_SKEW = timedelta(minutes=5)
 
 class MatchingService:
     def __init__(self):
         self.firebase = firebase_service
+        self.job_index = job_index
+        self.cache = recommendation_cache
+        self.user_index = user_index
+        self.text_index = text_index
+        self.similar_jobs = similar_jobs
+        self.gig_pool = gig_pool
     
     def calculate_skill_match(self, user_skills: List[str], required_skills: List[str]) -> float:
-        if not required_skills:
-            return 1.0
-        
-        user_skills_lower = [s.lower() for s in user_skills]
-        required_skills_lower = [s.lower() for s in required_skills]
-        
-        matches = sum(1 for skill in required_skills_lower if skill in user_skills_lower)
-        return matches / len(required_skills_lower)
+        return calculate_skill_match(user_skills, required_skills)
     
     def calculate_match_score(
         self,
         user: Dict,
         job: Dict,
-        max_distance_km: float = 50
+        max_distance_km: float = DEFAULT_MAX_DISTANCE_KM
     ) -> Dict:
-        # Get coordinates
-        user_coords = get_parish_coordinates(user['parish'])
-        job_coords = get_parish_coordinates(job['parish'])
-        
-        if not user_coords or not job_coords:
-            distance = 0
-        else:
-            distance = calculate_distance(
-                user_coords['lat'], user_coords['lon'],
-                job_coords['lat'], job_coords['lon']
-            )
-        
-        # Calculate skill match
-        skill_match = self.calculate_skill_match(
-            user.get('skills', []),
-            job.get('required_skills', [])
+        text_similarity = self.text_index.similarity(user.get('skills', []), [job])[0]
+        final_score, skill_match, distance = score_job(
+            user, job, max_distance_km, text_similarity,
+            user_mask=self.user_index.skill_mask(user),
+            job_mask=self.job_index.skill_mask(job)
         )
-        
-        # Distance score (closer is better)
-        distance_score = max(0, 1 - (distance / max_distance_km))
-        
-        # Combined score (weighted)
-        final_score = (skill_match * 0.6) + (distance_score * 0.4)
-        
+        return self._build_match(user, job, final_score, distance, skill_match, text_similarity)
+    
+    def _build_match(
+        self,
+        user: Dict,
+        job: Dict,
+        score: float,
+        distance: float,
+        skill_match: float,
+        text_similarity: float = 0.0,
+        explain: bool = True
+    ) -> Dict:
+        """Result dict for one scored job; reasons are only formatted when `explain` is set"""
+        reasons = self._match_reasons(user, job, distance, skill_match, text_similarity) if explain else []
+        return {
+            'job_id': job['id'],
+            'score': float(score),
+            'distance_km': float(distance),
+            'skill_match_percentage': float(skill_match) * 100,
+            'reasons': reasons,
+            'job_title': job['title'],
+            'parish': job['parish'],
+            'pay': job['pay']
+        }
+    
+    def _match_reasons(
+        self,
+        user: Dict,
+        job: Dict,
+        distance: float,
+        skill_match: float,
+        text_similarity: float
+    ) -> List[str]:
         reasons = []
         if skill_match > 0.7:
             reasons.append(f"Strong skill match ({skill_match*100:.0f}%)")
+        if text_similarity > 0.3:
+            reasons.append("Job description fits your skills")
         if distance < 20:
             reasons.append(f"Close proximity ({distance:.1f}km)")
-        if user['parish'] == job['parish']:
+        if user.get('parish') == job['parish']:
             reasons.append("Same parish")
+        return reasons
+    
+    def rank_jobs(
+        self,
+        user: Dict,
+        jobs: List[Dict],
+        limit: int = 10,
+        skill_ids: Optional[List[np.ndarray]] = None,
+        explain: bool = True
+    ) -> List[Dict]:
+        """Score all jobs in one vectorized pass and build matches for the top results only"""
+        if not jobs:
+            return []
+        
+        # Numeric phase: arrays and indices only
+        batch = JobBatch(jobs, skill_ids)
+        text_similarity = self.text_index.similarity(user.get('skills', []), jobs)
+        scores, skill_match, distance = score_jobs(user, batch, text_similarity=text_similarity)
+        top = top_k_indices(scores, limit)
+        
+        # Explain phase: result dicts for the returned top-k only
+        return [
+            self._build_match(user, jobs[i], scores[i], distance[i], skill_match[i], text_similarity[i], explain)
+            for i in top
+        ]
+    
+    def get_recommendations(self, user_id: str, limit: int = 10, explain: bool = True) -> List[Dict]:
+        # Read through the user cache, so checking the profile is usually free
+        user = self.firebase.get_user(user_id)
+        if not user:
+            return []
+        
+        cached = self.cache.get(user_id, user, limit)
+        if cached is not None:
+            return cached if explain else _without_reasons(cached)
+        
+        if settings.matching_use_precomputed:
+            precomputed = self._precomputed_recommendations(user, limit)
+            if precomputed is not None:
+                return precomputed if explain else _without_reasons(precomputed)
+        
+        if settings.matching_strategy == "stream":
+            matches = self.stream_recommendations(user, limit, explain)
+        else:
+            # Only score jobs that share a skill with the user (or are nearby)
+            self._ensure_job_index()
+            jobs = self.job_index.candidates(
+                user.get('skills', []),
+                user.get('parish'),
+                include_parish=settings.matching_parish_fallback,
+                location=location_of(user),
+                radius_km=settings.matching_nearby_radius_km
+            )
+            skill_ids = [self.job_index.skill_ids(job) for job in jobs]
+            matches = self.rank_jobs(user, jobs, limit, skill_ids, explain)
         
+        # Only explained lists are cached, so any later request can be served from them
+        if explain:
+            self.cache.put(user_id, user, limit, matches)
+        return matches
+    
+    def _precomputed_recommendations(self, user: Dict, limit: int) -> Optional[List[Dict]]:
+        """Serve the nightly list if it covers `limit`, was scored against the
+        user's current profile and every job is still active.
+        
+        Profile changes also delete the document (see
+        AsyncFirebaseService.update_user), but a write that lands while the
+        nightly run is saving can leave a stale list behind, so the stored
+        profile is checked too.
+        """
+        doc = self.firebase.get_precomputed_recommendations(user['id'])
+        if not doc or profile_version(doc.get('profile', {})) != profile_version(user):
+            return None
+        
+        matches = doc.get('matches', [])
+        if len(matches) < limit and len(matches) >= doc.get('top_n', 0):
+            return None
+        matches = matches[:limit]
+        
+        self._ensure_job_index()
+        if any(self.job_index.get(match['job_id']) is None for match in matches):
+            return None
+        
+        self.cache.put(user['id'], user, limit, matches)
+        return matches
+    
+    def stream_recommendations(self, user: Dict, limit: int = 10, explain: bool = True) -> List[Dict]:
+        """Page through all active jobs keeping only the best `limit` matches.
+        
+        Pages arrive in a stable (created_at, id) order and earlier jobs win
+        ties, so the result does not depend on Firestore's return order.
+        Scanning stops once the page budget is spent, or the time budget if
+        one is set (which makes the result depend on load). Text similarity
+        uses the fitted job text index, as the index strategy does, so both
+        strategies score a job the same.
+        """
+        self._ensure_job_index()
+        best = TopK(limit)
+        position = 0
+        budget_ms = settings.matching_stream_time_budget_ms
+        deadline = time.monotonic() + budget_ms / 1000 if budget_ms > 0 else None
+        
+        pages = self.firebase.iter_jobs(
+            {'status': 'active'},
+            page_size=settings.matching_stream_page_size
+        )
+        for page_number, jobs in enumerate(pages, start=1):
+            batch = JobBatch(jobs)
+            text_similarity = self.text_index.similarity(user.get('skills', []), jobs)
+            scores, skill_match, distance = score_jobs(user, batch, text_similarity=text_similarity)
+            for i in top_k_indices(scores, limit):
+                entry = (jobs[i], scores[i], distance[i], skill_match[i], text_similarity[i])
+                best.push(scores[i], position + i, entry)
+            position += len(jobs)
+            
+            out_of_time = deadline is not None and time.monotonic() >= deadline
+            if page_number >= settings.matching_stream_max_pages or out_of_time:
+                break
+        
+        return [self._build_match(user, *entry, explain=explain) for entry in best.items()]
+    
+    def get_candidates(
+        self,
+        job: Dict,
+        parishes: Optional[List[str]] = None,
+        page: int = 1,
+        page_size: int = 20,
+        explain: bool = True
+    ) -> List[Dict]:
+        """Rank job seekers for a job, best first, one page at a time"""
+        self._ensure_user_index()
+        required_skills = job.get('required_skills') or []
+        slots = self.user_index.candidate_slots(
+            required_skills,
+            job.get('parish'),
+            include_parish=settings.matching_parish_fallback,
+            parishes=parishes
+        )
+        
+        skill_match = self.user_index.skill_match(slots, required_skills)
+        distance = parish_distances_to(
+            self.user_index.parish_codes(slots),
+            get_parish_index(job.get('parish'))
+        )
+        job_location = location_of(job)
+        if job_location:
+            user_lat, user_lon = self.user_index.coordinates(slots)
+            distance = refine_distances(distance, user_lat, user_lon, *job_location)
+        text_similarity = self.text_index.profile_similarity(job, self.user_index.profiles(slots))
+        scores = combine_scores(skill_match, distance, text_similarity)
+        
+        start = (page - 1) * page_size
+        top = top_k_indices(scores, start + page_size)[start:]
+        return [
+            self._build_candidate(
+                self.user_index.user(slots[i]), job,
+                scores[i], distance[i], skill_match[i], text_similarity[i], explain
+            )
+            for i in top
+        ]
+    
+    def _build_candidate(
+        self,
+        user: Dict,
+        job: Dict,
+        score: float,
+        distance: float,
+        skill_match: float,
+        text_similarity: float = 0.0,
+        explain: bool = True
+    ) -> Dict:
+        match = self._build_match(user, job, score, distance, skill_match, text_similarity, explain)
         return {
-            'job_id': job['id'],
-            'score': final_score,
-            'distance_km': distance,
-            'skill_match_percentage': skill_match * 100,
-            'reasons': reasons,
-            'job_title': job['title'],
-            'parish': job['parish'],
-            'pay': job['pay']
+            'user_id': user['id'],
+            'full_name': user.get('full_name', ''),
+            'parish': user.get('parish', ''),
+            'skills': user.get('skills', []),
+            'score': match['score'],
+            'distance_km': match['distance_km'],
+            'skill_match_percentage': match['skill_match_percentage'],
+            'reasons': match['reasons']
         }
     
-    def get_recommendations(self, user_id: str, limit: int = 10) -> List[Dict]:
-        # Get user data
+    def load_batch(
+        self,
+        user_ids: Optional[List[str]] = None,
+        job_ids: Optional[List[str]] = None,
+        user_parishes: Optional[List[str]] = None,
+        job_parishes: Optional[List[str]] = None
+    ):
+        """Load both sides of a bulk match with one batched read each"""
+        if user_ids:
+            users = self.firebase.get_users_by_ids(user_ids)
+        else:
+            users = self.firebase.get_users({'role': 'job_seeker'})
+        
+        if job_ids:
+            jobs = self.firebase.get_jobs_by_ids(job_ids)
+        else:
+            jobs = self.firebase.get_jobs({'status': 'active'}, limit=None)
+        
+        if user_parishes:
+            wanted = {get_parish_index(p) for p in user_parishes}
+            users = [u for u in users if get_parish_index(u.get('parish')) in wanted]
+        if job_parishes:
+            wanted = {get_parish_index(p) for p in job_parishes}
+            jobs = [j for j in jobs if get_parish_index(j.get('parish')) in wanted]
+        
+        return users, jobs
+    
+    def batch_match(
+        self,
+        users: List[Dict],
+        jobs: List[Dict],
+        top_k: int = 10,
+        explain: bool = False
+    ) -> Iterator[Dict]:
+        """Score every user against every job and yield the top-k per user.
+        
+        Users are scored in chunks so the users x jobs matrices stay within
+        `batch_matching_max_cells`. With `explain`, matches are built like
+        get_recommendations results, reasons and job details included.
+        """
+        batch = JobBatch(jobs)
+        user_skill_ids = [skill_vocab.known_ids(user.get('skills')) for user in users]
+        n_skills = len(skill_vocab)
+        
+        user_skills = skill_matrix(user_skill_ids, n_skills)
+        job_skills = batch.skill_matrix(n_skills).T.tocsr()
+        user_parishes = np.fromiter(
+            (get_parish_index(user.get('parish')) for user in users),
+            dtype=np.int64,
+            count=len(users)
+        )
+        user_lat, user_lon = coordinates(users)
+        profiles = self.text_index.profile_vectors([user.get('skills') or [] for user in users])
+        job_text = self.text_index.job_vectors(jobs).T.tocsr()
+        
+        chunk_size = max(1, settings.batch_matching_max_cells // max(1, len(jobs)))
+        for start in range(0, len(users), chunk_size):
+            stop = start + chunk_size
+            text_similarity = (profiles[start:stop] @ job_text).toarray()
+            scores, skill_match, distance = score_matrix(
+                user_skills[start:stop], user_parishes[start:stop],
+                job_skills, batch, text_similarity,
+                user_lat=user_lat[start:stop], user_lon=user_lon[start:stop]
+            )
+            # Stable sort, so ties go to the earlier job
+            top = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+            
+            for row, user in enumerate(users[start:stop]):
+                if explain:
+                    yield {
+                        'user_id': user['id'],
+                        'matches': [
+                            self._build_match(
+                                user, jobs[j], scores[row, j], distance[row, j],
+                                skill_match[row, j], text_similarity[row, j], explain
+                            )
+                            for j in top[row]
+                        ]
+                    }
+                    continue
+                yield {
+                    'user_id': user['id'],
+                    'matches': [
+                        {
+                            'job_id': jobs[j]['id'],
+                            'score': float(scores[row, j]),
+                            'distance_km': float(distance[row, j]),
+                            'skill_match_percentage': float(skill_match[row, j]) * 100
+                        }
+                        for j in top[row]
+                    ]
+                }
+    
+    def get_gig_recommendations(self, user_id: str, limit: int = 10, explain: bool = True) -> List[Dict]:
+        """Rank available gigs near the user by skills, distance and difficulty"""
         user = self.firebase.get_user(user_id)
         if not user:
             return []
         
-        # Get all active jobs
-        jobs = self.firebase.get_jobs({'status': 'active'}, limit=100)
+        self._ensure_gig_pool()
+        parish = get_parish_index(user.get('parish'))
+        if parish == UNKNOWN_PARISH:
+            gigs = self.gig_pool.gigs()
+        else:
+            # Gigs with no known parish are 0km from everyone, as with jobs
+            nearby = parishes_within(parish, settings.gig_recommendation_radius_km).tolist()
+            gigs = self.gig_pool.gigs(nearby + [UNKNOWN_PARISH])
+        if not gigs:
+            return []
         
-        # Calculate scores for all jobs
-        matches = []
-        for job in jobs:
-            match = self.calculate_match_score(user, job)
-            matches.append(match)
+        text_similarity = self.text_index.similarity(user.get('skills', []), gigs)
+        scores, distance, difficulty_fit = score_gigs(user, gigs, text_similarity)
+        return [
+            self._build_gig_match(
+                user, gigs[i], scores[i], distance[i], text_similarity[i], difficulty_fit[i], explain
+            )
+            for i in top_k_indices(scores, limit)
+        ]
+    
+    def _build_gig_match(
+        self,
+        user: Dict,
+        gig: Dict,
+        score: float,
+        distance: float,
+        text_similarity: float,
+        difficulty_fit: float,
+        explain: bool = True
+    ) -> Dict:
+        reasons = []
+        if explain:
+            if text_similarity > 0.3:
+                reasons.append("Gig fits your skills")
+            if difficulty_fit >= 1:
+                reasons.append(f"Right difficulty for you ({gig.get('difficulty')})")
+            if distance < 20:
+                reasons.append(f"Close proximity ({distance:.1f}km)")
+            if user.get('parish') == gig.get('parish'):
+                reasons.append("Same parish")
         
-        # Sort by score and return top matches
-        matches.sort(key=lambda x: x['score'], reverse=True)
-        return matches[:limit]
+        return {
+            'gig_id': gig['id'],
+            'score': float(score),
+            'distance_km': float(distance),
+            'reasons': reasons,
+            'title': gig.get('title', ''),
+            'parish': gig.get('parish', ''),
+            'payment': gig.get('payment', 0),
+            'difficulty': gig.get('difficulty', '')
+        }
+    
+    def nearby_jobs(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        limit: int = 20,
+        cursor: Optional[List] = None
+    ) -> Tuple[List[Dict], Optional[List]]:
+        """Active jobs within the radius, nearest first, one page at a time"""
+        self._ensure_job_index()
+        return _page_by_distance(self.job_index.within(lat, lon, radius_km), limit, cursor)
+    
+    def nearby_gigs(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        limit: int = 20,
+        cursor: Optional[List] = None
+    ) -> Tuple[List[Dict], Optional[List]]:
+        """Available gigs within the radius, nearest first, one page at a time"""
+        self._ensure_gig_pool()
+        return _page_by_distance(self.gig_pool.within(lat, lon, radius_km), limit, cursor)
+    
+    def get_similar_jobs(self, job: Dict, limit: int = 10) -> List[Dict]:
+        self._ensure_similar_jobs()
+        return self.similar_jobs.query(job, limit)
+    
+    def catch_up_similar_jobs(self, since: datetime):
+        """Apply job writes made after a similar-jobs snapshot was saved"""
+        try:
+            # The margin covers clock skew between the writers and this process
+            jobs = self.firebase.get_jobs_updated_since(since - SNAPSHOT_CLOCK_SKEW)
+        except Exception as e:
+            print(f"⚠️  Similar-jobs catch-up failed, rebuilding on first use: {e}")
+            self.similar_jobs.loaded = False
+            return
+        for job in jobs:
+            self.similar_jobs.add(job)
+    
+    def _ensure_job_index(self):
+        if not self.job_index.loaded:
+            jobs = self.firebase.get_jobs({'status': 'active'}, limit=None)
+            self.job_index.load(jobs)
+            self.text_index.load(jobs)
+    
+    def _ensure_similar_jobs(self):
+        if not self.similar_jobs.loaded:
+            self._ensure_job_index()
+            self.similar_jobs.load(self.job_index.all_jobs())
+    
+    def _ensure_gig_pool(self):
+        if not self.gig_pool.loaded or self.gig_pool.expired():
+            self.gig_pool.load(self.firebase.get_available_gigs())
+    
+    def _ensure_user_index(self):
+        if not self.user_index.loaded:
+            self.user_index.load(self.firebase.get_users({'role': 'job_seeker'}))
+
+
+def _page_by_distance(
+    hits: List[Tuple[Dict, float]],
+    limit: int,
+    cursor: Optional[List] = None
+) -> Tuple[List[Dict], Optional[List]]:
+    """Page of ``hits`` (sorted by distance, then ID) after the `cursor` key.
+
+    Returns the items with a `distance_km` field and the next cursor key,
+    or None on the last page.
+    """
+    if cursor is not None:
+        after = (cursor[0], cursor[1])
+        hits = [(item, distance) for item, distance in hits if (distance, item['id']) > after]
+    page = [{**item, 'distance_km': distance} for item, distance in hits[:limit]]
+    next_cursor = [page[-1]['distance_km'], page[-1]['id']] if len(hits) > limit else None
+    return page, next_cursor
+
+def _without_reasons(matches: List[Dict]) -> List[Dict]:
+    return [{**match, 'reasons': []} for match in matches]
 
 matching_service = MatchingService()
\ No newline at end of file
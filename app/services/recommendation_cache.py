@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.services.scoring import score_job
+from app.utils.skill_vocab import skill_vocab
+from app.utils.town_data import location_of
+import hashlib
+import threading
+import time
+
+settings = get_settings()
+
+
+def profile_version(user: Dict) -> str:
+    """Fingerprint of the profile fields that affect matching"""
+    skills = sorted({s.lower() for s in user.get('skills') or []})
+    key = f"{(user.get('parish') or '').lower()}|{location_of(user)}|{'|'.join(skills)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    """Per-user recommendation lists with LRU eviction and a TTL.
+
+    Entries are stored against the user's profile version and dropped
+    selectively on writes: when the profile changes, when a new active job
+    would enter the cached top-k, or when a cached job stops being active.
+    Reads compare the version too, so a profile changed by another process
+    is a miss rather than stale results until the TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def get(self, user_id: str, user: Dict, limit: int) -> Optional[List[Dict]]:
+        """Cached matches for `user`; a miss if they were scored against another profile"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            # The profile may have changed through another process or straight in Firestore
+            if entry['expires_at'] <= time.monotonic() or entry['version'] != profile_version(user):
+                del self._entries[user_id]
+                return None
+            # A shorter cached list can only serve the request if nothing was cut off
+            if entry['limit'] < limit and len(entry['matches']) >= entry['limit']:
+                return None
+            self._entries.move_to_end(user_id)
+            return [dict(match) for match in entry['matches'][:limit]]
+
+    def put(self, user_id: str, user: Dict, limit: int, matches: List[Dict]):
+        with self._lock:
+            self._entries[user_id] = {
+                'version': profile_version(user),
+                'profile': matching_profile(user),
+                'skill_mask': skill_vocab.known_mask(user.get('skills')),
+                'vocab_size': len(skill_vocab),
+                'limit': limit,
+                'matches': [dict(match) for match in matches],
+                'job_ids': {match['job_id'] for match in matches},
+                'expires_at': time.monotonic() + self.ttl_seconds
+            }
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str, user: Optional[Dict] = None):
+        """Drop a user's entry, unless `user` shows the matching profile is unchanged"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            if user is not None and profile_version(user) == entry['version']:
+                return
+            del self._entries[user_id]
+
+    def invalidate_for_job(self, job: Dict):
+        """Drop entries whose results could change because of this job"""
+        job_id = job['id']
+        active = job.get('status', 'active') == 'active'
+        job_mask = skill_vocab.mask(job.get('required_skills'))
+        vocab_size = len(skill_vocab)
+        with self._lock:
+            stale = []
+            for user_id, entry in self._entries.items():
+                if job_id in entry['job_ids']:
+                    stale.append(user_id)
+                elif active:
+                    matches = entry['matches']
+                    if len(matches) < entry['limit']:
+                        stale.append(user_id)
+                        continue
+                    # Skills interned since the entry was stored are missing from its mask
+                    if entry['vocab_size'] != vocab_size:
+                        entry['skill_mask'] = skill_vocab.known_mask(entry['profile'].get('skills'))
+                        entry['vocab_size'] = vocab_size
+                    # Upper bound: assume the job's text is a perfect fit
+                    score, _, _ = score_job(
+                        entry['profile'], job, text_similarity=1.0,
+                        user_mask=entry['skill_mask'], job_mask=job_mask
+                    )
+                    # Newer jobs lose ties, so only a strictly better score gets in
+                    if score > matches[-1]['score']:
+                        stale.append(user_id)
+            for user_id in stale:
+                del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def matching_profile(user: Dict) -> Dict:
+    """The fields scoring reads from a user, kept for invalidation checks"""
+    profile = {'parish': user.get('parish'), 'skills': list(user.get('skills') or [])}
+    location = location_of(user)
+    if location:
+        profile['lat'], profile['lon'] = location
+    return profile
+
+
+recommendation_cache = RecommendationCache(
+    max_entries=settings.recommendation_cache_size,
+    ttl_seconds=settings.recommendation_cache_ttl_seconds
+)
@@ -0,0 +1,328 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.parish_data import (
+    get_parish_index, parish_distance, parish_distances, parish_distance_grid
+)
+from app.utils.skill_vocab import normalize_skill, skill_vocab
+from app.utils.town_data import haversine_km, location_of
+import heapq
+import numpy as np
+import scipy.sparse as sp
+
+SKILL_WEIGHT = 0.5
+DISTANCE_WEIGHT = 0.3
+TEXT_WEIGHT = 0.2
+DEFAULT_MAX_DISTANCE_KM = 50
+
+# Gigs have no required skills, so skills are matched on the gig's text
+GIG_TEXT_WEIGHT = 0.5
+GIG_DISTANCE_WEIGHT = 0.3
+GIG_DIFFICULTY_WEIGHT = 0.2
+GIG_DIFFICULTY_LEVELS = {'easy': 0, 'medium': 1, 'hard': 2}
+GIG_LEVEL_UP_AFTER = 5  # completed gigs before harder gigs score as a full fit
+
+
+def calculate_skill_match(user_skills: List[str], required_skills: List[str]) -> float:
+    required = {normalize_skill(skill) for skill in required_skills or ()}
+    if not required:
+        return 1.0
+    held = {normalize_skill(skill) for skill in user_skills or ()}
+    return len(required & held) / len(required)
+
+
+def skill_mask_match(user_mask: int, required_mask: int) -> float:
+    """Fraction of required skills held, from interned skill bitsets."""
+    if not required_mask:
+        return 1.0
+    return (user_mask & required_mask).bit_count() / required_mask.bit_count()
+
+
+def score_job(
+    user: Dict,
+    job: Dict,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+    text_similarity: float = 0.0,
+    user_mask: Optional[int] = None,
+    job_mask: Optional[int] = None
+) -> Tuple[float, float, float]:
+    """Score a single job for a user; returns ``(score, skill_match, distance_km)``.
+
+    Skill bitsets already held by an index can be passed as `user_mask` and
+    `job_mask`; otherwise they are built from the skill lists.
+    """
+    origin, destination = location_of(user), location_of(job)
+    if origin and destination:
+        distance = float(haversine_km(*origin, *destination))
+    else:
+        # Unknown parishes are 0km apart
+        distance = parish_distance(
+            get_parish_index(user.get('parish')),
+            get_parish_index(job.get('parish'))
+        )
+
+    # The job's skills are interned first so every one counts as required
+    if job_mask is None:
+        job_mask = skill_vocab.mask(job.get('required_skills'))
+    if user_mask is None:
+        user_mask = skill_vocab.known_mask(user.get('skills'))
+    match = skill_mask_match(user_mask, job_mask)
+
+    # Distance score (closer is better)
+    distance_score = max(0, 1 - (distance / max_distance_km))
+
+    # Combined score (weighted)
+    score = (match * SKILL_WEIGHT) + (distance_score * DISTANCE_WEIGHT) + (text_similarity * TEXT_WEIGHT)
+    return score, match, distance
+
+
+class JobBatch:
+    """Column-oriented view of a list of jobs used for vectorized scoring.
+
+    Required skills are stored as a sparse skill-incidence matrix in
+    coordinate form: entry ``k`` says job ``skill_rows[k]`` requires the
+    interned skill ``skill_cols[k]``. Callers that already hold interned
+    skill IDs (e.g. JobIndex) can pass them to skip re-interning.
+    Coordinates are NaN for jobs with no town or lat/lon.
+    """
+
+    def __init__(self, jobs: List[Dict], skill_ids: Optional[List[np.ndarray]] = None):
+        self.jobs = jobs
+        self.size = len(jobs)
+
+        self.parish_codes = np.fromiter(
+            (get_parish_index(job.get('parish')) for job in jobs),
+            dtype=np.int64,
+            count=self.size
+        )
+        self.lat, self.lon = coordinates(jobs)
+
+        if skill_ids is None:
+            skill_ids = [skill_vocab.ids(job.get('required_skills')) for job in jobs]
+        self.required_counts = np.fromiter(
+            (len(ids) for ids in skill_ids),
+            dtype=np.int64,
+            count=self.size
+        )
+        self.skill_rows = np.repeat(np.arange(self.size, dtype=np.int64), self.required_counts)
+        self.skill_cols = np.concatenate(skill_ids) if self.size else np.empty(0, dtype=np.int64)
+
+    def skill_matrix(self, n_skills: int) -> sp.csr_matrix:
+        """Jobs x skills incidence matrix"""
+        return sp.csr_matrix(
+            (np.ones(len(self.skill_cols)), (self.skill_rows, self.skill_cols)),
+            shape=(self.size, n_skills)
+        )
+
+
+def coordinates(records: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude arrays for users/jobs/gigs, NaN where unknown"""
+    points = np.full((len(records), 2), np.nan)
+    for i, record in enumerate(records):
+        point = location_of(record)
+        if point:
+            points[i] = point
+    return points[:, 0], points[:, 1]
+
+
+def refine_distances(
+    distance: np.ndarray,
+    origin_lat: np.ndarray,
+    origin_lon: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray
+) -> np.ndarray:
+    """Replace parish-centroid distances with point distances where both ends have coordinates.
+
+    Origin and destination arrays broadcast against each other and `distance`.
+    """
+    known = ~(np.isnan(origin_lat) | np.isnan(lat))
+    if not np.any(known):
+        return distance
+    return np.where(known, haversine_km(origin_lat, origin_lon, lat, lon), distance)
+
+
+def skill_matrix(skill_ids: List[np.ndarray], n_skills: int) -> sp.csr_matrix:
+    """Incidence matrix with one row per skill ID array"""
+    counts = [len(ids) for ids in skill_ids]
+    indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    indices = np.concatenate(skill_ids) if skill_ids else np.empty(0, dtype=np.int64)
+    return sp.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(skill_ids), n_skills))
+
+
+def skill_match_scores(batch: JobBatch, user_skills: List[str]) -> np.ndarray:
+    """Fraction of each job's required skills held by the user."""
+    has_skill = np.isin(batch.skill_cols, skill_vocab.known_ids(user_skills))
+    matched = np.bincount(batch.skill_rows, weights=has_skill, minlength=batch.size)
+    required = batch.required_counts
+    # Jobs with no required skills are a full match
+    return np.where(required > 0, matched / np.maximum(required, 1), 1.0)
+
+
+def score_jobs(
+    user: Dict,
+    batch: JobBatch,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+    text_similarity: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score every job in the batch for a user.
+
+    Returns ``(scores, skill_match, distance_km)`` arrays aligned with
+    ``batch.jobs``.
+    """
+    skill_match = skill_match_scores(batch, user.get('skills', []))
+    distance = parish_distances(get_parish_index(user.get('parish')), batch.parish_codes)
+    origin = location_of(user)
+    if origin:
+        distance = refine_distances(distance, origin[0], origin[1], batch.lat, batch.lon)
+    scores = combine_scores(skill_match, distance, text_similarity, max_distance_km)
+    return scores, skill_match, distance
+
+
+def combine_scores(
+    skill_match: np.ndarray,
+    distance: np.ndarray,
+    text_similarity: Optional[np.ndarray] = None,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM
+) -> np.ndarray:
+    """Weighted final score from skill match, distance and text similarity arrays."""
+    # Distance score (closer is better)
+    distance_score = np.maximum(0, 1 - (distance / max_distance_km))
+    scores = (skill_match * SKILL_WEIGHT) + (distance_score * DISTANCE_WEIGHT)
+    if text_similarity is not None:
+        scores = scores + (text_similarity * TEXT_WEIGHT)
+    return scores
+
+
+def score_matrix(
+    user_skills: sp.csr_matrix,
+    user_parishes: np.ndarray,
+    job_skills: sp.csr_matrix,
+    batch: JobBatch,
+    text_similarity: Optional[np.ndarray] = None,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+    user_lat: Optional[np.ndarray] = None,
+    user_lon: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score many users against every job in a batch.
+
+    `user_skills` is a users x skills incidence matrix and `job_skills` the
+    transposed (skills x jobs) incidence matrix of `batch`. Returns users x
+    jobs ``(scores, skill_match, distance_km)`` arrays.
+    """
+    matched = (user_skills @ job_skills).toarray()
+    required = batch.required_counts
+    # Jobs with no required skills are a full match
+    skill_match = np.where(required > 0, matched / np.maximum(required, 1), 1.0)
+    distance = parish_distance_grid(user_parishes, batch.parish_codes)
+    if user_lat is not None:
+        distance = refine_distances(distance, user_lat[:, None], user_lon[:, None], batch.lat, batch.lon)
+    scores = combine_scores(skill_match, distance, text_similarity, max_distance_km)
+    return scores, skill_match, distance
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first.
+
+    Ties keep their original order so results match a stable sort.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
+
+class TopK:
+    """Bounded min-heap holding the best ``k`` items seen so far.
+
+    Items are ranked by score, then by arrival position, so earlier items
+    win ties no matter how the input is split into pages.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Any]] = []
+
+    def push(self, score: float, position: int, item: Any):
+        if self.k <= 0:
+            return
+        # Positions are unique, so the item itself is never compared
+        entry = (float(score), -position, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        """Items best first"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def gig_difficulty(gig: Dict) -> str:
+    """The gig's difficulty as a GIG_DIFFICULTY_LEVELS key; unknown values count as medium"""
+    difficulty = str(gig.get('difficulty') or '').strip().lower()
+    return difficulty if difficulty in GIG_DIFFICULTY_LEVELS else 'medium'
+
+
+def preferred_gig_level(user: Dict) -> float:
+    """Difficulty level a user is ready for, from the gigs they have completed.
+
+    Starts at the average level of past gigs (easy with no history) and
+    steps up by up to one level as completed gigs accumulate.
+    """
+    history = user.get('gig_difficulty_counts') or {}
+    done = sum(history.values())
+    level = 0.0
+    if done:
+        level = sum(GIG_DIFFICULTY_LEVELS.get(d, 1) * n for d, n in history.items()) / done
+    completed = user.get('completed_gigs') or done
+    level += min(1.0, completed / GIG_LEVEL_UP_AFTER)
+    return min(level, max(GIG_DIFFICULTY_LEVELS.values()))
+
+
+def score_gigs(
+    user: Dict,
+    gigs: List[Dict],
+    text_similarity: np.ndarray,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score gigs for a user.
+
+    Returns ``(scores, distance_km, difficulty_fit)`` arrays aligned with
+    ``gigs``. Unknown difficulties count as medium.
+    """
+    parish_codes = np.fromiter(
+        (get_parish_index(gig.get('parish')) for gig in gigs),
+        dtype=np.int64,
+        count=len(gigs)
+    )
+    distance = parish_distances(get_parish_index(user.get('parish')), parish_codes)
+    origin = location_of(user)
+    if origin:
+        lat, lon = coordinates(gigs)
+        distance = refine_distances(distance, origin[0], origin[1], lat, lon)
+
+    levels = np.fromiter(
+        (GIG_DIFFICULTY_LEVELS[gig_difficulty(gig)] for gig in gigs),
+        dtype=np.float64,
+        count=len(gigs)
+    )
+    span = max(GIG_DIFFICULTY_LEVELS.values())
+    difficulty_fit = 1 - np.abs(levels - preferred_gig_level(user)) / span
+
+    distance_score = np.maximum(0, 1 - (distance / max_distance_km))
+    scores = (
+        (text_similarity * GIG_TEXT_WEIGHT)
+        + (distance_score * GIG_DISTANCE_WEIGHT)
+        + (difficulty_fit * GIG_DIFFICULTY_WEIGHT)
+    )
+    return scores, distance, difficulty_fit
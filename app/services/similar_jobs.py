@@ -0,0 +1,192 @@
+from typing import Dict, List, Optional, Set
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+from app.config import get_settings
+from app.services.text_index import job_text
+from datetime import datetime, timezone
+import json
+import os
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+settings = get_settings()
+
+# Job texts are short, so a smaller hash space keeps the projection matrix
+# dense enough for every term to land on several projected dimensions
+N_FEATURES = 2 ** 16
+PROJECTION_DENSITY = 1 / 8
+
+
+class SimilarJobsIndex:
+    """Random-projection LSH index over job text for "similar jobs" lookups.
+
+    Each job's hashed term vector is projected to a small dense vector with
+    a fixed-seed sparse random projection. The signs of the projection are
+    split into `n_tables` hash keys of `n_bits` each, so a query only
+    reranks the jobs sharing a bucket (or a bucket one bit away) with it.
+    Projections are deterministic, which lets the index be rebuilt from a
+    snapshot of the projected vectors instead of re-reading every job; the
+    caller then applies the jobs written since the snapshot's save time.
+    """
+
+    def __init__(self, n_tables: int = 8, n_bits: int = 12, seed: int = 42):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self._vectorizer = HashingVectorizer(
+            n_features=N_FEATURES,
+            alternate_sign=False,
+            stop_words='english'
+        )
+        self._projection = SparseRandomProjection(
+            n_components=n_tables * n_bits,
+            density=PROJECTION_DENSITY,
+            dense_output=True,
+            random_state=seed
+        ).fit(sp.csr_matrix((1, N_FEATURES)))
+        self._bit_weights = 1 << np.arange(n_bits, dtype=np.int64)
+        self._lock = threading.RLock()
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._keys: Dict[str, List[int]] = {}
+        self._summaries: Dict[str, Dict] = {}
+        self._tables: List[Dict[int, Set[str]]] = [{} for _ in range(n_tables)]
+        self.loaded = False
+
+    def project(self, jobs: List[Dict]) -> np.ndarray:
+        """Unit-length projected vectors for a list of jobs"""
+        vectors = self._projection.transform(self._vectorizer.transform([job_text(job) for job in jobs]))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (vectors / norms).astype(np.float32)
+
+    def load(self, jobs: List[Dict]):
+        jobs = [job for job in jobs if job.get('status', 'active') == 'active']
+        vectors = self.project(jobs) if jobs else np.empty((0, self.n_tables * self.n_bits), dtype=np.float32)
+        self._load_vectors([job['id'] for job in jobs], vectors, [_summary(job) for job in jobs])
+
+    def add(self, job: Dict):
+        if job.get('status', 'active') != 'active':
+            self.remove(job['id'])
+            return
+        self._insert(job['id'], self.project([job])[0], _summary(job))
+
+    def remove(self, job_id: str):
+        with self._lock:
+            keys = self._keys.pop(job_id, None)
+            if keys is None:
+                return
+            del self._vectors[job_id]
+            del self._summaries[job_id]
+            for table, key in zip(self._tables, keys):
+                bucket = table.get(key)
+                if bucket is not None:
+                    bucket.discard(job_id)
+                    if not bucket:
+                        del table[key]
+
+    def query(self, job: Dict, limit: int = 10) -> List[Dict]:
+        """Most similar indexed jobs, best first, excluding the job itself"""
+        with self._lock:
+            vector = self._vectors.get(job['id'])
+        if vector is None:
+            vector = self.project([job])[0]
+
+        keys = self._hash(vector)
+        candidates: Set[str] = set()
+        with self._lock:
+            for table, key in zip(self._tables, keys):
+                # Multi-probe: also look at buckets one bit away
+                for probe in [key] + [key ^ int(bit) for bit in self._bit_weights]:
+                    candidates.update(table.get(probe, ()))
+            candidates.discard(job['id'])
+            job_ids = sorted(candidates)
+            if not job_ids:
+                return []
+            matrix = np.stack([self._vectors[job_id] for job_id in job_ids])
+            summaries = [self._summaries[job_id] for job_id in job_ids]
+
+        similarity = matrix @ vector
+        order = np.lexsort((np.arange(len(job_ids)), -similarity))[:limit]
+        return [{**summaries[i], 'similarity': float(similarity[i])} for i in order]
+
+    def save_snapshot(self, path: str):
+        # Taken before copying, so a write racing the save is caught up on load
+        saved_at = datetime.now(timezone.utc)
+        with self._lock:
+            job_ids = list(self._vectors)
+            vectors = np.stack([self._vectors[job_id] for job_id in job_ids]) if job_ids else np.empty((0, 0))
+            summaries = [self._summaries[job_id] for job_id in job_ids]
+
+        # Per process, so workers saving at the same shutdown don't share a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                params=np.array([self.n_tables, self.n_bits, self.seed, N_FEATURES]),
+                job_ids=np.array(job_ids, dtype=str),
+                vectors=vectors,
+                summaries=np.array(json.dumps(summaries)),
+                saved_at=np.array(saved_at.timestamp())
+            )
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str) -> Optional[datetime]:
+        """Rebuild the index from a snapshot.
+
+        Returns when the snapshot was saved, or None if it is missing or
+        incompatible. Jobs written after that time are not in the index.
+        """
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as snapshot:
+            params = [self.n_tables, self.n_bits, self.seed, N_FEATURES]
+            if 'saved_at' not in snapshot.files or snapshot['params'].tolist() != params:
+                return None
+            saved_at = datetime.fromtimestamp(float(snapshot['saved_at']), timezone.utc)
+            job_ids = snapshot['job_ids'].tolist()
+            vectors = snapshot['vectors'].astype(np.float32)
+            summaries = json.loads(str(snapshot['summaries']))
+
+        self._load_vectors(job_ids, vectors, summaries)
+        return saved_at
+
+    def _load_vectors(self, job_ids: List[str], vectors: np.ndarray, summaries: List[Dict]):
+        with self._lock:
+            self._vectors.clear()
+            self._keys.clear()
+            self._summaries.clear()
+            self._tables = [{} for _ in range(self.n_tables)]
+            for job_id, vector, summary in zip(job_ids, vectors, summaries):
+                self._insert(job_id, vector, summary)
+            self.loaded = True
+
+    def _insert(self, job_id: str, vector: np.ndarray, summary: Dict):
+        with self._lock:
+            self.remove(job_id)
+            keys = self._hash(vector)
+            self._vectors[job_id] = vector
+            self._keys[job_id] = keys
+            self._summaries[job_id] = summary
+            for table, key in zip(self._tables, keys):
+                table.setdefault(key, set()).add(job_id)
+
+    def _hash(self, vector: np.ndarray) -> List[int]:
+        bits = (vector > 0).reshape(self.n_tables, self.n_bits)
+        return (bits @ self._bit_weights).tolist()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+def _summary(job: Dict) -> Dict:
+    return {
+        'job_id': job['id'],
+        'title': job.get('title', ''),
+        'parish': job.get('parish', ''),
+        'pay': job.get('pay', 0)
+    }
+
+
+similar_jobs = SimilarJobsIndex()
@@ -0,0 +1,227 @@
+from typing import Dict, List, Optional, Tuple
+from sklearn.feature_extraction.text import HashingVectorizer
+from app.config import get_settings
+import numpy as np
+import scipy.sparse as sp
+import threading
+import time
+
+settings = get_settings()
+
+N_FEATURES = 2 ** 18
+
+
+def job_text(job: Dict) -> str:
+    return " ".join([
+        job.get('title') or "",
+        job.get('description') or "",
+        " ".join(job.get('required_skills') or [])
+    ])
+
+
+def profile_text(skills: List[str]) -> str:
+    return " ".join(skills or [])
+
+
+class JobTextIndex:
+    """Hashed TF-IDF vectors over active job titles, descriptions and skills.
+
+    Term counts come from a stateless HashingVectorizer, so adding a job
+    never needs a refit. Only the IDF weights and the stacked, normalized
+    matrix are rebuilt, on a background thread, once enough jobs have
+    changed. Jobs added since the last refit are weighted with the current
+    IDF and scored individually until the next refit folds them in.
+    """
+
+    def __init__(self, refit_threshold: int = 100, refit_interval_seconds: float = 60):
+        self.refit_threshold = refit_threshold
+        self.refit_interval_seconds = refit_interval_seconds
+        self._vectorizer = HashingVectorizer(
+            n_features=N_FEATURES,
+            alternate_sign=False,
+            norm=None,
+            stop_words='english'
+        )
+        self._lock = threading.Lock()
+        # Raw term counts per active job as (indices, counts)
+        self._counts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._idf = np.ones(N_FEATURES, dtype=np.float64)
+        self._matrix: Optional[sp.csr_matrix] = None
+        self._rows: Dict[str, int] = {}
+        self._pending: Dict[str, sp.csr_matrix] = {}
+        self._changes = 0
+        self._fitted_at = 0.0
+        self._refitting = False
+
+    def load(self, jobs: List[Dict]):
+        counts = self._vectorizer.transform([job_text(job) for job in jobs])
+        with self._lock:
+            self._counts = {
+                job['id']: (
+                    counts.indices[counts.indptr[i]:counts.indptr[i + 1]].copy(),
+                    counts.data[counts.indptr[i]:counts.indptr[i + 1]].copy()
+                )
+                for i, job in enumerate(jobs)
+            }
+        self.refit()
+
+    def add(self, job: Dict):
+        if job.get('status', 'active') != 'active':
+            self.remove(job['id'])
+            return
+
+        counts = self._vectorizer.transform([job_text(job)])
+        with self._lock:
+            self._counts[job['id']] = (counts.indices.copy(), counts.data.copy())
+            self._rows.pop(job['id'], None)
+            self._pending[job['id']] = _weigh(counts, self._idf)
+            self._changes += 1
+        self._maybe_refit()
+
+    def remove(self, job_id: str):
+        with self._lock:
+            if self._counts.pop(job_id, None) is None:
+                return
+            self._rows.pop(job_id, None)
+            self._pending.pop(job_id, None)
+            self._changes += 1
+        self._maybe_refit()
+
+    def similarity(self, skills: List[str], jobs: List[Dict]) -> np.ndarray:
+        """Cosine similarity between a skills profile and each job's text"""
+        scores = np.zeros(len(jobs), dtype=np.float64)
+        if not jobs or not skills:
+            return scores
+
+        with self._lock:
+            matrix, rows, pending, idf = self._matrix, self._rows, self._pending, self._idf
+
+        profile = _weigh(self._vectorizer.transform([profile_text(skills)]), idf)
+        if profile.nnz == 0:
+            return scores
+
+        positions = np.fromiter((rows.get(job['id'], -1) for job in jobs), dtype=np.int64, count=len(jobs))
+        fitted = positions >= 0
+        if matrix is not None and fitted.any():
+            # One sparse matrix-vector product over just the requested rows
+            scores[fitted] = (matrix[positions[fitted]] @ profile.T).toarray().ravel()
+
+        unfitted = []
+        for i in np.flatnonzero(~fitted):
+            vector = pending.get(jobs[i]['id'])
+            if vector is not None:
+                scores[i] = vector.multiply(profile).sum()
+            else:
+                unfitted.append(i)
+
+        if unfitted:
+            counts = self._vectorizer.transform([job_text(jobs[i]) for i in unfitted])
+            scores[unfitted] = (_weigh(counts, idf) @ profile.T).toarray().ravel()
+
+        self._maybe_refit()
+        return scores
+
+    def profile_similarity(self, job: Dict, profiles: List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Cosine similarity between one job's text and many profiles' term counts.
+
+        `profiles` are `profile_counts` results, so callers can keep them
+        with the user and skip re-tokenizing on every query; they are
+        weighted with the current IDF here.
+        """
+        if not profiles:
+            return np.zeros(0, dtype=np.float64)
+        with self._lock:
+            idf = self._idf
+        vectors = _weigh(_stack(profiles), idf)
+        return (vectors @ self.job_vectors([job]).T).toarray().ravel()
+
+    def profile_counts(self, skills: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw hashed term counts of a skills profile as (indices, counts)"""
+        counts = self._vectorizer.transform([profile_text(skills)])
+        return counts.indices.copy(), counts.data.copy()
+
+    def job_vectors(self, jobs: List[Dict]) -> sp.csr_matrix:
+        """Normalized TF-IDF rows for jobs, weighted with the current IDF"""
+        with self._lock:
+            idf = self._idf
+        return _weigh(self._vectorizer.transform([job_text(job) for job in jobs]), idf)
+
+    def profile_vectors(self, profiles: List[List[str]]) -> sp.csr_matrix:
+        """Normalized TF-IDF rows for skills profiles, weighted with the current IDF"""
+        with self._lock:
+            idf = self._idf
+        return _weigh(self._vectorizer.transform([profile_text(skills) for skills in profiles]), idf)
+
+    def refit(self):
+        """Recompute IDF weights and rebuild the normalized job matrix"""
+        with self._lock:
+            job_ids = list(self._counts)
+            counts = [self._counts[job_id] for job_id in job_ids]
+            self._pending = {}
+            self._changes = 0
+
+        raw = _stack(counts)
+
+        # Smoothed IDF, as in sklearn's TfidfTransformer
+        document_frequency = np.bincount(raw.indices, minlength=N_FEATURES)
+        idf = np.log((1 + len(job_ids)) / (1 + document_frequency)) + 1
+        matrix = _weigh(raw, idf)
+
+        with self._lock:
+            self._idf = idf
+            self._matrix = matrix
+            # Jobs written while refitting stay pending until the next refit
+            self._rows = {
+                job_id: i for i, job_id in enumerate(job_ids)
+                if job_id in self._counts and job_id not in self._pending
+            }
+            self._fitted_at = time.monotonic()
+
+    def _maybe_refit(self):
+        with self._lock:
+            if self._refitting or self._changes == 0:
+                return
+            due = (
+                self._changes >= self.refit_threshold
+                or time.monotonic() - self._fitted_at >= self.refit_interval_seconds
+            )
+            if not due:
+                return
+            self._refitting = True
+
+        def run():
+            try:
+                self.refit()
+            finally:
+                self._refitting = False
+
+        threading.Thread(target=run, name="job-text-refit", daemon=True).start()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def _stack(counts: List[Tuple[np.ndarray, np.ndarray]]) -> sp.csr_matrix:
+    """One CSR row per (indices, counts) pair"""
+    lengths = [len(indices) for indices, _ in counts]
+    indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    indices = np.concatenate([i for i, _ in counts]) if counts else np.empty(0, dtype=np.int32)
+    data = np.concatenate([d for _, d in counts]) if counts else np.empty(0, dtype=np.float64)
+    return sp.csr_matrix((data, indices, indptr), shape=(len(counts), N_FEATURES))
+
+
+def _weigh(counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+    """Apply IDF weights and L2-normalize each row, touching only the nonzeros"""
+    weighted = sp.csr_matrix(counts, dtype=np.float64, copy=True)
+    weighted.data *= idf[weighted.indices]
+    rows = np.repeat(np.arange(weighted.shape[0]), np.diff(weighted.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=weighted.data ** 2, minlength=weighted.shape[0]))
+    norms[norms == 0] = 1
+    weighted.data /= norms[rows]
+    return weighted
+
+
+text_index = JobTextIndex(
+    refit_threshold=settings.text_index_refit_threshold,
+    refit_interval_seconds=settings.text_index_refit_interval_seconds
+)
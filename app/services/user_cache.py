@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.config import get_settings
+import copy
+import threading
+import time
+
+settings = get_settings()
+
+
+class UserCache:
+    """Read-through cache of user documents with LRU eviction and a TTL.
+
+    Missing users are cached too (as None, with a shorter TTL) so repeated
+    lookups of unknown ids don't each cost a read. Writers invalidate
+    entries explicitly; a read that started before an invalidation is not
+    stored, so a slow read can't put back the old document.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl_seconds: float = 60, negative_ttl_seconds: float = 10):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[Dict], float]]" = OrderedDict()
+        self._generation = 0
+        self._stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, user_id: str) -> Tuple[bool, Optional[Dict]]:
+        """``(found, user)``; `user` is None for a cached missing user"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(user_id)
+            user = entry[0]
+            self._stats['hits' if user is not None else 'negative_hits'] += 1
+        return True, copy.deepcopy(user)
+
+    def generation(self) -> int:
+        """Token to pass to `put` for a read started now"""
+        with self._lock:
+            return self._generation
+
+    def put(self, user_id: str, user: Optional[Dict], generation: int):
+        """Store a read result, unless an invalidation happened since `generation`"""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if user is not None else self.negative_ttl_seconds
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (copy.deepcopy(user), time.monotonic() + ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {'size': len(self._entries), 'max_entries': self.max_entries, **self._stats}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    max_entries=settings.user_cache_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    negative_ttl_seconds=settings.user_cache_negative_ttl_seconds
+)
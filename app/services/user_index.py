@@ -0,0 +1,186 @@
+from typing import Dict, List, Optional, Set, Tuple
+from app.utils.parish_data import get_parish_index, UNKNOWN_PARISH
+from app.utils.skill_vocab import normalize_skill, skill_vocab
+from app.utils.town_data import location_of
+from app.services.text_index import text_index
+import threading
+import numpy as np
+
+
+class UserIndex:
+    """In-process index of job seekers for ranking candidates against a job.
+
+    Each user gets a fixed slot. Parishes and coordinates (NaN when the
+    user has no town or lat/lon) are kept in NumPy arrays indexed by slot,
+    and skills as postings lists of slots. A job can then be scored
+    against every matching user with array operations.
+
+    An updated user keeps its slot, and a removed user's slot is reused by
+    the next new one, so the arrays stay as large as the number of job
+    seekers. Ties in the ranking are broken by slot.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._slots: Dict[str, int] = {}
+        self._users: List[Optional[Dict]] = []
+        # Hashed skill term counts per slot, for text similarity
+        self._profiles: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+        self._skill_masks: List[Optional[int]] = []
+        self._free: List[int] = []
+        self._parish_codes = np.full(1024, UNKNOWN_PARISH, dtype=np.int64)
+        self._coordinates = np.full((1024, 2), np.nan)
+        self._by_skill: Dict[int, Set[int]] = {}
+        self._by_parish: Dict[int, Set[int]] = {}
+        self.loaded = False
+
+    def load(self, users: List[Dict]):
+        with self._lock:
+            self._slots.clear()
+            self._users.clear()
+            self._profiles.clear()
+            self._skill_masks.clear()
+            self._free.clear()
+            self._by_skill.clear()
+            self._by_parish.clear()
+            for user in users:
+                self.add(user)
+            self.loaded = True
+
+    def add(self, user: Dict):
+        """Index `user`, reusing its slot if it is already indexed"""
+        with self._lock:
+            user_id = user['id']
+            if user.get('role') != 'job_seeker':
+                self.remove(user_id)
+                return
+
+            slot = self._slots.get(user_id)
+            if slot is not None:
+                self._clear_slot(slot)
+            elif self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._users)
+                self._users.append(None)
+                self._profiles.append(None)
+                self._skill_masks.append(None)
+                if slot >= len(self._parish_codes):
+                    grown = np.full(len(self._parish_codes) * 2, UNKNOWN_PARISH, dtype=np.int64)
+                    grown[:slot] = self._parish_codes[:slot]
+                    self._parish_codes = grown
+                    coordinates = np.full((len(grown), 2), np.nan)
+                    coordinates[:slot] = self._coordinates[:slot]
+                    self._coordinates = coordinates
+
+            self._users[slot] = user
+            self._profiles[slot] = text_index.profile_counts(user.get('skills') or [])
+            self._skill_masks[slot] = skill_vocab.mask(user.get('skills'))
+            self._slots[user_id] = slot
+            parish = get_parish_index(user.get('parish'))
+            self._parish_codes[slot] = parish
+            self._coordinates[slot] = location_of(user) or (np.nan, np.nan)
+            self._by_parish.setdefault(parish, set()).add(slot)
+            for skill_id in skill_vocab.ids(user.get('skills')).tolist():
+                self._by_skill.setdefault(skill_id, set()).add(slot)
+
+    def remove(self, user_id: str):
+        with self._lock:
+            slot = self._slots.pop(user_id, None)
+            if slot is None:
+                return
+            self._clear_slot(slot)
+            self._free.append(slot)
+
+    def _clear_slot(self, slot: int):
+        user = self._users[slot]
+        self._users[slot] = None
+        self._profiles[slot] = None
+        self._skill_masks[slot] = None
+        for skill_id in skill_vocab.ids(user.get('skills')).tolist():
+            postings = self._by_skill.get(skill_id)
+            if postings is not None:
+                postings.discard(slot)
+                if not postings:
+                    del self._by_skill[skill_id]
+        self._by_parish.get(self._parish_codes[slot], set()).discard(slot)
+        self._parish_codes[slot] = UNKNOWN_PARISH
+        self._coordinates[slot] = np.nan
+
+    def user(self, slot: int) -> Optional[Dict]:
+        return self._users[slot]
+
+    def skill_mask(self, user: Dict) -> int:
+        """Bitset of a user's skills, reusing the indexed copy"""
+        with self._lock:
+            slot = self._slots.get(user['id'])
+            mask = self._skill_masks[slot] if slot is not None else None
+        if mask is None:
+            mask = skill_vocab.known_mask(user.get('skills'))
+        return mask
+
+    def candidate_slots(
+        self,
+        required_skills: List[str],
+        parish: Optional[str] = None,
+        include_parish: bool = True,
+        parishes: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Sorted slots of users who could match a job.
+
+        Users sharing a required skill are always candidates; jobs with no
+        required skills are a full match for everyone. `parishes` restricts
+        the result to users in those parishes.
+        """
+        with self._lock:
+            skill_ids = skill_vocab.known_ids(required_skills).tolist()
+            if not required_skills:
+                slots = set(self._slots.values())
+            else:
+                slots = set()
+                for skill_id in skill_ids:
+                    slots.update(self._by_skill.get(skill_id, ()))
+                if include_parish and parish:
+                    slots.update(self._by_parish.get(get_parish_index(parish), ()))
+
+            if parishes is not None:
+                allowed = set()
+                for name in parishes:
+                    allowed.update(self._by_parish.get(get_parish_index(name), ()))
+                slots &= allowed
+
+            return np.fromiter(sorted(slots), dtype=np.int64, count=len(slots))
+
+    def skill_match(self, slots: np.ndarray, required_skills: List[str]) -> np.ndarray:
+        """Fraction of the job's required skills held by each user in `slots`"""
+        # Skills nobody was indexed with can't be held, but still count as required
+        required = len({normalize_skill(skill) for skill in required_skills})
+        if not required:
+            return np.ones(len(slots), dtype=np.float64)
+        skill_ids = skill_vocab.known_ids(required_skills).tolist()
+
+        with self._lock:
+            matched = np.zeros(len(self._users), dtype=np.float64)
+            for skill_id in skill_ids:
+                postings = self._by_skill.get(skill_id)
+                if postings:
+                    matched[np.fromiter(postings, dtype=np.int64, count=len(postings))] += 1
+            return matched[slots] / required
+
+    def profiles(self, slots: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Skill term counts for `slots`, as `text_index.profile_similarity` takes them"""
+        with self._lock:
+            return [self._profiles[slot] for slot in slots.tolist()]
+
+    def parish_codes(self, slots: np.ndarray) -> np.ndarray:
+        return self._parish_codes[slots]
+
+    def coordinates(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        points = self._coordinates[slots]
+        return points[:, 0], points[:, 1]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+user_index = UserIndex()
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Set, Tuple
+from app.utils.town_data import haversine_km
+import math
+import threading
+import numpy as np
+
+KM_PER_DEGREE_LAT = 111.32
+
+
+class GeoIndex:
+    """Uniform lat/lon grid over points, for "within R km" lookups.
+
+    Points are bucketed into cells roughly `cell_km` on a side (longitude
+    cells are sized at `reference_lat`, Jamaica's latitude by default). A
+    radius query only visits the cells overlapping the circle's bounding
+    box and computes exact great-circle distances for the points in them,
+    so its cost depends on the local density, not on the total count.
+    """
+
+    def __init__(self, cell_km: float = 5.0, reference_lat: float = 18.1):
+        self.cell_lat = cell_km / KM_PER_DEGREE_LAT
+        self.cell_lon = cell_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(reference_lat)))
+        self._lock = threading.Lock()
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+
+    def add(self, key: str, lat: float, lon: float):
+        with self._lock:
+            self._remove(key)
+            self._points[key] = (lat, lon)
+            self._cells.setdefault(self._cell(lat, lon), set()).add(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._points.clear()
+            self._cells.clear()
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        return self._points.get(key)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[str, float]]:
+        """``(key, distance_km)`` pairs within the radius, nearest first (ties by key)"""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, col_lo = self._cell(lat - dlat, lon - dlon)
+        row_hi, col_hi = self._cell(lat + dlat, lon + dlon)
+
+        with self._lock:
+            keys = []
+            for row in range(row_lo, row_hi + 1):
+                for col in range(col_lo, col_hi + 1):
+                    keys.extend(self._cells.get((row, col), ()))
+            if not keys:
+                return []
+            points = np.array([self._points[key] for key in keys])
+
+        distances = haversine_km(lat, lon, points[:, 0], points[:, 1])
+        inside = np.flatnonzero(distances <= radius_km)
+        hits = sorted(((float(distances[i]), keys[i]) for i in inside))
+        return [(key, distance) for distance, key in hits]
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon)
+
+    def _remove(self, key: str):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def __len__(self) -> int:
+        return len(self._points)
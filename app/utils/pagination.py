@@ -0,0 +1,42 @@
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+
+
+def encode_cursor(position: List[Any]) -> str:
+    """Opaque cursor for the sort key of the last item on a page"""
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """Sort key from a cursor; raises ValueError if the cursor is malformed
+    or doesn't hold `size` values"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(position, list) or (size is not None and len(position) != size):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def decode_distance_cursor(cursor: str) -> List[Any]:
+    """[distance_km, ID] from a nearby-search cursor; raises ValueError if malformed"""
+    distance, item_id = decode_cursor(cursor, size=2)
+    if isinstance(distance, bool) or not isinstance(distance, (int, float)) or not isinstance(item_id, str):
+        raise ValueError("Invalid cursor")
+    return [float(distance), item_id]
+
+
+def encode_created_cursor(created_at: datetime, doc_id: str) -> str:
+    """Cursor for listings ordered by (created_at, document ID)"""
+    return encode_cursor([created_at.isoformat(), doc_id])
+
+
+def decode_created_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(created_at, document ID) from a listing cursor; raises ValueError if malformed"""
+    created_at, doc_id = decode_cursor(cursor, size=2)
+    if not isinstance(created_at, str) or not isinstance(doc_id, str):
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(created_at), doc_id
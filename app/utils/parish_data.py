@@ -1,3 +1,7 @@
+from functools import lru_cache
+from geopy.distance import geodesic
+import numpy as np
+
 JAMAICA_PARISHES = {
     "kingston": {"lat": 17.9714, "lon": -76.7931},
     "st_andrew": {"lat": 18.0179, "lon": -76.8099},
@@ -15,9 +19,67 @@ JAMAICA_PARISHES = {
     "st_catherine": {"lat": 18.0027, "lon": -77.0000}
 }
 
+# Parishes are interned to small integer indices so distances can be looked
+# up in a precomputed table instead of running a geodesic per user/job pair.
+PARISH_NAMES = list(JAMAICA_PARISHES)
+PARISH_INDEX = {name: i for i, name in enumerate(PARISH_NAMES)}
+UNKNOWN_PARISH = -1
+
+def normalize_parish_name(parish_name: str) -> str:
+    return parish_name.strip().lower().replace(".", "").replace(" ", "_")
+
+def parish_display_name(parish_key: str) -> str:
+    """Readable name for a JAMAICA_PARISHES key, e.g. 'st_james' -> 'St. James'"""
+    name = parish_key.replace("_", " ").title()
+    return f"St. {name[3:]}" if name.startswith("St ") else name
+
+@lru_cache(maxsize=256)
+def get_parish_index(parish_name: str) -> int:
+    if not parish_name:
+        return UNKNOWN_PARISH
+    return PARISH_INDEX.get(normalize_parish_name(parish_name), UNKNOWN_PARISH)
+
 def get_parish_coordinates(parish_name: str):
-    return JAMAICA_PARISHES.get(parish_name.lower().replace(" ", "_"))
+    index = get_parish_index(parish_name)
+    if index == UNKNOWN_PARISH:
+        return None
+    return JAMAICA_PARISHES[PARISH_NAMES[index]]
 
 def calculate_distance(lat1, lon1, lat2, lon2):
-    from geopy.distance import geodesic
-    return geodesic((lat1, lon1), (lat2, lon2)).kilometers
\ No newline at end of file
+    return geodesic((lat1, lon1), (lat2, lon2)).kilometers
+
+def _build_distance_matrix() -> np.ndarray:
+    # One extra all-zero row and column so UNKNOWN_PARISH (-1) gathers a
+    # distance of 0, the same as when coordinates are missing
+    size = len(PARISH_NAMES)
+    matrix = np.zeros((size + 1, size + 1), dtype=np.float64)
+    for i, origin in enumerate(PARISH_NAMES):
+        for j, destination in enumerate(PARISH_NAMES):
+            a = JAMAICA_PARISHES[origin]
+            b = JAMAICA_PARISHES[destination]
+            matrix[i, j] = calculate_distance(a['lat'], a['lon'], b['lat'], b['lon'])
+    matrix.setflags(write=False)
+    return matrix
+
+PARISH_DISTANCE_MATRIX = _build_distance_matrix()
+
+def parish_distance(origin_index: int, destination_index: int) -> float:
+    return float(PARISH_DISTANCE_MATRIX[origin_index, destination_index])
+
+def parish_distances(origin_index: int, destination_indices: np.ndarray) -> np.ndarray:
+    """Distances from one parish to an array of parish indices (NumPy gather)"""
+    return PARISH_DISTANCE_MATRIX[origin_index, destination_indices]
+
+def parish_distances_to(origin_indices: np.ndarray, destination_index: int) -> np.ndarray:
+    """Distances from an array of parish indices to one parish (NumPy gather)"""
+    return PARISH_DISTANCE_MATRIX[origin_indices, destination_index]
+
+def parish_distance_grid(origin_indices: np.ndarray, destination_indices: np.ndarray) -> np.ndarray:
+    """Distances between every origin and every destination parish index"""
+    return PARISH_DISTANCE_MATRIX[np.ix_(origin_indices, destination_indices)]
+
+def parishes_within(origin_index: int, radius_km: float) -> np.ndarray:
+    """Indices of parishes no further than `radius_km` from a parish, nearest first"""
+    distances = PARISH_DISTANCE_MATRIX[origin_index, :len(PARISH_NAMES)]
+    nearby = np.flatnonzero(distances <= radius_km)
+    return nearby[np.argsort(distances[nearby], kind='stable')]
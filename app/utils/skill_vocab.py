@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List
+import threading
+import numpy as np
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
+
+
+class SkillVocabulary:
+    """Interns normalized skill strings to dense integer IDs.
+
+    Skill sets are then held as sorted int arrays (for NumPy scoring) or as
+    Python int bitsets, where overlap is a single AND plus popcount. Only
+    indexed or stored users and jobs are interned; request-time lookups use
+    known_ids()/known_mask(), so the vocabulary can't grow without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._skills: List[str] = []
+
+    def intern(self, skill: str) -> int:
+        skill = normalize_skill(skill)
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(skill)
+                if skill_id is None:
+                    skill_id = self._ids[skill] = len(self._skills)
+                    self._skills.append(skill)
+        return skill_id
+
+    def ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Sorted, de-duplicated skill IDs"""
+        return np.unique(np.fromiter((self.intern(s) for s in skills or ()), dtype=np.int64))
+
+    def mask(self, skills: Iterable[str]) -> int:
+        """Skill set as a bitset with one bit per skill ID"""
+        mask = 0
+        for skill in skills or ():
+            mask |= 1 << self.intern(skill)
+        return mask
+
+    def known_ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Like ids(), but skills that were never interned are left out"""
+        found = (self._ids.get(normalize_skill(s)) for s in skills or ())
+        return np.unique(np.fromiter((i for i in found if i is not None), dtype=np.int64))
+
+    def known_mask(self, skills: Iterable[str]) -> int:
+        """Like mask(), but skills that were never interned are left out"""
+        mask = 0
+        for skill in skills or ():
+            skill_id = self._ids.get(normalize_skill(skill))
+            if skill_id is not None:
+                mask |= 1 << skill_id
+        return mask
+
+    def skill(self, skill_id: int) -> str:
+        return self._skills[skill_id]
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+
+skill_vocab = SkillVocabulary()
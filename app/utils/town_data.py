@@ -0,0 +1,147 @@
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from app.utils.parish_data import get_parish_coordinates
+import numpy as np
+
+# Offline gazetteer of Jamaican towns and communities (approximate centres)
+JAMAICA_TOWNS = {
+    # Kingston & St. Andrew
+    "kingston": {"lat": 17.9970, "lon": -76.7936, "parish": "kingston"},
+    "downtown_kingston": {"lat": 17.9685, "lon": -76.7920, "parish": "kingston"},
+    "half_way_tree": {"lat": 18.0124, "lon": -76.7967, "parish": "st_andrew"},
+    "new_kingston": {"lat": 18.0072, "lon": -76.7846, "parish": "st_andrew"},
+    "cross_roads": {"lat": 17.9950, "lon": -76.7880, "parish": "st_andrew"},
+    "liguanea": {"lat": 18.0180, "lon": -76.7700, "parish": "st_andrew"},
+    "papine": {"lat": 18.0170, "lon": -76.7430, "parish": "st_andrew"},
+    "mona": {"lat": 18.0060, "lon": -76.7480, "parish": "st_andrew"},
+    "constant_spring": {"lat": 18.0510, "lon": -76.7940, "parish": "st_andrew"},
+    "stony_hill": {"lat": 18.0780, "lon": -76.7940, "parish": "st_andrew"},
+    "gordon_town": {"lat": 18.0400, "lon": -76.7120, "parish": "st_andrew"},
+    "harbour_view": {"lat": 17.9530, "lon": -76.7280, "parish": "st_andrew"},
+    "red_hills": {"lat": 18.0420, "lon": -76.8230, "parish": "st_andrew"},
+    # St. Catherine
+    "portmore": {"lat": 17.9500, "lon": -76.8800, "parish": "st_catherine"},
+    "spanish_town": {"lat": 17.9911, "lon": -76.9574, "parish": "st_catherine"},
+    "old_harbour": {"lat": 17.9414, "lon": -77.1090, "parish": "st_catherine"},
+    "old_harbour_bay": {"lat": 17.9050, "lon": -77.0970, "parish": "st_catherine"},
+    "linstead": {"lat": 18.1368, "lon": -77.0317, "parish": "st_catherine"},
+    "bog_walk": {"lat": 18.1020, "lon": -77.0050, "parish": "st_catherine"},
+    "ewarton": {"lat": 18.1833, "lon": -77.0850, "parish": "st_catherine"},
+    "gregory_park": {"lat": 17.9730, "lon": -76.8850, "parish": "st_catherine"},
+    # Clarendon
+    "may_pen": {"lat": 17.9646, "lon": -77.2452, "parish": "clarendon"},
+    "chapelton": {"lat": 18.0830, "lon": -77.2670, "parish": "clarendon"},
+    "frankfield": {"lat": 18.1500, "lon": -77.3670, "parish": "clarendon"},
+    "lionel_town": {"lat": 17.8100, "lon": -77.2400, "parish": "clarendon"},
+    "hayes": {"lat": 17.8700, "lon": -77.2400, "parish": "clarendon"},
+    "four_paths": {"lat": 17.9750, "lon": -77.3000, "parish": "clarendon"},
+    # Manchester
+    "mandeville": {"lat": 18.0417, "lon": -77.5071, "parish": "manchester"},
+    "christiana": {"lat": 18.1750, "lon": -77.4900, "parish": "manchester"},
+    "porus": {"lat": 18.0370, "lon": -77.4100, "parish": "manchester"},
+    "williamsfield": {"lat": 18.0700, "lon": -77.4700, "parish": "manchester"},
+    "spaldings": {"lat": 18.1560, "lon": -77.4600, "parish": "manchester"},
+    # St. Elizabeth
+    "black_river": {"lat": 18.0264, "lon": -77.8487, "parish": "st_elizabeth"},
+    "santa_cruz": {"lat": 18.0500, "lon": -77.7000, "parish": "st_elizabeth"},
+    "junction": {"lat": 17.9600, "lon": -77.6000, "parish": "st_elizabeth"},
+    "balaclava": {"lat": 18.1700, "lon": -77.6400, "parish": "st_elizabeth"},
+    "treasure_beach": {"lat": 17.8900, "lon": -77.7600, "parish": "st_elizabeth"},
+    # Westmoreland
+    "savanna_la_mar": {"lat": 18.2190, "lon": -78.1330, "parish": "westmoreland"},
+    "negril": {"lat": 18.2683, "lon": -78.3481, "parish": "westmoreland"},
+    "whitehouse": {"lat": 18.0800, "lon": -77.9600, "parish": "westmoreland"},
+    "bluefields": {"lat": 18.1700, "lon": -78.0300, "parish": "westmoreland"},
+    "frome": {"lat": 18.3000, "lon": -78.1500, "parish": "westmoreland"},
+    # Hanover
+    "lucea": {"lat": 18.4510, "lon": -78.1736, "parish": "hanover"},
+    "hopewell": {"lat": 18.4470, "lon": -78.0280, "parish": "hanover"},
+    "green_island": {"lat": 18.3800, "lon": -78.2700, "parish": "hanover"},
+    "sandy_bay": {"lat": 18.4400, "lon": -78.0900, "parish": "hanover"},
+    # St. James
+    "montego_bay": {"lat": 18.4762, "lon": -77.8939, "parish": "st_james"},
+    "cambridge": {"lat": 18.3000, "lon": -77.9000, "parish": "st_james"},
+    "anchovy": {"lat": 18.4100, "lon": -77.9400, "parish": "st_james"},
+    "ironshore": {"lat": 18.5000, "lon": -77.8500, "parish": "st_james"},
+    # Trelawny
+    "falmouth": {"lat": 18.4936, "lon": -77.6559, "parish": "trelawny"},
+    "clarks_town": {"lat": 18.4200, "lon": -77.5400, "parish": "trelawny"},
+    "duncans": {"lat": 18.4700, "lon": -77.5400, "parish": "trelawny"},
+    "albert_town": {"lat": 18.2900, "lon": -77.5400, "parish": "trelawny"},
+    # St. Ann
+    "st_anns_bay": {"lat": 18.4358, "lon": -77.2010, "parish": "st_ann"},
+    "ocho_rios": {"lat": 18.4078, "lon": -77.1031, "parish": "st_ann"},
+    "browns_town": {"lat": 18.3900, "lon": -77.3600, "parish": "st_ann"},
+    "runaway_bay": {"lat": 18.4600, "lon": -77.3300, "parish": "st_ann"},
+    "discovery_bay": {"lat": 18.4600, "lon": -77.4000, "parish": "st_ann"},
+    "claremont": {"lat": 18.3200, "lon": -77.1800, "parish": "st_ann"},
+    "moneague": {"lat": 18.2700, "lon": -77.1200, "parish": "st_ann"},
+    # St. Mary
+    "port_maria": {"lat": 18.3690, "lon": -76.8900, "parish": "st_mary"},
+    "annotto_bay": {"lat": 18.2720, "lon": -76.7650, "parish": "st_mary"},
+    "oracabessa": {"lat": 18.4030, "lon": -76.9500, "parish": "st_mary"},
+    "highgate": {"lat": 18.2700, "lon": -76.8900, "parish": "st_mary"},
+    # Portland
+    "port_antonio": {"lat": 18.1760, "lon": -76.4500, "parish": "portland"},
+    "buff_bay": {"lat": 18.2300, "lon": -76.6600, "parish": "portland"},
+    "hope_bay": {"lat": 18.2000, "lon": -76.5700, "parish": "portland"},
+    "manchioneal": {"lat": 18.0400, "lon": -76.2800, "parish": "portland"},
+    # St. Thomas
+    "morant_bay": {"lat": 17.8815, "lon": -76.4093, "parish": "st_thomas"},
+    "yallahs": {"lat": 17.8750, "lon": -76.5600, "parish": "st_thomas"},
+    "seaforth": {"lat": 17.9500, "lon": -76.4600, "parish": "st_thomas"},
+    "golden_grove": {"lat": 17.9300, "lon": -76.2800, "parish": "st_thomas"},
+    "bath": {"lat": 17.9480, "lon": -76.3500, "parish": "st_thomas"},
+}
+
+EARTH_RADIUS_KM = 6371.0088
+
+def normalize_town_name(town_name: str) -> str:
+    return (
+        town_name.strip().lower()
+        .replace(".", "").replace("'", "")
+        .replace("-", " ").replace(" ", "_")
+    )
+
+@lru_cache(maxsize=1024)
+def get_town_coordinates(town_name: str) -> Optional[Dict]:
+    if not town_name:
+        return None
+    return JAMAICA_TOWNS.get(normalize_town_name(town_name))
+
+def location_of(record: Dict, parish_fallback: bool = False) -> Optional[Tuple[float, float]]:
+    """Point location of a user, job or gig.
+
+    Explicit lat/lon wins, then the gazetteer entry for `town`. With
+    `parish_fallback`, records with neither resolve to their parish centroid.
+    """
+    lat, lon = record.get('lat'), record.get('lon')
+    if lat is not None and lon is not None:
+        return float(lat), float(lon)
+
+    town = get_town_coordinates(record.get('town'))
+    if town:
+        return town['lat'], town['lon']
+
+    if parish_fallback:
+        parish = get_parish_coordinates(record.get('parish'))
+        if parish:
+            return parish['lat'], parish['lon']
+    return None
+
+def resolve_coordinates(data: Dict) -> Dict:
+    """Fill in lat/lon from the town name when the caller didn't send coordinates"""
+    if data.get('lat') is None or data.get('lon') is None:
+        town = get_town_coordinates(data.get('town'))
+        if town:
+            data['lat'], data['lon'] = town['lat'], town['lon']
+    return data
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts NumPy arrays and broadcasts"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
@@ -0,0 +1,144 @@
+"""Matching benchmarks against synthetic catalogs.
+
+    python -m benchmarks.bench_matching --scales 1k,100k,1M --output results.json
+
+For each scale (number of users and of jobs) this times
+calculate_skill_match, calculate_match_score and get_recommendations end
+to end against an in-memory data source, plus the one-off index build.
+Each result reports throughput, p50/p99 latency and peak memory: the
+process high-water RSS, and with --trace-memory the peak Python
+allocation measured in a separate traced pass, so tracing doesn't skew
+the timings.
+"""
+from typing import Callable, Dict, List
+from datetime import datetime, timezone
+from benchmarks.synthetic import SyntheticCatalog, InMemoryDataSource
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(name: str, scale: int, calls: List[Callable], trace_memory: bool = False) -> Dict:
+    latencies = np.empty(len(calls), dtype=np.float64)
+    started = time.perf_counter()
+    for i, call in enumerate(calls):
+        t0 = time.perf_counter_ns()
+        call()
+        latencies[i] = time.perf_counter_ns() - t0
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "benchmark": name,
+        "scale": scale,
+        "calls": len(calls),
+        "seconds": elapsed,
+        "throughput_per_s": len(calls) / elapsed if elapsed else None,
+        "p50_ms": float(np.percentile(latencies, 50)) / 1e6,
+        "p99_ms": float(np.percentile(latencies, 99)) / 1e6,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    if trace_memory:
+        tracemalloc.start()
+        for call in calls[:max(1, min(len(calls), 100))]:
+            call()
+        result["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    print(
+        f"{name:<24} scale={scale:<9} calls={len(calls):<6} "
+        f"p50={result['p50_ms']:.3f}ms p99={result['p99_ms']:.3f}ms "
+        f"rss={result['peak_rss_mb']:.0f}MB",
+        file=sys.stderr
+    )
+    return result
+
+
+def run_scale(scale: int, samples: int, recommendation_samples: int, trace_memory: bool, seed: int) -> List[Dict]:
+    from app.services.job_index import JobIndex
+    from app.services.matching_service import MatchingService
+    from app.services.recommendation_cache import RecommendationCache
+    from app.services.scoring import calculate_skill_match
+    from app.services.text_index import JobTextIndex
+
+    catalog = SyntheticCatalog(seed)
+    users = catalog.users(scale)
+    jobs = catalog.jobs(scale)
+    rng = np.random.default_rng(seed)
+
+    service = MatchingService()
+    service.firebase = InMemoryDataSource(users, jobs)
+    service.job_index = JobIndex()
+    # No background refits and no caching, so every call does the full work
+    service.text_index = JobTextIndex(refit_threshold=sys.maxsize, refit_interval_seconds=float("inf"))
+    service.cache = RecommendationCache(max_entries=0)
+
+    results = [measure("index_build", scale, [service._ensure_job_index], trace_memory=False)]
+
+    pairs = rng.integers(0, scale, size=(samples, 2))
+    results.append(measure("calculate_skill_match", scale, [
+        (lambda u=users[a], j=jobs[b]: calculate_skill_match(u["skills"], j["required_skills"]))
+        for a, b in pairs
+    ], trace_memory))
+    results.append(measure("calculate_match_score", scale, [
+        (lambda u=users[a], j=jobs[b]: service.calculate_match_score(u, j))
+        for a, b in pairs
+    ], trace_memory))
+
+    user_ids = [users[i]["id"] for i in rng.integers(0, scale, size=recommendation_samples)]
+    results.append(measure("get_recommendations", scale, [
+        (lambda user_id=user_id: service.get_recommendations(user_id, 10))
+        for user_id in user_ids
+    ], trace_memory))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the matching engine on synthetic data")
+    parser.add_argument("--scales", default="1k,100k,1M", help="comma-separated user/job counts, e.g. 1k,100k")
+    parser.add_argument("--samples", type=int, default=10_000, help="calls for the pairwise benchmarks")
+    parser.add_argument("--recommendation-samples", type=int, default=200)
+    parser.add_argument("--trace-memory", action="store_true", help="also report peak traced allocations")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for scale in (parse_scale(s) for s in args.scales.split(",")):
+        results.extend(run_scale(scale, args.samples, args.recommendation_samples, args.trace_memory, args.seed))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "args": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Contention load test for gig claiming against a real Firestore (or the emulator).
+
+    FIRESTORE_EMULATOR_HOST=localhost:8080 \\
+        python -m benchmarks.claim_contention --gigs 5 --claimers 300 --processes 4
+
+Needs a service-account file at FIREBASE_CREDENTIALS_PATH; with
+FIRESTORE_EMULATOR_HOST set, the client talks to the emulator instead.
+
+Creates fresh available gigs, then has `--claimers` users per gig claim
+them all at once from `--processes` processes. Each process has its own
+claim gate, as separate API instances would, so the Firestore transaction
+is what has to guarantee exactly one winner per gig. Prints a JSON report
+and exits non-zero if any gig was claimed other than exactly once.
+"""
+from typing import Dict, List
+import multiprocessing
+import argparse
+import asyncio
+import json
+import sys
+import time
+import numpy as np
+
+
+def _claim_all(args) -> List[Dict]:
+    gig_ids, claimers, offset = args
+    from app.services.firebase_async_service import firebase_async_service
+
+    async def claim(gig_id: str, user_id: str) -> Dict:
+        started = time.perf_counter()
+        won = await firebase_async_service.claim_gig(gig_id, user_id)
+        return {'gig_id': gig_id, 'user_id': user_id, 'won': won, 'seconds': time.perf_counter() - started}
+
+    async def run() -> List[Dict]:
+        return await asyncio.gather(*(
+            claim(gig_id, f"claimer-{offset + i}")
+            for gig_id in gig_ids
+            for i in range(claimers)
+        ))
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent gig claim load test")
+    parser.add_argument("--gigs", type=int, default=5)
+    parser.add_argument("--claimers", type=int, default=200, help="concurrent claims per gig per process")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    from app.services.firebase_service import firebase_service
+    from app.services.firebase_async_service import firebase_async_service
+    if firebase_service._dev_mode:
+        sys.exit("Needs Firestore: set credentials or FIRESTORE_EMULATOR_HOST")
+
+    results = asyncio.run(firebase_async_service.create_gigs([
+        {
+            "title": f"Contention test gig {i}",
+            "description": "Load test",
+            "parish": "Kingston",
+            "payment": 2000,
+            "estimated_time": "1 hour",
+            "difficulty": "easy",
+            "agency_id": "load-test",
+        }
+        for i in range(args.gigs)
+    ]))
+    gig_ids = [result['id'] for result in results if result['success']]
+
+    # spawn, not fork: gRPC channels don't survive a fork
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        chunks = [(gig_ids, args.claimers, p * args.claimers) for p in range(args.processes)]
+        attempts = [attempt for chunk in pool.map(_claim_all, chunks) for attempt in chunk]
+
+    winners = {gig_id: [a['user_id'] for a in attempts if a['gig_id'] == gig_id and a['won']] for gig_id in gig_ids}
+    stored = {
+        gig_id: firebase_service.db.collection('micro_gigs').document(gig_id).get().to_dict().get('claimed_by')
+        for gig_id in gig_ids
+    }
+    exactly_once = all(len(winners[g]) == 1 and winners[g][0] == stored[g] for g in gig_ids)
+    latencies = np.array([a['seconds'] for a in attempts]) * 1000
+
+    print(json.dumps({
+        "gigs": len(gig_ids),
+        "claims": len(attempts),
+        "wins": sum(len(w) for w in winners.values()),
+        "exactly_once": exactly_once,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }, indent=2))
+    sys.exit(0 if exactly_once else 1)
+
+
+if __name__ == "__main__":
+    main()
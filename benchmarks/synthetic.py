@@ -0,0 +1,133 @@
+"""Synthetic users and jobs for benchmarking, plus an in-memory data source.
+
+Parishes are drawn in proportion to population (2011 census) and skills
+from a Zipf-like distribution, so a few skills are very common and most
+are rare, as in real postings.
+"""
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timezone
+import numpy as np
+
+PARISH_POPULATION = {
+    "Kingston": 89_000,
+    "St. Andrew": 573_000,
+    "St. Thomas": 94_000,
+    "Portland": 82_000,
+    "St. Mary": 114_000,
+    "St. Ann": 173_000,
+    "Trelawny": 76_000,
+    "St. James": 184_000,
+    "Hanover": 70_000,
+    "Westmoreland": 144_000,
+    "St. Elizabeth": 151_000,
+    "Manchester": 190_000,
+    "Clarendon": 246_000,
+    "St. Catherine": 518_000,
+}
+
+SKILLS = [
+    "Customer Service", "Sales", "Microsoft Office", "Excel", "Communication",
+    "Cashier", "Driving", "Cleaning", "Cooking", "Data Entry",
+    "Marketing", "Social Media", "Accounting", "Bookkeeping", "Security",
+    "Construction", "Carpentry", "Masonry", "Plumbing", "Electrical",
+    "Welding", "Mechanic", "Hospitality", "Tour Guide", "Bartending",
+    "Housekeeping", "Childcare", "Nursing", "Teaching", "Tutoring",
+    "Graphic Design", "Photography", "Video Editing", "Writing", "Translation",
+    "Python", "JavaScript", "React", "SQL", "Java",
+    "Networking", "IT Support", "Web Design", "Project Management", "Logistics",
+    "Warehouse", "Forklift", "Agriculture", "Farming", "Fishing",
+    "Hairdressing", "Barbering", "Cosmetology", "Tailoring", "Event Planning",
+    "Call Centre", "BPO", "Medical Billing", "Pharmacy", "Lab Technician",
+]
+
+TITLES = [
+    "Customer Service Representative", "Sales Associate", "Office Assistant",
+    "Delivery Driver", "Line Cook", "Data Entry Clerk", "Marketing Coordinator",
+    "Accounts Clerk", "Security Guard", "Construction Worker", "Electrician",
+    "Hotel Front Desk Agent", "Tour Guide", "Housekeeper", "Teacher",
+    "Graphic Designer", "Software Developer", "IT Support Technician",
+    "Warehouse Associate", "Farm Hand", "Call Centre Agent", "Pharmacy Technician",
+]
+
+
+class SyntheticCatalog:
+    def __init__(self, seed: int = 7):
+        self._rng = np.random.default_rng(seed)
+        self._parishes = list(PARISH_POPULATION)
+        population = np.array(list(PARISH_POPULATION.values()), dtype=np.float64)
+        self._parish_p = population / population.sum()
+        ranks = np.arange(1, len(SKILLS) + 1, dtype=np.float64)
+        weights = 1 / ranks ** 1.1
+        self._skill_p = weights / weights.sum()
+
+    def _skills(self, count: int, low: int, high: int) -> List[List[str]]:
+        sizes = self._rng.integers(low, high + 1, size=count)
+        picks = self._rng.choice(len(SKILLS), size=(count, high), p=self._skill_p)
+        return [sorted({SKILLS[i] for i in picks[row, :size]}) for row, size in enumerate(sizes)]
+
+    def users(self, count: int) -> List[Dict]:
+        parishes = self._rng.choice(len(self._parishes), size=count, p=self._parish_p)
+        skills = self._skills(count, 1, 6)
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "id": f"user-{i}",
+                "email": f"user{i}@example.com",
+                "full_name": f"User {i}",
+                "parish": self._parishes[parishes[i]],
+                "role": "job_seeker",
+                "skills": skills[i],
+                "completed_gigs": 0,
+                "total_earnings": 0.0,
+                "created_at": now,
+            }
+            for i in range(count)
+        ]
+
+    def jobs(self, count: int) -> List[Dict]:
+        parishes = self._rng.choice(len(self._parishes), size=count, p=self._parish_p)
+        skills = self._skills(count, 0, 4)
+        titles = self._rng.integers(0, len(TITLES), size=count)
+        pay = self._rng.integers(20, 120, size=count) * 1000
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "id": f"job-{i}",
+                "title": TITLES[titles[i]],
+                "description": f"{TITLES[titles[i]]} needed in {self._parishes[parishes[i]]}. "
+                               f"Experience with {', '.join(skills[i]) or 'general duties'} preferred.",
+                "parish": self._parishes[parishes[i]],
+                "pay": int(pay[i]),
+                "required_skills": skills[i],
+                "job_type": "full_time",
+                "employer_id": f"employer-{i % 997}",
+                "created_at": now,
+                "status": "active",
+                "applications_count": 0,
+            }
+            for i in range(count)
+        ]
+
+
+class InMemoryDataSource:
+    """The FirebaseService read methods MatchingService uses, backed by lists"""
+
+    def __init__(self, users: List[Dict], jobs: List[Dict]):
+        self.users = {user["id"]: user for user in users}
+        self.jobs = jobs
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        return self.users.get(user_id)
+
+    def get_users(self, filters: Dict = None) -> List[Dict]:
+        return list(self.users.values())
+
+    def get_jobs(self, filters: Dict = None, limit: Optional[int] = 50) -> List[Dict]:
+        return self.jobs if limit is None else self.jobs[:limit]
+
+    def iter_jobs(self, filters: Dict = None, page_size: int = 500) -> Iterator[List[Dict]]:
+        for start in range(0, len(self.jobs), page_size):
+            yield self.jobs[start:start + page_size]
+
+    def get_precomputed_recommendations(self, user_id: str) -> Optional[Dict]:
+        return None
@@ -0,0 +1,320 @@
+"""In-memory stand-ins for the Firestore clients used by the data layer.
+
+`FakeFirestore` and `AsyncFakeFirestore` share one dict of documents keyed
+by path, so a test can drive the async service and check what the blocking
+one sees. They cover the calls the services make: documents, equality and
+range filters, ordering with `start_after`, batches, transactions (with the
+`transactional` decorators patched to commit on return) and Increment
+transforms and field deletes in updates and merged sets.
+"""
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1.transforms import DELETE_FIELD, Increment
+from types import SimpleNamespace
+import copy
+import functools
+import itertools
+import operator
+import pytest
+
+
+class Snapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = copy.deepcopy(data)
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        value = self._data
+        for part in field.split('.'):
+            value = value[part]
+        return value
+
+
+class DocumentRef:
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def get(self, transaction=None):
+        return Snapshot(self, self._client.store.get(self.path))
+
+    def set(self, data, merge=False):
+        self._client._apply([('set', self, data, merge)])
+
+    def update(self, data):
+        self._client._apply([('update', self, data, False)])
+
+    def create(self, data):
+        self._client._apply([('create', self, data, False)])
+
+    def delete(self):
+        self._client._apply([('delete', self, None, False)])
+
+
+FILTER_OPS = {'==': operator.eq, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+class Query:
+    def __init__(self, client, collection, filters=(), orders=(), after=None, limit=None):
+        self._client = client
+        self._collection = collection
+        self._filters, self._orders, self._after, self._limit = filters, orders, after, limit
+
+    def _with(self, **changes):
+        state = {'filters': self._filters, 'orders': self._orders, 'after': self._after, 'limit': self._limit}
+        state.update(changes)
+        return type(self)(self._client, self._collection, **state)
+
+    def where(self, field, op, value):
+        return self._with(filters=self._filters + ((field, FILTER_OPS[op], value),))
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._with(orders=self._orders + ((field, direction == 'DESCENDING'),))
+
+    def start_after(self, values):
+        if isinstance(values, Snapshot):
+            values = {'__name__': values.id, **values.to_dict()}
+        return self._with(after=[values[field] for field, _ in self._orders])
+
+    def limit(self, count):
+        return self._with(limit=count)
+
+    def _snapshots(self):
+        prefix = f"{self._collection}/"
+        docs = [
+            Snapshot(DocumentRef(self._client, self._collection, path[len(prefix):]), data)
+            for path, data in self._client.store.items()
+            if path.startswith(prefix) and '/' not in path[len(prefix):]
+        ]
+        docs = [doc for doc in docs if all(_passes(doc.to_dict(), *f) for f in self._filters)]
+
+        def key(doc):
+            return [doc.id if field == '__name__' else doc.to_dict().get(field) for field, _ in self._orders]
+
+        def compare(a, b):
+            for x, y, (_, descending) in zip(a, b, self._orders):
+                if x != y:
+                    return (1 if x > y else -1) * (-1 if descending else 1)
+            return 0
+
+        docs.sort(key=functools.cmp_to_key(lambda a, b: compare(key(a), key(b))))
+        if self._after is not None:
+            docs = [doc for doc in docs if compare(key(doc), self._after) > 0]
+        return docs[:self._limit] if self._limit is not None else docs
+
+    def stream(self):
+        return iter(self._snapshots())
+
+
+def _passes(data, field, op, value):
+    # Range filters, as in Firestore, skip documents missing the field
+    actual = data.get(field)
+    return (op is operator.eq or actual is not None) and op(actual, value)
+
+
+class Collection(Query):
+    def document(self, doc_id=None):
+        if doc_id is None:
+            doc_id = f"{self._collection}-{next(self._client.ids)}"
+        return self._client.document_type(self._client, self._collection, doc_id)
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, ref, data, merge=False):
+        self._writes.append(('set', ref, data, merge))
+
+    def update(self, ref, data):
+        self._writes.append(('update', ref, data, False))
+
+    def create(self, ref, data):
+        self._writes.append(('create', ref, data, False))
+
+    def delete(self, ref):
+        self._writes.append(('delete', ref, None, False))
+
+    def commit(self):
+        self._client.commits += 1
+        if self._client.commits in self._client.failing_commits:
+            raise RuntimeError("deadline exceeded")
+        self._client._apply(self._writes)
+
+
+class Transaction(WriteBatch):
+    def __init__(self, client, max_attempts=5):
+        super().__init__(client)
+        self.max_attempts = max_attempts
+
+
+class FakeFirestore:
+    document_type = DocumentRef
+    collection_type = Collection
+    batch_type = WriteBatch
+
+    def __init__(self, store=None, ids=None):
+        self.store = {} if store is None else store
+        self.ids = ids or itertools.count(1)
+        self.commits = 0
+        self.batch_reads = 0
+        self.failing_commits = set()
+
+    def collection(self, name):
+        return self.collection_type(self, name)
+
+    def batch(self):
+        return self.batch_type(self)
+
+    def transaction(self, max_attempts=5):
+        return Transaction(self, max_attempts)
+
+    def get_all(self, refs):
+        return iter([DocumentRef.get(ref) for ref in refs])
+
+    def _apply(self, writes):
+        # Validate first so a failing write leaves the store untouched, as a commit would
+        for op, ref, _, _ in writes:
+            if op == 'create' and ref.path in self.store:
+                raise AlreadyExists(f"Document already exists: {ref.path}")
+            if op == 'update' and ref.path not in self.store:
+                raise NotFound(f"No document to update: {ref.path}")
+        for op, ref, data, merge in writes:
+            if op == 'delete':
+                self.store.pop(ref.path, None)
+            elif op == 'update':
+                document = self.store[ref.path]
+                for field, value in data.items():
+                    *parents, name = field.split('.')
+                    target = document
+                    for parent in parents:
+                        target = target.setdefault(parent, {})
+                    _write_field(target, name, value)
+            else:
+                document = self.store.get(ref.path, {}) if merge else {}
+                _merge(document, data)
+                self.store[ref.path] = document
+
+
+def _write_field(target, name, value):
+    if value is DELETE_FIELD:
+        target.pop(name, None)
+    elif isinstance(value, Increment):
+        target[name] = target.get(name, 0) + value.value
+    else:
+        target[name] = copy.deepcopy(value)
+
+
+def _merge(target, data):
+    for name, value in data.items():
+        if isinstance(value, dict) and value:
+            _merge(target.setdefault(name, {}), value)
+        else:
+            _write_field(target, name, value)
+
+
+class AsyncDocumentRef(DocumentRef):
+    async def get(self, transaction=None):
+        return DocumentRef.get(self, transaction)
+
+    async def set(self, data, merge=False):
+        DocumentRef.set(self, data, merge)
+
+    async def update(self, data):
+        DocumentRef.update(self, data)
+
+    async def create(self, data):
+        DocumentRef.create(self, data)
+
+    async def delete(self):
+        DocumentRef.delete(self)
+
+
+class AsyncQuery(Query):
+    async def stream(self):
+        for doc in self._snapshots():
+            yield doc
+
+
+class AsyncCollection(AsyncQuery, Collection):
+    pass
+
+
+class AsyncWriteBatch(WriteBatch):
+    async def commit(self):
+        WriteBatch.commit(self)
+
+
+class AsyncTransaction(Transaction):
+    async def commit(self):
+        WriteBatch.commit(self)
+
+
+class AsyncFakeFirestore(FakeFirestore):
+    document_type = AsyncDocumentRef
+    collection_type = AsyncCollection
+    batch_type = AsyncWriteBatch
+
+    def transaction(self, max_attempts=5):
+        return AsyncTransaction(self, max_attempts)
+
+    async def get_all(self, refs, transaction=None):
+        self.batch_reads += 1
+        for ref in refs:
+            yield DocumentRef.get(ref)
+
+
+def transactional(fn):
+    """Stand-in for firestore.transactional: run once, commit on return"""
+    def run(transaction, *args, **kwargs):
+        result = fn(transaction, *args, **kwargs)
+        transaction.commit()
+        return result
+    return run
+
+
+def async_transactional(fn):
+    """Stand-in for async_transactional: run once, commit on return"""
+    async def run(transaction, *args, **kwargs):
+        result = await fn(transaction, *args, **kwargs)
+        await transaction.commit()
+        return result
+    return run
+
+
+@pytest.fixture
+def firestore_fake(monkeypatch):
+    """Both Firestore services on one in-memory store, with fresh in-process state.
+
+    `service` is the AsyncFirebaseService the routes use; `sync` is the
+    blocking service behind it, which the matching engine reads through.
+    """
+    from firebase_admin import firestore
+    from app.services import firebase_service as sync_module
+    from app.services import firebase_async_service as async_module
+    from app.services.claim_gate import ClaimGate
+    from app.services.gig_pool import GigPool
+    from app.services.user_cache import UserCache
+    from app.services.user_index import UserIndex
+
+    monkeypatch.setattr(firestore, "transactional", transactional)
+    monkeypatch.setattr(async_module, "async_transactional", async_transactional)
+    cache, pool, gate = UserCache(), GigPool(), ClaimGate()
+    for module in (sync_module, async_module):
+        monkeypatch.setattr(module, "user_cache", cache)
+    monkeypatch.setattr(async_module, "gig_pool", pool)
+    monkeypatch.setattr(async_module, "claim_gate", gate)
+    monkeypatch.setattr(sync_module, "user_index", UserIndex())
+
+    store, ids = {}, itertools.count(1)
+    sync_service = sync_module.FirebaseService.__new__(sync_module.FirebaseService)
+    sync_service.db, sync_service._dev_mode = FakeFirestore(store, ids), False
+    service = async_module.AsyncFirebaseService.__new__(async_module.AsyncFirebaseService)
+    service.db, service._dev_mode, service._sync = AsyncFakeFirestore(store, ids), False, sync_service
+    return SimpleNamespace(store=store, service=service, sync=sync_service, user_cache=cache, claim_gate=gate, gig_pool=pool)
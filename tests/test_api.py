@@ -1,5 +1,8 @@
+import json
 from fastapi.testclient import TestClient
 from app.main import app
+from app.routes.auth import create_access_token
+from app.utils.pagination import encode_cursor
 
 client = TestClient(app)
 
@@ -15,4 +18,123 @@ def test_health_check():
 
 def test_docs_endpoint():
     response = client.get("/docs")
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_nearby_jobs_paginates_by_distance():
+    kingston = {"lat": 17.9714, "lon": -76.7931}
+    response = client.get("/jobs/nearby", params={**kingston, "radius_km": 5})
+    assert response.status_code == 200
+    assert [job["id"] for job in response.json()["items"]] == ["dev-job-1"]
+
+    params = {**kingston, "radius_km": 200, "limit": 1}
+    first = client.get("/jobs/nearby", params=params).json()
+    second = client.get("/jobs/nearby", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [job["id"] for job in first["items"] + second["items"]] == ["dev-job-1", "dev-job-2"]
+    assert second["next_cursor"] is None
+
+    assert client.get("/jobs/nearby", params={**kingston, "cursor": "bogus"}).status_code == 400
+    for key in (["far", "dev-job-1"], [1.5, 7]):
+        params = {**kingston, "cursor": encode_cursor(key)}
+        assert client.get("/jobs/nearby", params=params).status_code == 400
+        assert client.get("/gigs/nearby", params=params).status_code == 400
+
+def test_nearby_gigs():
+    response = client.get("/gigs/nearby", params={"lat": 18.4762, "lon": -77.9189, "radius_km": 5})
+    assert response.status_code == 200
+    assert [gig["id"] for gig in response.json()["items"]] == ["dev-gig-2"]
+
+def test_routes_read_through_async_data_layer():
+    response = client.get("/jobs/dev-job-1")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Software Developer"
+    assert client.get("/jobs/missing").status_code == 404
+
+    response = client.get("/analytics/parish-stats")
+    assert response.status_code == 200
+    assert response.json()["Kingston"] == 8
+
+def test_io_metrics_endpoint():
+    response = client.get("/health/io")
+    assert response.status_code == 200
+    assert {"queue_depth", "in_flight", "operations"} <= set(response.json())
+
+def test_job_and_gig_listings_are_paged():
+    response = client.get("/jobs/", params={"page_size": 1})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+    response = client.get("/gigs/available", params={"parish": "Kingston"})
+    assert response.status_code == 200
+    assert [gig["parish"] for gig in response.json()["items"]] == ["Kingston"]
+
+    assert client.get("/jobs/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/gigs/available", params={"page_size": 0}).status_code == 422
+
+def auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+def test_job_candidates_are_limited_to_the_employer():
+    response = client.get("/matching/jobs/dev-job-1/candidates", headers=auth("dev-employer-1"))
+    assert response.status_code == 200
+    response = client.get("/matching/jobs/dev-job-1/candidates", headers=auth("dev-employer-2"))
+    assert response.status_code == 403
+
+def test_job_status_is_changed_by_the_employer_only():
+    url = "/jobs/dev-job-1/status"
+    assert client.patch(url, params={"status": "filled"}, headers=auth("dev-employer-2")).status_code == 403
+    assert client.patch(url, params={"status": "filled"}, headers=auth("dev-employer-1")).status_code == 200
+    assert client.patch("/jobs/missing/status", params={"status": "filled"}, headers=auth("dev-employer-1")).status_code == 404
+
+def test_batch_match_is_for_staff(monkeypatch):
+    from app.routes import auth as auth_routes
+
+    async def get_user(user_id):
+        return {"id": user_id, "role": "business" if user_id == "biz-1" else "job_seeker"}
+    monkeypatch.setattr(auth_routes.firebase_async_service, "get_user", get_user)
+
+    assert client.post("/matching/batch", json={}, headers=auth("seeker-1")).status_code == 403
+    assert client.post("/matching/batch", json={"top_k": 0}, headers=auth("biz-1")).status_code == 422
+
+    response = client.post("/matching/batch", json={"top_k": 1}, headers=auth("biz-1"))
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows and all(len(row["matches"]) <= 1 for row in rows)
+
+def test_matching_limits_and_missing_users(monkeypatch):
+    from app.routes import matching as matching_routes
+
+    headers = auth("dev-user")
+    assert client.get("/matching/recommendations", params={"limit": 0}, headers=headers).status_code == 422
+    assert client.get("/matching/recommendations", params={"limit": 101}, headers=headers).status_code == 422
+    assert client.post("/matching/score", params={"job_id": "dev-job-1"}, headers=headers).status_code == 200
+
+    async def get_user(user_id):
+        return None
+    monkeypatch.setattr(matching_routes.firebase_async_service, "get_user", get_user)
+    assert client.post("/matching/score", params={"job_id": "dev-job-1"}, headers=headers).status_code == 404
+
+def test_profile_updates_reject_nulls_and_refresh_recommendations(monkeypatch, firestore_fake):
+    from app.routes import auth as auth_routes
+
+    monkeypatch.setattr(auth_routes, "firebase_async_service", firestore_fake.service)
+    store = firestore_fake.store
+    store["users/seeker-1"] = {
+        "email": "seeker@example.com", "full_name": "Seeker", "parish": "Kingston",
+        "role": "job_seeker", "skills": ["Python"], "created_at": "2026-01-01T00:00:00+00:00"
+    }
+    store["recommendations/seeker-1"] = {"matches": []}
+    headers = auth("seeker-1")
+
+    for field in ("full_name", "parish", "skills"):
+        assert client.patch("/auth/me", json={field: None}, headers=headers).status_code == 422
+    assert store["users/seeker-1"]["parish"] == "Kingston"
+
+    # A name change leaves the precomputed list alone, a parish change drops it
+    response = client.patch("/auth/me", json={"full_name": "Renamed"}, headers=headers)
+    assert response.status_code == 200 and response.json()["full_name"] == "Renamed"
+    assert "recommendations/seeker-1" in store
+
+    response = client.patch("/auth/me", json={"parish": "St. Andrew", "town": None}, headers=headers)
+    assert response.status_code == 200 and response.json()["parish"] == "St. Andrew"
+    assert "recommendations/seeker-1" not in store
+    assert client.get("/auth/me", headers=headers).json()["parish"] == "St. Andrew"
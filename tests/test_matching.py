@@ -0,0 +1,424 @@
+import pytest
+import numpy as np
+from app.services.matching_service import matching_service
+from app.utils.parish_data import (
+    JAMAICA_PARISHES, UNKNOWN_PARISH, calculate_distance,
+    get_parish_index, parish_distance, parish_distances
+)
+
+user = {
+    "id": "user-1",
+    "parish": "Kingston",
+    "skills": ["Python", "Excel"],
+}
+
+jobs = [
+    {"id": "job-1", "title": "Developer", "parish": "Kingston", "pay": 60000,
+     "required_skills": ["python", "React"]},
+    {"id": "job-2", "title": "Clerk", "parish": "St James", "pay": 30000,
+     "required_skills": ["Excel"]},
+    {"id": "job-3", "title": "Driver", "parish": "Portland", "pay": 25000,
+     "required_skills": []},
+    {"id": "job-4", "title": "Analyst", "parish": "St Andrew", "pay": 55000,
+     "required_skills": ["Python", "Excel", "excel"]},
+    {"id": "job-5", "title": "Developer", "parish": "Kingston", "pay": 60000,
+     "required_skills": ["Python", "React"]},
+]
+
+def test_rank_jobs_matches_per_job_scoring():
+    expected = [matching_service.calculate_match_score(user, job) for job in jobs]
+    expected.sort(key=lambda x: x['score'], reverse=True)
+
+    ranked = matching_service.rank_jobs(user, jobs, limit=len(jobs))
+
+    assert [m['job_id'] for m in ranked] == [m['job_id'] for m in expected]
+    for got, want in zip(ranked, expected):
+        assert abs(got['score'] - want['score']) < 1e-9
+        assert got['reasons'] == want['reasons']
+
+def test_rank_jobs_limit_keeps_stable_ties():
+    ranked = matching_service.rank_jobs(user, jobs, limit=2)
+    assert len(ranked) == 2
+    # job-1 and job-5 tie; the earlier job wins
+    ids = [m['job_id'] for m in matching_service.rank_jobs(user, jobs, limit=5)]
+    assert ids.index("job-1") < ids.index("job-5")
+
+def test_rank_jobs_without_explain_skips_reasons_only():
+    explained = matching_service.rank_jobs(user, jobs, limit=3)
+    bare = matching_service.rank_jobs(user, jobs, limit=3, explain=False)
+
+    assert all(m['reasons'] == [] for m in bare)
+    assert [{**m, 'reasons': []} for m in explained] == bare
+
+def test_rank_jobs_empty():
+    assert matching_service.rank_jobs(user, [], limit=5) == []
+
+def test_parish_distance_table_matches_geodesic():
+    kingston = JAMAICA_PARISHES["kingston"]
+    st_james = JAMAICA_PARISHES["st_james"]
+    expected = calculate_distance(kingston['lat'], kingston['lon'], st_james['lat'], st_james['lon'])
+
+    assert get_parish_index("St. James") == get_parish_index("st_james")
+    assert parish_distance(get_parish_index("Kingston"), get_parish_index("St. James")) == expected
+
+def test_parish_distances_gather_unknown_is_zero():
+    indices = np.array([get_parish_index("Kingston"), get_parish_index("Atlantis")])
+    distances = parish_distances(get_parish_index("Portland"), indices)
+    assert indices[1] == UNKNOWN_PARISH
+    assert distances[0] > 0
+    assert distances[1] == 0
+
+def test_job_index_candidates_follow_skills_and_parish():
+    from app.services.job_index import JobIndex
+
+    index = JobIndex()
+    index.load([{**job, "status": "active"} for job in jobs])
+
+    ids = [job['id'] for job in index.candidates(["EXCEL"], "Portland", include_parish=False)]
+    # Open jobs (no required skills) are always candidates
+    assert ids == ["job-2", "job-3", "job-4"]
+
+    index.add({**jobs[1], "status": "filled"})
+    ids = [job['id'] for job in index.candidates(["excel"], "Kingston")]
+    assert ids == ["job-1", "job-3", "job-4", "job-5"]
+
+def test_top_k_is_independent_of_paging():
+    from app.services.scoring import TopK
+
+    scores = [0.5, 0.9, 0.5, 0.1, 0.9, 0.7]
+    whole = TopK(3)
+    for position, score in enumerate(scores):
+        whole.push(score, position, position)
+
+    paged = TopK(3)
+    for start in range(0, len(scores), 2):
+        for position in range(start, start + 2):
+            paged.push(scores[position], position, position)
+
+    assert whole.items() == paged.items() == [1, 4, 5]
+
+def test_recommendation_cache_invalidation():
+    from app.services.recommendation_cache import RecommendationCache
+
+    cache = RecommendationCache(max_entries=2, ttl_seconds=60)
+    matches = matching_service.rank_jobs(user, jobs, limit=2)
+    cache.put("user-1", user, 2, matches)
+    assert [m['job_id'] for m in cache.get("user-1", user, 2)] == [m['job_id'] for m in matches]
+
+    # A weak job elsewhere does not touch the entry, a cached job closing does
+    cache.invalidate_for_job({"id": "job-9", "parish": "Hanover", "required_skills": ["Welding"]})
+    assert cache.get("user-1", user, 2) is not None
+    cache.invalidate_for_job({"id": matches[0]['job_id'], "status": "filled"})
+    assert cache.get("user-1", user, 2) is None
+
+    # Unchanged profile keeps the entry, a new skill drops it
+    cache.put("user-1", user, 2, matches)
+    cache.invalidate_user("user-1", {**user, "full_name": "New Name"})
+    assert cache.get("user-1", user, 2) is not None
+    cache.invalidate_user("user-1", {**user, "skills": ["Welding"]})
+    assert cache.get("user-1", user, 2) is None
+
+def test_recommendations_follow_profile_changes_made_elsewhere(monkeypatch):
+    from app.services.job_index import JobIndex
+    from app.services.recommendation_cache import RecommendationCache
+
+    index = JobIndex()
+    index.load(jobs)
+    monkeypatch.setattr(matching_service, "job_index", index)
+    monkeypatch.setattr(matching_service, "cache", RecommendationCache())
+    # Another process updates the profile; this one's cache hears nothing
+    profile = dict(user)
+    monkeypatch.setattr(matching_service.firebase, "get_user", lambda user_id: dict(profile))
+    ranked = []
+    rank_jobs = matching_service.rank_jobs
+    monkeypatch.setattr(matching_service, "rank_jobs", lambda *args, **kwargs: ranked.append(1) or rank_jobs(*args, **kwargs))
+
+    first = matching_service.get_recommendations("user-1", 2)
+    assert matching_service.get_recommendations("user-1", 2) == first and len(ranked) == 1
+
+    profile["skills"] = ["React"]
+    second = matching_service.get_recommendations("user-1", 2)
+    assert len(ranked) == 2
+    assert second[0]['job_id'] == "job-1" and second != first
+
+def test_stream_recommendations_match_index_strategy_across_pages(monkeypatch, firestore_fake):
+    from datetime import datetime, timedelta, timezone
+    from app.services import matching_service as module
+    from app.services.job_index import JobIndex
+    from app.services.text_index import JobTextIndex
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # job-5 duplicates job-1, so the two tie; the earlier-created one must win
+    catalog = [{**job, "status": "active", "created_at": start + timedelta(hours=i)} for i, job in enumerate(jobs)]
+    for job in catalog:
+        firestore_fake.store[f"jobs/{job['id']}"] = {k: v for k, v in job.items() if k != "id"}
+    monkeypatch.setattr(matching_service, "firebase", firestore_fake.sync)
+    monkeypatch.setattr(matching_service, "job_index", JobIndex())
+    monkeypatch.setattr(matching_service, "text_index", JobTextIndex(refit_threshold=1000))
+    monkeypatch.setattr(module.settings, "matching_stream_page_size", 2)
+
+    streamed = matching_service.stream_recommendations(user, limit=4)
+    ranked = matching_service.rank_jobs(user, catalog, limit=4)
+    assert [m['job_id'] for m in streamed] == [m['job_id'] for m in ranked]
+    assert [m['score'] for m in streamed] == pytest.approx([m['score'] for m in ranked])
+    assert [m['job_id'] for m in streamed] == ["job-4", "job-1", "job-5", "job-2"]
+
+    monkeypatch.setattr(module.settings, "matching_stream_max_pages", 1)
+    assert {m['job_id'] for m in matching_service.stream_recommendations(user, limit=4)} <= {"job-1", "job-2"}
+
+def test_recommendation_cache_lru_eviction():
+    from app.services.recommendation_cache import RecommendationCache
+
+    cache = RecommendationCache(max_entries=2, ttl_seconds=60)
+    for user_id in ("a", "b"):
+        cache.put(user_id, user, 1, [])
+    cache.get("a", user, 1)
+    cache.put("c", user, 1, [])
+    assert cache.get("b", user, 1) is None
+    assert cache.get("a", user, 1) == [] and cache.get("c", user, 1) == []
+
+def test_candidates_match_per_user_scoring():
+    from app.services.user_index import UserIndex
+
+    seekers = [
+        {"id": "u1", "role": "job_seeker", "full_name": "A", "parish": "Kingston", "skills": ["Python"]},
+        {"id": "u2", "role": "job_seeker", "full_name": "B", "parish": "St. James", "skills": ["python", "react"]},
+        {"id": "u3", "role": "job_seeker", "full_name": "C", "parish": "Kingston", "skills": ["Welding"]},
+        {"id": "u4", "role": "business", "full_name": "D", "parish": "Kingston", "skills": ["Python"]},
+    ]
+    index = UserIndex()
+    index.load(seekers)
+    original, matching_service.user_index = matching_service.user_index, index
+    try:
+        job = jobs[0]
+        ranked = matching_service.get_candidates(job)
+        assert [c['user_id'] for c in ranked] == ["u1", "u2", "u3"]
+        for candidate in ranked:
+            seeker = next(u for u in seekers if u['id'] == candidate['user_id'])
+            expected = matching_service.calculate_match_score(seeker, job)
+            assert abs(candidate['score'] - expected['score']) < 1e-9
+
+        filtered = matching_service.get_candidates(job, parishes=["St James"])
+        assert [c['user_id'] for c in filtered] == ["u2"]
+        assert [c['user_id'] for c in matching_service.get_candidates(job, page=2, page_size=2)] == ["u3"]
+    finally:
+        matching_service.user_index = original
+
+def test_user_index_reuses_slots():
+    from app.services.user_index import UserIndex
+
+    index = UserIndex()
+    seeker = {"id": "u1", "role": "job_seeker", "parish": "Kingston", "skills": ["Python"]}
+    for skills in (["Python"], ["React"], ["Welding"]):
+        index.add({**seeker, "skills": skills})
+    assert len(index._users) == 1 and len(index) == 1
+    assert index.candidate_slots(["Python"], include_parish=False).tolist() == []
+    assert index.candidate_slots(["Welding"], include_parish=False).tolist() == [0]
+
+    # A user who leaves the index frees the slot for the next one
+    index.add({**seeker, "role": "business"})
+    index.add({**seeker, "id": "u2"})
+    assert len(index._users) == 1 and index.user(0)["id"] == "u2"
+
+def test_skill_vocabulary_bitsets():
+    from app.services.scoring import skill_mask_match
+    from app.utils.skill_vocab import SkillVocabulary
+
+    vocab = SkillVocabulary()
+    assert vocab.intern(" Python ") == vocab.intern("python")
+    assert list(vocab.ids(["Excel", "python", "EXCEL"])) == sorted({vocab.intern("excel"), vocab.intern("python")})
+
+    user_mask = vocab.mask(["Python", "Excel"])
+    assert skill_mask_match(user_mask, vocab.mask(["python", "React"])) == 0.5
+    assert skill_mask_match(user_mask, 0) == 1.0
+    assert matching_service.calculate_skill_match(["Python"], ["python", "python"]) == 1.0
+
+    # Lookups leave unknown skills out instead of interning them
+    size = len(vocab)
+    assert vocab.known_mask(["python", "Cobol"]) == vocab.mask(["python"])
+    assert list(vocab.known_ids(["Cobol", "excel"])) == [vocab.intern("excel")]
+    assert len(vocab) == size
+
+def test_read_paths_do_not_grow_skill_vocabulary():
+    from app.services.job_index import JobIndex
+    from app.services.user_index import UserIndex
+    from app.utils.skill_vocab import skill_vocab
+
+    user_index = UserIndex()
+    user_index.load([{**user, "role": "job_seeker"}])
+    size = len(skill_vocab)
+    assert matching_service.calculate_skill_match(["Query Skill A"], ["Query Skill A", "Python"]) == 0.5
+    assert JobIndex().candidates(["Query Skill B"], include_parish=False) == []
+    slots = user_index.candidate_slots(["Python", "Query Skill C"], include_parish=False)
+    # The unknown skill still counts as required
+    assert user_index.skill_match(slots, ["Python", "Query Skill C"]).tolist() == [0.5]
+    assert len(skill_vocab) == size
+
+def test_indexes_keep_skill_bitsets(monkeypatch):
+    from app.services.job_index import JobIndex
+    from app.services.scoring import score_job
+    from app.services.user_index import UserIndex
+    from app.utils.skill_vocab import skill_vocab
+
+    job_index, user_index = JobIndex(), UserIndex()
+    job_index.load(jobs)
+    user_index.load([{**user, "role": "job_seeker"}])
+    assert job_index.skill_mask(jobs[0]) == skill_vocab.mask(jobs[0]["required_skills"])
+    assert user_index.skill_mask(user) == skill_vocab.mask(user["skills"])
+
+    monkeypatch.setattr(matching_service, "job_index", job_index)
+    monkeypatch.setattr(matching_service, "user_index", user_index)
+    # With mask() disabled, only the indexed bitsets can give a partial match
+    monkeypatch.setattr(skill_vocab, "mask", lambda skills: 0)
+    assert score_job(user, jobs[0])[1] == 1.0
+    assert matching_service.calculate_match_score(user, jobs[0])['skill_match_percentage'] == 50
+
+def test_text_index_similarity_tracks_catalog():
+    from app.services.text_index import JobTextIndex
+
+    catalog = [
+        {"id": "t1", "title": "Python developer", "description": "Build Django APIs", "required_skills": []},
+        {"id": "t2", "title": "Bus driver", "description": "Drive routes in Kingston", "required_skills": []},
+    ]
+    index = JobTextIndex(refit_threshold=1000)
+    index.load(catalog)
+
+    scores = index.similarity(["Python", "Django"], catalog)
+    assert scores[0] > 0.5 and scores[1] == 0
+
+    index.add({"id": "t3", "title": "Django engineer", "description": "", "required_skills": []})
+    index.remove("t1")
+    pending = index.similarity(["Django"], [{"id": "t3"}])
+    index.refit()
+    assert pending[0] > 0
+    assert index.similarity(["Django"], [{"id": "t3"}])[0] > 0
+    assert len(index) == 2
+
+    # Fitted rows scored on their own match the whole catalog's scores
+    both = index.similarity(["Django", "Kingston"], catalog[1:] + [{"id": "t3"}])
+    assert index.similarity(["Django", "Kingston"], [{"id": "t3"}])[0] == both[1]
+    profile = index.profile_counts(["Django", "Kingston"])
+    assert np.allclose(index.profile_similarity(catalog[1], [profile]), both[:1])
+
+def test_similar_jobs_index_insert_delete_and_snapshot(tmp_path):
+    from app.services.similar_jobs import SimilarJobsIndex
+
+    catalog = [
+        {"id": "s1", "title": "Python developer", "description": "Django and Flask web APIs"},
+        {"id": "s2", "title": "Senior Python developer", "description": "Django web APIs"},
+        {"id": "s3", "title": "Truck driver", "description": "Deliver goods island wide"},
+    ]
+    index = SimilarJobsIndex()
+    index.load(catalog)
+
+    assert index.query(catalog[0], limit=1)[0]['job_id'] == "s2"
+
+    index.add({**catalog[1], "status": "filled"})
+    assert "s2" not in [job['job_id'] for job in index.query(catalog[0])]
+
+    path = str(tmp_path / "similar.npz")
+    index.save_snapshot(path)
+    restored = SimilarJobsIndex()
+    assert restored.load_snapshot(path)
+    assert len(restored) == 2
+    assert restored.query(catalog[0]) == index.query(catalog[0])
+
+def test_batch_match_matches_per_pair_scoring():
+    seekers = [
+        user,
+        {"id": "user-2", "parish": "St. James", "skills": ["excel", "React"]},
+        {"id": "user-3", "parish": "Nowhere", "skills": []},
+    ]
+    rows = list(matching_service.batch_match(seekers, jobs, top_k=3))
+
+    assert [row['user_id'] for row in rows] == ["user-1", "user-2", "user-3"]
+    for seeker, row in zip(seekers, rows):
+        expected = [matching_service.calculate_match_score(seeker, job) for job in jobs]
+        expected.sort(key=lambda x: x['score'], reverse=True)
+        assert [m['job_id'] for m in row['matches']] == [m['job_id'] for m in expected[:3]]
+        for got, want in zip(row['matches'], expected):
+            assert abs(got['score'] - want['score']) < 1e-9
+
+def test_precomputed_recommendations_are_served_while_jobs_stay_active(monkeypatch):
+    from app.services.job_index import JobIndex
+    from app.services.recommendation_cache import RecommendationCache
+
+    row = next(matching_service.batch_match([user], jobs, top_k=2, explain=True))
+    doc = {"user_id": "user-1", "profile": user, "top_n": 2, "matches": row['matches']}
+    monkeypatch.setattr(matching_service.firebase, "get_precomputed_recommendations", lambda user_id: doc)
+    index = JobIndex()
+    index.load(jobs)
+    monkeypatch.setattr(matching_service, "job_index", index)
+    monkeypatch.setattr(matching_service, "cache", RecommendationCache())
+
+    assert matching_service._precomputed_recommendations(user, 2) == row['matches']
+    assert matching_service._precomputed_recommendations(user, 5) is None
+
+    # Scored against an older profile: recompute instead
+    moved = {**user, "parish": "Portland"}
+    assert matching_service._precomputed_recommendations(moved, 2) is None
+
+    index.remove(row['matches'][0]['job_id'])
+    assert matching_service._precomputed_recommendations(user, 2) is None
+
+def test_gig_recommendations_use_nearby_pool_and_difficulty(monkeypatch):
+    from app.services.gig_pool import GigPool
+    from app.services.scoring import preferred_gig_level
+
+    assert preferred_gig_level({}) == 0
+    assert preferred_gig_level({"gig_difficulty_counts": {"hard": 6}}) == 2
+
+    gigs = [
+        {"id": "g1", "title": "Python data entry", "parish": "Kingston", "difficulty": "easy"},
+        {"id": "g2", "title": "Python data entry", "parish": "Kingston", "difficulty": "hard"},
+        {"id": "g3", "title": "Python data entry", "parish": "Hanover", "difficulty": "easy"},
+        {"id": "g4", "title": "Python data entry", "parish": "St Andrew", "difficulty": "easy",
+         "status": "claimed"},
+    ]
+    pool = GigPool()
+    pool.load(gigs[:3])
+    pool.add(gigs[3])
+    monkeypatch.setattr(matching_service, "gig_pool", pool)
+    monkeypatch.setattr(matching_service.firebase, "get_user", lambda user_id: user)
+
+    ranked = [g['gig_id'] for g in matching_service.get_gig_recommendations("user-1")]
+    assert ranked == ["g1", "g2"]
+
+    pool.remove("g1")
+    assert [g['gig_id'] for g in matching_service.get_gig_recommendations("user-1")] == ["g2"]
+
+def test_geo_index_radius_matches_brute_force():
+    from app.utils.geo_index import GeoIndex
+    from app.utils.town_data import JAMAICA_TOWNS, haversine_km
+
+    index = GeoIndex(cell_km=3)
+    for name, town in JAMAICA_TOWNS.items():
+        index.add(name, town['lat'], town['lon'])
+    index.remove("portmore")
+
+    origin = JAMAICA_TOWNS["half_way_tree"]
+    hits = index.within(origin['lat'], origin['lon'], 15)
+    expected = sorted(
+        (float(haversine_km(origin['lat'], origin['lon'], t['lat'], t['lon'])), name)
+        for name, t in JAMAICA_TOWNS.items() if name != "portmore"
+    )
+    assert hits == [(name, d) for d, name in expected if d <= 15]
+    assert "spanish_town" not in dict(hits) and "papine" in dict(hits)
+
+def test_town_locations_refine_parish_distances():
+    seeker = {**user, "town": "Papine"}
+    town_jobs = [
+        {**jobs[0], "id": "t1", "town": "Half Way Tree"},
+        {**jobs[0], "id": "t2", "lat": 17.9685, "lon": -76.7920},
+        {**jobs[0], "id": "t3"},
+    ]
+    ranked = matching_service.rank_jobs(seeker, town_jobs, limit=3)
+    for match in ranked:
+        job = next(j for j in town_jobs if j['id'] == match['job_id'])
+        assert abs(match['distance_km'] - matching_service.calculate_match_score(seeker, job)['distance_km']) < 1e-9
+
+    by_id = {m['job_id']: m['distance_km'] for m in ranked}
+    assert 4 < by_id["t1"] < 6 and by_id["t3"] == 0.0
+
+    row = next(matching_service.batch_match([seeker], town_jobs, top_k=3))
+    assert {m['job_id']: m['distance_km'] for m in row['matches']} == pytest.approx(by_id)
@@ -0,0 +1,348 @@
+from datetime import datetime, timedelta, timezone
+from app.services.firebase_async_service import (
+    EmailAlreadyRegistered, gig_completion, email_key, newest_first, next_page_key
+)
+from app.services.gig_counters import GigCounters
+from google.cloud.firestore_v1.transforms import DELETE_FIELD
+from app.services.io_executor import BoundedIOExecutor, ExecutorSaturated
+from app.services.user_cache import UserCache
+from app.utils.pagination import encode_created_cursor, decode_created_cursor
+from conftest import AsyncFakeFirestore, FakeFirestore
+import asyncio
+import threading
+import pytest
+
+
+def test_io_executor_rejects_when_queue_is_full():
+    executor = BoundedIOExecutor(max_workers=1, max_queue=1, operation_limits={"slow": 1})
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("slow", release.wait))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(executor.run("slow", lambda: "queued"))
+        await asyncio.sleep(0.05)
+        assert executor.metrics()["queue_depth"] == 1
+        with pytest.raises(ExecutorSaturated):
+            await executor.run("slow", lambda: None)
+        release.set()
+        return await running, await waiting
+
+    assert asyncio.run(scenario()) == (True, "queued")
+    stats = executor.metrics()["operations"]["slow"]
+    assert stats["completed"] == 2 and stats["rejected"] == 1 and stats["in_flight"] == 0
+    executor.shutdown()
+
+def test_create_gigs_batches_writes_per_chunk(firestore_fake):
+    service = firestore_fake.service
+    service.db.failing_commits = {2}
+    gigs = [{"title": f"Gig {i}", "parish": "Kingston"} for i in range(5)]
+    results = asyncio.run(service.create_gigs(gigs, chunk_size=2))
+
+    assert service.db.commits == 3
+    assert [r["success"] for r in results] == [True, True, False, False, True]
+    assert results[2]["error"] == "deadline exceeded"
+    stored = [path for path in firestore_fake.store if path.startswith("micro_gigs/")]
+    assert sorted(stored) == sorted(f"micro_gigs/{r['id']}" for r in results if r["success"])
+
+    # Only committed chunks reach the counters
+    analytics = asyncio.run(service.get_analytics_data())
+    assert analytics["total_gigs"] == 3 and analytics["gigs_by_status"] == {"available": 3}
+
+def test_claim_gig_is_a_compare_and_set(firestore_fake):
+    service, store = firestore_fake.service, firestore_fake.store
+    store["micro_gigs/gig-1"] = {"status": "available", "parish": "Kingston"}
+
+    assert asyncio.run(service.claim_gig("gig-1", "user-1")) is True
+    assert asyncio.run(service.claim_gig("gig-1", "user-2")) is False
+    assert store["micro_gigs/gig-1"]["claimed_by"] == "user-1"
+    assert asyncio.run(service.claim_gig("missing", "user-2")) is False
+
+@pytest.mark.parametrize("use_gate", [True, False])
+def test_concurrent_claims_succeed_exactly_once(monkeypatch, firestore_fake, use_gate):
+    from google.api_core.exceptions import Aborted
+    from app.services import firebase_async_service as module
+    import random
+
+    store = {"status": "available", "claimed_by": None}
+    calls = []
+
+    async def claim_transaction(gig_id, user_id):
+        calls.append(user_id)
+        snapshot = dict(store)
+        await asyncio.sleep(random.uniform(0, 0.002))
+        # Optimistic commit: abort if someone else wrote since our read
+        if store != snapshot:
+            raise ValueError("Failed to commit transaction in 1 attempts") from Aborted("contention")
+        if store["status"] != "available":
+            return False
+        store.update(status="claimed", claimed_by=user_id)
+        return True
+
+    service = firestore_fake.service
+    monkeypatch.setattr(service, "_claim_transaction", claim_transaction)
+    if not use_gate:
+        # Every claimer reaches the transaction, as across separate processes
+        async def enter(gig_id):
+            return True
+        monkeypatch.setattr(firestore_fake.claim_gate, "enter", enter)
+    monkeypatch.setattr(module, "claim_backoff_seconds", lambda attempt: random.uniform(0, 0.002))
+
+    async def claim_all():
+        return await asyncio.gather(*(service.claim_gig("gig-1", f"user-{i}") for i in range(200)))
+
+    results = asyncio.run(claim_all())
+    assert results.count(True) == 1
+    assert store["claimed_by"] == f"user-{results.index(True)}"
+    if use_gate:
+        assert len(calls) < 200
+
+def test_claims_retry_aborted_reads_and_wait_out_failed_attempts(monkeypatch, firestore_fake):
+    from google.api_core.exceptions import Aborted
+    from app.services import firebase_async_service as module
+
+    service = firestore_fake.service
+    firestore_fake.store["micro_gigs/gig-1"] = {"status": "available", "parish": "Kingston"}
+    monkeypatch.setattr(module, "claim_backoff_seconds", lambda attempt: 0)
+    claim_transaction = service._claim_transaction
+    failures = [RuntimeError("deadline exceeded"), Aborted("read contention")]
+
+    async def flaky(gig_id, user_id):
+        await asyncio.sleep(0)
+        if failures:
+            raise failures.pop(0)
+        return await claim_transaction(gig_id, user_id)
+    monkeypatch.setattr(service, "_claim_transaction", flaky)
+
+    async def claim_both():
+        return await asyncio.gather(
+            service.claim_gig("gig-1", "user-1"),
+            service.claim_gig("gig-1", "user-2"),
+            return_exceptions=True
+        )
+
+    # user-1's attempt errors out; user-2 was waiting, not rejected, and claims it
+    first, second = asyncio.run(claim_both())
+    assert isinstance(first, RuntimeError) and second is True
+    assert firestore_fake.store["micro_gigs/gig-1"]["claimed_by"] == "user-2"
+
+def test_gig_completion_requires_the_claiming_user():
+    db = FakeFirestore()
+    gig_ref, user_ref = db.collection("micro_gigs").document("gig-1"), db.collection("users").document("user-1")
+    gig_ref.set({"status": "claimed", "claimed_by": "user-1", "payment": 1500, "difficulty": "easy"})
+    user_ref.set({"completed_gigs": 2, "total_earnings": 3000})
+
+    gig_updates, user_updates, earnings = gig_completion(gig_ref.get(), user_ref.get(), "user-1")
+    assert gig_updates["status"] == "completed"
+    assert earnings == {"gig_id": "gig-1", "payment": 1500, "completed_gigs": 3, "total_earnings": 4500}
+    assert user_updates["total_earnings"] == 4500 and "gig_difficulty_counts.easy" in user_updates
+
+    # Odd difficulties can't split the counters or write a nested path
+    gig_ref.update({"difficulty": "hard.x"})
+    assert "gig_difficulty_counts.medium" in gig_completion(gig_ref.get(), user_ref.get(), "user-1")[1]
+
+    assert gig_completion(gig_ref.get(), user_ref.get(), "user-2") is None
+    assert gig_completion(gig_ref.get(), db.collection("users").document("ghost").get(), "user-1") is None
+    gig_ref.update({"status": "completed"})
+    assert gig_completion(gig_ref.get(), user_ref.get(), "user-1") is None
+
+def test_complete_gig_pays_the_claiming_user_once(monkeypatch, firestore_fake):
+    from conftest import AsyncDocumentRef
+
+    service, store = firestore_fake.service, firestore_fake.store
+    store["users/user-1"] = {"email": "ann@example.com", "completed_gigs": 2, "total_earnings": 3000}
+    store["micro_gigs/gig-1"] = {
+        "status": "claimed", "claimed_by": "user-1", "payment": 1500, "difficulty": " Easy", "parish": "Kingston"
+    }
+    # The gig and the user come back from one batched read
+    monkeypatch.setattr(AsyncDocumentRef, "get", None)
+
+    assert asyncio.run(service.complete_gig("gig-1", "user-2")) is None
+    earnings = asyncio.run(service.complete_gig("gig-1", "user-1"))
+    assert service.db.batch_reads == 2
+    assert earnings == {"gig_id": "gig-1", "payment": 1500, "completed_gigs": 3, "total_earnings": 4500}
+    assert store["micro_gigs/gig-1"]["status"] == "completed"
+    assert store["users/user-1"]["total_earnings"] == 4500
+    assert store["users/user-1"]["gig_difficulty_counts"] == {"easy": 1}
+
+    # Already completed: nothing is paid twice
+    assert asyncio.run(service.complete_gig("gig-1", "user-1")) is None
+    assert store["users/user-1"]["completed_gigs"] == 3
+
+def test_user_cache_reads_through_and_invalidates(monkeypatch, firestore_fake):
+    from app.services import firebase_async_service as module
+
+    cache = UserCache(max_entries=2)
+    monkeypatch.setattr(module, "user_cache", cache)
+    service = firestore_fake.service
+    firestore_fake.store["users/user-1"] = {"full_name": "Ann"}
+    reads = []
+    read = AsyncFakeFirestore.collection
+    monkeypatch.setattr(AsyncFakeFirestore, "collection", lambda db, name: reads.append(name) or read(db, name))
+
+    def get_user(user_id):
+        return asyncio.run(service.get_user(user_id))
+
+    assert get_user("user-1")["full_name"] == "Ann"
+    get_user("user-1")["full_name"] = "Mutated"
+    assert get_user("user-1")["full_name"] == "Ann"
+    assert get_user("ghost") is None and get_user("ghost") is None
+    assert len(reads) == 2
+
+    firestore_fake.store["users/user-1"]["full_name"] = "Bea"
+    cache.invalidate("user-1")
+    assert get_user("user-1")["full_name"] == "Bea"
+
+    # A read that raced an invalidation is not stored
+    generation = cache.generation()
+    cache.invalidate("user-2")
+    cache.put("user-2", {"id": "user-2"}, generation)
+    assert cache.get("user-2") == (False, None)
+
+    get_user("user-3")
+    metrics = cache.metrics()
+    assert metrics["hits"] == 2 and metrics["negative_hits"] == 1 and metrics["evictions"] == 1
+
+def test_create_user_claims_the_email_once(firestore_fake):
+    service = firestore_fake.service
+    user = {"email": "Ann@Example.com", "full_name": "Ann", "parish": "Kingston", "role": "job_seeker", "hashed_password": "h"}
+
+    user_id = asyncio.run(service.create_user(dict(user)))
+    assert firestore_fake.store[f"users_by_email/{email_key('ann@example.com')}"]["user_id"] == user_id
+    with pytest.raises(EmailAlreadyRegistered):
+        asyncio.run(service.create_user({**user, "email": " ann@example.COM"}))
+    assert [path for path in firestore_fake.store if path.startswith("users/")] == [f"users/{user_id}"]
+
+    # Login is one index read, whatever the case of the email
+    firestore_fake.store.pop(f"users/{user_id}")
+    assert asyncio.run(service.get_user_by_email("ANN@example.com")) == {
+        "id": user_id, "email": "ann@example.com", "hashed_password": "h"
+    }
+
+def test_get_user_by_email_backfills_users_created_before_the_index(monkeypatch, firestore_fake):
+    from app.services import firebase_async_service as async_module
+
+    service = firestore_fake.service
+    firestore_fake.store["users/user-1"] = {"email": "Ann@Example.com"}
+    queries = []
+    where = AsyncFakeFirestore.collection_type.where
+    monkeypatch.setattr(AsyncFakeFirestore.collection_type, "where", lambda q, *args: queries.append(args) or where(q, *args))
+    assert asyncio.run(service.get_user_by_email("Ann@Example.com")) is None
+    assert queries == []
+
+    monkeypatch.setattr(async_module.settings, "email_index_fallback_query", True)
+
+    assert asyncio.run(service.get_user_by_email("Ann@Example.com"))["id"] == "user-1"
+    assert firestore_fake.store[f"users_by_email/{email_key('ann@example.com')}"]["user_id"] == "user-1"
+    assert asyncio.run(service.get_user_by_email("ann@EXAMPLE.com"))["id"] == "user-1"
+    assert len(queries) == 1
+
+def test_rebuild_email_index_covers_existing_users(firestore_fake):
+    store = firestore_fake.store
+    store["users/user-1"] = {"email": "Ann@Example.com", "hashed_password": "a", "created_at": datetime(2024, 1, 2, tzinfo=timezone.utc)}
+    store["users/user-2"] = {"email": "ann@example.com", "hashed_password": "b", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    store["users/user-3"] = {"email": "bob@example.com", "hashed_password": "c"}
+
+    assert firestore_fake.sync.rebuild_email_index(chunk_size=1) == 2
+    assert asyncio.run(firestore_fake.service.get_user_by_email("ANN@example.com"))["id"] == "user-2"
+    assert asyncio.run(firestore_fake.service.get_user_by_email("bob@example.com"))["hashed_password"] == "c"
+
+def test_gig_counters_sum_shards():
+    counters = GigCounters(shards=4)
+    now = datetime.now(timezone.utc)
+    day = now.strftime("%Y-%m-%d")
+    created = counters.created([
+        {"parish": "St. James", "status": "available", "created_at": now},
+        {"parish": "St James", "status": "available", "created_at": now},
+        {"parish": "Kingston", "status": "available", "created_at": now},
+    ])
+    claimed = counters.transition("available", "claimed", now)
+    completed = counters.transition("claimed", "completed", now)
+
+    legacy = {"by_parish": {"St. James": 4}, "by_day": {"2001-01-01": {"created": 9}}}
+    summary = counters.analytics([created, claimed, completed, legacy])
+    assert summary["total_gigs"] == 3
+    assert summary["gigs_by_parish"] == {"St. James": 6, "Kingston": 1}
+    assert summary["gigs_by_status"] == {"available": 2, "claimed": 0, "completed": 1}
+    assert summary["gigs_by_day"] == {day: {"created": 3, "claimed": 1, "completed": 1}}
+
+    increments = counters.increments(claimed)
+    assert increments["by_status"]["available"].value == -1
+    assert counters.recount([{"parish": "Kingston", "status": "completed", "created_at": now, "completed_at": now}])["by_day"] == {
+        day: {"created": 1, "completed": 1}
+    }
+
+    # Writes drop the days that have just aged out; rebuilds keep only the window
+    update = counters.shard_update(claimed)
+    expired = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+    assert update["by_day"][expired] is DELETE_FIELD and update["by_day"][day]["claimed"].value == 1
+    old = {"parish": "Kingston", "status": "available", "created_at": now - timedelta(days=90)}
+    assert counters.recount([old])["by_day"] == {}
+
+def test_analytics_follow_gig_lifecycle(firestore_fake):
+    service = firestore_fake.service
+    firestore_fake.store["users/user-1"] = {"completed_gigs": 0, "total_earnings": 0}
+    gig_id = asyncio.run(service.create_gig({"title": "Flyers", "parish": "St. James", "payment": 800}))
+    asyncio.run(service.create_gig({"title": "Errand", "parish": "St James", "payment": 500}))
+    asyncio.run(service.create_gig({"title": "Survey", "parish": "Kingston", "payment": 500}))
+    asyncio.run(service.claim_gig(gig_id, "user-1"))
+    asyncio.run(service.complete_gig(gig_id, "user-1"))
+
+    analytics = asyncio.run(service.get_analytics_data())
+    assert analytics["total_gigs"] == 3
+    assert analytics["gigs_by_parish"] == {"St. James": 2, "Kingston": 1}
+    assert analytics["gigs_by_status"] == {"available": 2, "claimed": 0, "completed": 1}
+
+def test_created_cursor_pages_newest_first():
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_created_cursor(encode_created_cursor(created_at, "job-9")) == (created_at, "job-9")
+
+    db = FakeFirestore()
+    for i in range(5):
+        db.collection("jobs").document(f"job-{i}").set({"created_at": created_at.replace(day=1 + i // 2)})
+    query = db.collection("jobs")
+
+    first = list(newest_first(query, 2).stream())
+    second = list(newest_first(query, 2, next_page_key(first, 2)).stream())
+    third = list(newest_first(query, 2, next_page_key(second, 2)).stream())
+    assert [doc.id for doc in first + second + third] == ["job-4", "job-3", "job-2", "job-1", "job-0"]
+    assert next_page_key(third, 2) is None
+
+def test_available_gigs_page_through_cursor(firestore_fake):
+    service, store = firestore_fake.service, firestore_fake.store
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    for i in range(5):
+        store[f"micro_gigs/gig-{i}"] = {
+            "status": "claimed" if i == 2 else "available", "parish": "Kingston", "created_at": start + timedelta(hours=i)
+        }
+
+    first, after = asyncio.run(service.get_available_gigs_page("Kingston", page_size=2))
+    second, after = asyncio.run(service.get_available_gigs_page("Kingston", page_size=2, after=after))
+    assert [gig["id"] for gig in first + second] == ["gig-4", "gig-3", "gig-1", "gig-0"]
+    assert asyncio.run(service.get_available_gigs_page("Kingston", page_size=2, after=after)) == ([], None)
+
+def test_similar_jobs_snapshot_catches_up_on_later_writes(monkeypatch, tmp_path, firestore_fake):
+    from app.services.matching_service import matching_service
+    from app.services.similar_jobs import SimilarJobsIndex
+
+    store, service = firestore_fake.store, firestore_fake.service
+    monkeypatch.setattr(firestore_fake.sync, "_job_written", lambda job: None)
+    long_ago = datetime.now(timezone.utc) - timedelta(days=1)
+    for job_id, title in (("job-1", "Python developer"), ("job-2", "Django developer")):
+        store[f"jobs/{job_id}"] = {"title": title, "status": "active", "created_at": long_ago, "updated_at": long_ago}
+    index = SimilarJobsIndex()
+    index.load(firestore_fake.sync.get_jobs({'status': 'active'}, limit=None))
+    path = tmp_path / "similar.npz"
+    index.save_snapshot(str(path))
+    assert list(tmp_path.iterdir()) == [path]
+
+    assert asyncio.run(service.update_job_status("job-1", "filled"))
+    store["jobs/job-3"] = {"title": "Flask developer", "status": "active", "updated_at": datetime.now(timezone.utc)}
+
+    restored = SimilarJobsIndex()
+    saved_at = restored.load_snapshot(str(path))
+    assert saved_at is not None and len(restored) == 2
+    monkeypatch.setattr(matching_service, "firebase", firestore_fake.sync)
+    monkeypatch.setattr(matching_service, "similar_jobs", restored)
+    matching_service.catch_up_similar_jobs(saved_at)
+    assert sorted(job["job_id"] for job in restored.query({"id": "new", "title": "developer"})) == ["job-2", "job-3"]